@@ -9,10 +9,22 @@ done
 
 echo "Migrating database"
 python src/manage.py migrate
+# Cache table for the shared cache when REDIS_URL is not set
+python src/manage.py createcachetable
 
 echo "Creating superuser (for test)"
 python src/manage.py createsu
 
+# Optional demo data (manage.py seed_data); skipped once rooms exist
+if [ "${SEED_BOOKINGS:-0}" -gt 0 ]; then
+  echo "Seeding demo data"
+  python src/manage.py seed_data --if-empty \
+    --rooms "${SEED_ROOMS:-100}" \
+    --bookings "$SEED_BOOKINGS" \
+    --users "${SEED_USERS:-100}" \
+    --seed "${SEED:-0}"
+fi
+
 echo "Creating default rooms"
 python - <<END
 import os
@@ -32,4 +44,10 @@ else:
 END
 
 
-exec gunicorn hotel_booking.wsgi:application --bind 0.0.0.0:8000 --workers 3
+# Workers write metrics here and /metrics sums them; start from zero
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+exec gunicorn hotel_booking.wsgi:application --bind 0.0.0.0:8000 --workers 3 \
+    -c python:hotel_booking.gunicorn
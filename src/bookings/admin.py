@@ -1,12 +1,60 @@
+from datetime import timedelta
+
 from django.contrib import admin, messages
+from django.contrib.admin.views.main import ORDER_VAR
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.db.models import Count, Exists, F, OuterRef, Q
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import path, reverse
+from django.utils import timezone
+from django.utils.functional import cached_property
 from django.utils.html import format_html
 
-from .models import Booking, Room
+from .models import Booking, RatePlan, Room
+from .prometheus import BOOKINGS_CANCELLED
+from .search import SEARCH_RANK, search_bookings, search_rooms
+from .versions import bookings_written
+
+
+# Paginator that avoids COUNT(*) over the whole table on PostgreSQL
+class EstimatedCountPaginator(Paginator):
+    # Below this many rows an exact count is cheap enough
+    estimate_threshold = 100_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql" or queryset.query.where:
+            return super().count
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        estimate = row[0] if row else -1
+        if estimate < self.estimate_threshold:
+            return super().count
+        return estimate
+
+
+# Indexed, ranked search; best matches first unless a column is sorted
+class RankedSearchMixin:
+    search_function = None
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        queryset = self.search_function(queryset, search_term)
+        if ORDER_VAR not in request.GET:
+            queryset = queryset.order_by(f"-{SEARCH_RANK}", *queryset.query.order_by)
+        return queryset, False
 
-# Inline bookings inside Room for quick view
+
+# Inline bookings inside Room for quick view: recent and upcoming stays only
 class BookingInline(admin.TabularInline):
     model = Booking
     extra = 0
@@ -20,35 +68,68 @@ class BookingInline(admin.TabularInline):
     )
     can_delete = False
     show_change_link = True
+    # The full history is one click away on the booking changelist
+    history_days = 30
+    max_rows = 50
+
+    def get_queryset(self, request):
+        since = timezone.localdate() - timedelta(days=self.history_days)
+        recent = (
+            super()
+            .get_queryset(request)
+            .filter(end_date__gte=since)
+            .order_by("-start_date")
+        )
+        # Formsets filter their queryset, so it cannot be sliced directly.
+        ids = recent.values("pk")[: self.max_rows]
+        return recent.filter(pk__in=ids).select_related("user")
 
 
-# Custom filter to quickly see available rooms
+# Seasonal and weekday prices, edited on the room page
+class RatePlanInline(admin.TabularInline):
+    model = RatePlan
+    extra = 0
+    fields = (
+        "name",
+        "start_date",
+        "end_date",
+        "weekdays",
+        "price_per_night",
+        "priority",
+    )
+
+
+# Custom filter to quickly see rooms free tonight
 class FreeRoomsFilter(admin.SimpleListFilter):
-    title = "Availability"
+    title = "Availability today"
     parameter_name = "available"
 
     def lookups(self, request, model_admin):
         return (
             ("yes", "Available"),
-            ("no", "Fully booked"),
+            ("no", "Occupied"),
         )
 
     def queryset(self, request, queryset):
+        # EXISTS per room on the (room, start_date, end_date) index
+        today = timezone.localdate()
+        occupied = Exists(
+            Booking.objects.filter(
+                room=OuterRef("pk"),
+                status=Booking.STATUS_ACTIVE,
+                start_date__lte=today,
+                end_date__gt=today,
+            )
+        )
         if self.value() == "yes":
-            booked_ids = Booking.objects.filter(
-                status=Booking.STATUS_ACTIVE
-            ).values_list("room_id", flat=True)
-            return queryset.exclude(id__in=booked_ids)
+            return queryset.filter(~occupied)
         if self.value() == "no":
-            booked_ids = Booking.objects.filter(
-                status=Booking.STATUS_ACTIVE
-            ).values_list("room_id", flat=True)
-            return queryset.filter(id__in=booked_ids)
+            return queryset.filter(occupied)
         return queryset
 
 
 @admin.register(Room)
-class RoomAdmin(admin.ModelAdmin):
+class RoomAdmin(RankedSearchMixin, admin.ModelAdmin):
     list_display = (
         "number",
         "name",
@@ -59,23 +140,52 @@ class RoomAdmin(admin.ModelAdmin):
     )
     list_filter = ("capacity", FreeRoomsFilter)
     search_fields = ("number", "name")
-    inlines = [BookingInline]
-    readonly_fields = ("created_at", "updated_at")
+    search_function = staticmethod(search_rooms)
+    inlines = [BookingInline, RatePlanInline]
+    readonly_fields = ("created_at", "updated_at", "all_bookings_link")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     fieldsets = (
         ("Room Info", {"fields": ("number", "name", "capacity", "price_per_night")}),
+        ("Bookings", {"fields": ("all_bookings_link",)}),
         (
             "Timestamps",
             {"fields": ("created_at", "updated_at"), "classes": ("collapse",)},
         ),
     )
 
+    # Annotate active booking counts in the changelist query itself; the
+    # change, delete and autocomplete views never show them
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        match = getattr(request, "resolver_match", None)
+        changelist = f"{self.opts.app_label}_{self.opts.model_name}_changelist"
+        if match is None or match.url_name != changelist:
+            return qs
+        return qs.annotate(
+            active_bookings=Count(
+                "bookings", filter=Q(bookings__status=Booking.STATUS_ACTIVE)
+            )
+        )
+
     # Count of active bookings for the room
     def current_bookings(self, obj):
-        active = obj.bookings.filter(status=Booking.STATUS_ACTIVE).count()
-        return format_html("<b>{}</b> active", active)
+        return format_html("<b>{}</b> active", obj.active_bookings)
 
     current_bookings.short_description = "Active Bookings"
+    current_bookings.admin_order_field = "active_bookings"
+
+    # Link to the paginated booking changelist for this room
+    def all_bookings_link(self, obj):
+        if obj.pk is None:
+            return "-"
+        url = (
+            reverse("admin:bookings_booking_changelist") + f"?room__id__exact={obj.pk}"
+        )
+        return format_html('<a href="{}">All bookings for this room</a>', url)
+
+    all_bookings_link.short_description = "History"
 
     # Quick link to create booking directly from room
     def book_link(self, obj):
@@ -87,14 +197,20 @@ class RoomAdmin(admin.ModelAdmin):
 
 @admin.action(description="Cancel selected bookings")
 def cancel_bookings(modeladmin, request, queryset):
-    updated = queryset.filter(status=Booking.STATUS_ACTIVE).update(
-        status=Booking.STATUS_CANCELLED
+    active = queryset.filter(status=Booking.STATUS_ACTIVE)
+    room_ids = set(active.values_list("room_id", flat=True))
+    updated = active.update(
+        status=Booking.STATUS_CANCELLED,
+        version=F("version") + 1,
+        updated_at=timezone.now(),
     )
+    bookings_written(room_ids)
+    transaction.on_commit(lambda: BOOKINGS_CANCELLED.inc(updated))
     modeladmin.message_user(request, f"{updated} booking(s) cancelled.")
 
 
 @admin.register(Booking)
-class BookingAdmin(admin.ModelAdmin):
+class BookingAdmin(RankedSearchMixin, admin.ModelAdmin):
     list_display = (
         "id",
         "user",
@@ -106,11 +222,18 @@ class BookingAdmin(admin.ModelAdmin):
         "created_at",
         "cancel_button",
     )
-    list_filter = ("status", "start_date", "room")
+    # A "room" filter would render every room; filter via room links instead
+    list_filter = ("status", "start_date")
+    # Matched through per-table indexed subqueries, not OR-ed joins
     search_fields = ("user__username", "room__number", "room__name")
-    readonly_fields = ("created_at", "updated_at", "nights")
+    search_function = staticmethod(search_bookings)
+    readonly_fields = ("total_price", "created_at", "updated_at", "nights")
     ordering = ("-start_date",)
     actions = [cancel_bookings]
+    autocomplete_fields = ("user", "room")
+    list_select_related = ("user", "room")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     # Optimize queryset to reduce queries
     def get_queryset(self, request):
@@ -147,9 +270,7 @@ class BookingAdmin(admin.ModelAdmin):
     def cancel_booking_view(self, request, booking_id):
         booking = get_object_or_404(Booking, id=booking_id)
 
-        if booking.status == Booking.STATUS_ACTIVE:
-            booking.status = Booking.STATUS_CANCELLED
-            booking.save()
+        if booking.cancel(by_user=request.user):
             self.message_user(request, "Booking cancelled", messages.SUCCESS)
         else:
             self.message_user(request, "Booking already cancelled", messages.WARNING)
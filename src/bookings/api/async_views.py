@@ -0,0 +1,195 @@
+"""
+Native async versions of the hot API paths.
+
+Served by an ASGI worker (``gunicorn hotel_booking.asgi:application -k
+uvicorn_worker.UvicornWorker``) next to the sync WSGI workers, so a slow
+query parks a coroutine instead of a whole worker. The whole middleware
+stack is async-capable there (WhiteNoise, which is not, is left out with
+``SERVE_STATIC=0``), so requests never hop to a thread just to get through
+it. Reads use Django's async
+ORM. Booking creation goes through ``sync_to_async`` for the write itself:
+``Booking.save()`` validates and inserts inside ``transaction.atomic()``,
+which Django only offers synchronously.
+
+Responses match the corresponding ``RoomViewSet`` / ``BookingViewSet``
+endpoints.
+"""
+
+from functools import partial
+
+import orjson
+from asgiref.sync import sync_to_async
+from django.core.exceptions import NON_FIELD_ERRORS
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
+
+from bookings import idempotency
+from bookings.api.authentication import CachedJWTAuthentication
+from bookings.api.filters import RoomFilter
+from bookings.api.renderers import encode_fallback
+from bookings.availability import abooked_ranges
+from bookings.models import Booking, Room
+from bookings.search import SEARCH_RANK, search_rooms
+from bookings.serializers import (
+    AvailabilityWindowSerializer,
+    RoomAvailabilitySerializer,
+    RoomSerializer,
+)
+
+ROOM_ORDERING = {"price_per_night", "capacity", "number"}
+
+
+class AsyncBookingCreateSerializer(serializers.Serializer):
+    # Plain fields: a PrimaryKeyRelatedField would query synchronously.
+    room = serializers.IntegerField()
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+
+
+def json_response(data, status_code: int = status.HTTP_200_OK) -> HttpResponse:
+    return HttpResponse(
+        orjson.dumps(data, default=encode_fallback),
+        status=status_code,
+        content_type="application/json",
+    )
+
+
+def build_room_queryset(params):
+    # Runs in a thread: the availability index may load from the database.
+    filterset = RoomFilter(data=params, queryset=Room.objects.all())
+    if not filterset.is_valid():
+        raise serializers.ValidationError(filterset.errors)
+    qs = filterset.qs
+    ordering = params.get("ordering", "")
+    if ordering.lstrip("-") in ROOM_ORDERING:
+        qs = qs.order_by(ordering)
+
+    # As RankedSearchFilter: by relevance unless the client orders.
+    text = params.get("search", "")
+    if text.strip():
+        qs = search_rooms(qs, text)
+        if "ordering" not in params:
+            qs = qs.order_by(
+                f"-{SEARCH_RANK}", *(qs.query.order_by or Room._meta.ordering)
+            )
+    return qs
+
+
+@require_GET
+async def room_list(request) -> HttpResponse:
+    """
+    Async counterpart of ``GET /api/rooms/`` with the RoomFilter filters,
+    ``search`` and ``ordering``.
+    """
+    try:
+        qs = await sync_to_async(build_room_queryset)(request.GET)
+    except serializers.ValidationError as exc:
+        return json_response(exc.detail, status.HTTP_400_BAD_REQUEST)
+
+    rooms = [room async for room in qs]
+    return json_response(RoomSerializer(rooms, many=True).data)
+
+
+@require_GET
+async def room_availability(request, pk: int) -> HttpResponse:
+    """
+    Async counterpart of ``GET /api/rooms/<pk>/availability/``.
+    """
+    window = AvailabilityWindowSerializer(data=request.GET)
+    if not window.is_valid():
+        return json_response(window.errors, status.HTTP_400_BAD_REQUEST)
+    start = window.validated_data["start_date"]
+    end = window.validated_data["end_date"]
+
+    room = await Room.objects.filter(pk=pk).only("price_per_night").afirst()
+    if room is None:
+        return json_response({"detail": "No Room matches the given query."}, 404)
+
+    serializer = RoomAvailabilitySerializer(
+        {
+            "room": room.pk,
+            "price_per_night": room.price_per_night,
+            "start_date": start,
+            "end_date": end,
+            "booked": await abooked_ranges(room.pk, start, end),
+        }
+    )
+    return json_response(serializer.data)
+
+
+@csrf_exempt
+@require_POST
+async def booking_create(request) -> HttpResponse:
+    """
+    Async counterpart of ``POST /api/bookings/``. Requires a JWT; honours
+    ``Idempotency-Key`` like the sync endpoint.
+    """
+    try:
+        result = await sync_to_async(CachedJWTAuthentication().authenticate)(request)
+    except APIException as exc:
+        return json_response({"detail": exc.detail}, exc.status_code)
+    if result is None:
+        return json_response(
+            {"detail": "Authentication credentials were not provided."},
+            status.HTTP_401_UNAUTHORIZED,
+        )
+    user, _ = result
+
+    try:
+        payload = orjson.loads(request.body)
+    except orjson.JSONDecodeError:
+        return json_response({"detail": "JSON parse error"}, 400)
+
+    serializer = AsyncBookingCreateSerializer(data=payload)
+    if not serializer.is_valid():
+        return json_response(serializer.errors, status.HTTP_400_BAD_REQUEST)
+    data = serializer.validated_data
+
+    if not await Room.objects.filter(pk=data["room"]).aexists():
+        return json_response(
+            {"room": [f'Invalid pk "{data["room"]}" - object does not exist.']},
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+    key = request.headers.get(idempotency.HEADER)
+    if not key:
+        return await sync_to_async(create_booking)(user, data)
+    # Same scope and fingerprint as the sync API, so a retry may switch paths.
+    return await sync_to_async(idempotency.run_once)(
+        user,
+        idempotency.SCOPE_BOOKING_CREATE,
+        key,
+        [payload, [], {}],
+        partial(create_booking, user, data),
+    )
+
+
+def create_booking(user, data) -> HttpResponse:
+    try:
+        booking = Booking.objects.create(
+            user=user,
+            room_id=data["room"],
+            start_date=data["start_date"],
+            end_date=data["end_date"],
+        )
+    except DjangoValidationError as e:
+        errors = (
+            e.message_dict
+            if hasattr(e, "error_dict")
+            else {NON_FIELD_ERRORS: e.messages}
+        )
+        return json_response(errors, status.HTTP_400_BAD_REQUEST)
+
+    return json_response(
+        {
+            "id": booking.pk,
+            "room": booking.room_id,
+            "start_date": booking.start_date,
+            "end_date": booking.end_date,
+        },
+        status.HTTP_201_CREATED,
+    )
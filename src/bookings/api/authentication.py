@@ -0,0 +1,159 @@
+"""
+JWT authentication that resolves users without a query per request.
+
+Users are looked up in a small per-process LRU with a TTL, then in the shared
+Django cache, and only then in the database. Neither layer holds the user
+itself: only its id, ``is_active``, ``is_staff`` and a stamp of the password
+hash, from which a user with every other field deferred is rebuilt. User
+saves and deletes drop the entry from both layers (see ``bookings.signals``);
+other processes' LRUs catch up within ``JWT_USER_CACHE_TTL`` seconds.
+
+Views may list actions in ``claims_only_auth_actions``. Safe requests to
+those actions get a ``TokenUser`` built from the token claims alone, skipping
+the user lookup entirely - suitable only where the view never needs more than
+the user id.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+def user_snapshot(user) -> dict[str, Any]:
+    return {
+        "id": user.pk,
+        "is_active": user.is_active,
+        "is_staff": user.is_staff,
+        "password_stamp": get_md5_hash_password(user.password),
+    }
+
+
+def snapshot_user(snapshot: dict[str, Any]):
+    # The remaining fields are deferred and load on first access.
+    User = get_user_model()
+    fields = [f.attname for f in User._meta.concrete_fields if f.attname in snapshot]
+    return User.from_db(None, fields, [snapshot[name] for name in fields])
+
+
+class UserCache:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+
+    @staticmethod
+    def _key(user_id) -> str:
+        return f"bookings:auth-user:{user_id}"
+
+    def get(self, user_id) -> Optional[dict[str, Any]]:
+        user_id = str(user_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                expires_at, snapshot = entry
+                if expires_at > now:
+                    self._entries.move_to_end(user_id)
+                    return snapshot
+                del self._entries[user_id]
+
+        snapshot = cache.get(self._key(user_id))
+        if snapshot is not None:
+            self._remember(user_id, snapshot)
+        return snapshot
+
+    def set(self, user_id, user) -> None:
+        user_id = str(user_id)
+        snapshot = user_snapshot(user)
+        cache.set(
+            self._key(user_id), snapshot, timeout=settings.JWT_USER_SHARED_CACHE_TTL
+        )
+        self._remember(user_id, snapshot)
+
+    def _remember(self, user_id, snapshot) -> None:
+        with self._lock:
+            self._entries[user_id] = (
+                time.monotonic() + settings.JWT_USER_CACHE_TTL,
+                snapshot,
+            )
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > settings.JWT_USER_CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id) -> None:
+        # Tokens carry the id as a string; signals pass the model value.
+        user_id = str(user_id)
+        with self._lock:
+            self._entries.pop(user_id, None)
+        cache.delete(self._key(user_id))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+def claims_only_request(request) -> bool:
+    if request.method not in SAFE_METHODS:
+        return False
+    view = (getattr(request, "parser_context", None) or {}).get("view")
+    return getattr(view, "action", None) in getattr(
+        view, "claims_only_auth_actions", ()
+    )
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        if claims_only_request(request):
+            return self.get_token_user(validated_token), validated_token
+        return self.get_user(validated_token), validated_token
+
+    def get_token_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        return api_settings.TOKEN_USER_CLASS(validated_token)
+
+    def get_user(self, validated_token):
+        user_id: Optional[Any] = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        snapshot = user_cache.get(user_id)
+        if snapshot is None:
+            # Runs the lookup and all checks; only valid users get cached.
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+            return user
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not snapshot["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if (
+            api_settings.CHECK_REVOKE_TOKEN
+            and validated_token.get(api_settings.REVOKE_TOKEN_CLAIM)
+            != snapshot["password_stamp"]
+        ):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
+        return snapshot_user(snapshot)
@@ -1,17 +1,33 @@
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.filters import OrderingFilter
 from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 
+from bookings.api.concurrency import OptimisticConcurrencyMixin
 from bookings.api.filters import BookingFilter
-from bookings.models import Booking
+from bookings.api.pagination import BookingCursorPagination
+from bookings.export import CONTENT_TYPES, FORMAT_CSV, FORMATS, export_rows, render
+from bookings.idempotency import SCOPE_BOOKING_CREATE, idempotent
+from bookings.importing import (
+    REPORT_CONTENT_TYPE,
+    import_bookings,
+    render_report,
+    text_stream,
+)
+from bookings.models import Booking, BookingVersionConflict
 from bookings.permissions import IsOwnerOrAdmin
-from bookings.serializers import BookingCreateSerializer, BookingSerializer
+from bookings.serializers import (
+    BookingCreateSerializer,
+    BookingRowSerializer,
+    BookingSerializer,
+)
 
 
-class BookingViewSet(viewsets.ModelViewSet):
+class BookingViewSet(OptimisticConcurrencyMixin, viewsets.ModelViewSet):
     """
     Booking Management Endpoint.
 
@@ -24,11 +40,18 @@ class BookingViewSet(viewsets.ModelViewSet):
         Retrieve a single booking by its ID.
 
     create:
-        Create a new booking for authenticated users.
+        Create a new booking for authenticated users. Send an
+        ``Idempotency-Key`` header to make retries safe: a repeated request
+        replays the first response instead of booking again.
 
     my:
         Retrieve all bookings for the authenticated user.
 
+    list and my are cursor-paginated on (start_date, id); pass ``ordering``
+    as ``start_date`` or ``-start_date`` (default). Both serialize from
+    ``values()`` rows through BookingRowSerializer, which renders the same
+    JSON as BookingSerializer without building model instances.
+
     update / partial_update:
         Update an existing booking. Only allowed for the owner or admin.
 
@@ -37,15 +60,29 @@ class BookingViewSet(viewsets.ModelViewSet):
 
     cancel:
         Cancel a booking. Only allowed for the owner or admin.
+
+    retrieve, update, partial_update and cancel return the booking's
+    ``ETag``. Send it back in ``If-Match`` on update, partial_update, destroy
+    or cancel to get ``412`` instead of overwriting a newer version; writes
+    that race a concurrent edit get ``409``.
+
+    export:
+        Stream all matching bookings as CSV or NDJSON. Staff only.
+
+    import:
+        Bulk-load bookings from a CSV or NDJSON file, validated as a set.
+        Staff only.
     """
 
     queryset = Booking.objects.select_related("room", "user").all()
     filterset_class = BookingFilter
     filter_backends = [DjangoFilterBackend, OrderingFilter]
-    ordering_fields = ("start_date", "end_date", "created_at")
+    pagination_class = BookingCursorPagination
+    # Only keys backed by a (start_date, id) index can be paginated cheaply.
+    ordering_fields = ("start_date",)
 
     def get_permissions(self):
-        if self.action == "list":
+        if self.action in ("list", "export", "bulk_import"):
             return [IsAdminUser()]
         if self.action in ("create", "my"):
             return [IsAuthenticated()]
@@ -58,6 +95,19 @@ class BookingViewSet(viewsets.ModelViewSet):
             return BookingCreateSerializer
         return BookingSerializer
 
+    @idempotent(SCOPE_BOOKING_CREATE)
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        return self.list_rows(self.filter_queryset(self.get_queryset()))
+
+    def list_rows(self, qs):
+        rows = qs.values(*BookingRowSerializer.values)
+        page = self.paginate_queryset(rows)
+        data = BookingRowSerializer().to_representation(rows if page is None else page)
+        return self.get_paginated_response(data) if page is not None else Response(data)
+
     @action(detail=False, methods=["get"])
     def my(self, request):
         """
@@ -70,13 +120,7 @@ class BookingViewSet(viewsets.ModelViewSet):
             IsAuthenticated
         """
         qs = self.filter_queryset(self.get_queryset().filter(user=request.user))
-        page = self.paginate_queryset(qs)
-        serializer = self.get_serializer(page or qs, many=True)
-        return (
-            self.get_paginated_response(serializer.data)
-            if page is not None
-            else Response(serializer.data)
-        )
+        return self.list_rows(qs)
 
     @action(detail=True, methods=["post"], url_path="cancel")
     def cancel(self, request, pk=None):
@@ -90,10 +134,95 @@ class BookingViewSet(viewsets.ModelViewSet):
         Path Parameters:
             - pk: Booking ID
 
+        Headers:
+            - If-Match: optional ETag the booking must still have.
+
         Responses:
-            - 200: Booking successfully cancelled.
+            - 200: Booking successfully cancelled (or already was).
             - 403: Not allowed.
+            - 409: Booking changed after the If-Match check.
+            - 412: If-Match does not match the booking's ETag.
         """
         booking = self.get_object()
-        booking.cancel(by_user=request.user)
+        booking.cancel(
+            by_user=request.user, expected_version=self.expected_version(booking)
+        )
         return Response({"detail": "cancelled"})
+
+    def perform_destroy(self, instance):
+        # Same conditional write as Booking.save(); post_delete still fires.
+        deleted, _ = Booking.objects.filter(
+            pk=instance.pk, version=instance.version
+        ).delete()
+        if not deleted:
+            raise BookingVersionConflict
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """
+        Stream bookings for offline processing.
+
+        GET:
+            Accepts the same filters as the booking list. Rows are read with
+            a server-side cursor and streamed as they are encoded.
+
+        Query Parameters:
+            - export_format: ``csv`` (default) or ``ndjson``.
+
+        Permissions:
+            IsAdminUser
+        """
+        fmt = request.query_params.get("export_format", FORMAT_CSV)
+        if fmt not in FORMATS:
+            raise ValidationError(
+                {"export_format": f"Expected one of: {', '.join(FORMATS)}"}
+            )
+
+        qs = self.filter_queryset(self.get_queryset())
+        response = StreamingHttpResponse(
+            render(export_rows(qs), fmt), content_type=CONTENT_TYPES[fmt]
+        )
+        response["Content-Disposition"] = f'attachment; filename="bookings.{fmt}"'
+        return response
+
+    @action(detail=False, methods=["post"], url_path="import", url_name="import")
+    def bulk_import(self, request):
+        """
+        Import bookings from a channel manager file.
+
+        POST (multipart):
+            - file: CSV with a header row, or NDJSON; the columns of the
+              export - user, room_number or room_id, start_date, end_date,
+              status (optional, default active). Other columns are ignored.
+            - import_format: ``csv`` (default) or ``ndjson``.
+            - dry_run: ``1`` to validate without writing.
+
+        The file is validated as a whole (see bookings/importing.py); valid
+        rows are inserted in chunks before the response starts, which then
+        streams an NDJSON report:
+        ``{"line", "field", "error"}`` per rejected row, then
+        ``{"summary": {...}}``.
+
+        Permissions:
+            IsAdminUser
+        """
+        fmt = request.data.get("import_format", FORMAT_CSV)
+        if fmt not in FORMATS:
+            raise ValidationError(
+                {"import_format": f"Expected one of: {', '.join(FORMATS)}"}
+            )
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": "This field is required."})
+
+        # Import first, inside the request: only the report is streamed.
+        records = list(
+            import_bookings(
+                text_stream(upload),
+                fmt,
+                dry_run=request.data.get("dry_run") in ("1", "true"),
+            )
+        )
+        return StreamingHttpResponse(
+            render_report(records), content_type=REPORT_CONTENT_TYPE
+        )
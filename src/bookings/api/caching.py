@@ -0,0 +1,107 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from bookings.holds import hold_expiries
+from bookings.versions import ROOMS_VERSION_KEY, get_version, room_version_key
+
+SCOPE_ROOMS = "rooms"
+SCOPE_ROOM = "room"
+
+
+def versioned_cache(scope: str, window=None):
+    """
+    Cache a GET action's rendered response under the current data version.
+
+    ``scope`` picks the counter: ``"rooms"`` for the global one, ``"room"``
+    for the counter of the room in the ``pk`` URL kwarg. The key (and the
+    strong ETag derived from it) covers the path, query string, negotiated
+    media type and version, so a matching ``If-None-Match`` is answered with
+    ``304`` before any query runs, and a cache hit skips the view and the
+    serializer entirely.
+
+    ``window`` is the serializer of an action whose date window has
+    defaults (``start_date`` is today when omitted): the resolved window is
+    keyed too, so yesterday's default response is never served today. An
+    invalid window skips the cache and lets the action answer ``400``.
+
+    Room lists hide held rooms, and a lapsing hold bumps no version, so the
+    ``"rooms"`` scope also keys on the expiry times of live holds.
+
+    Requires ``VersionedCacheMixin`` on the view, which stores the rendered
+    response on the way out.
+    """
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            renderer = getattr(request, "accepted_renderer", None)
+            if renderer is None or renderer.format == "api":
+                # The browsable API embeds per-user forms; never share it.
+                return method(self, request, *args, **kwargs)
+
+            if scope == SCOPE_ROOM:
+                version = get_version(room_version_key(kwargs.get("pk")))
+            else:
+                version = f"{get_version(ROOMS_VERSION_KEY)}|{hold_expiries()}"
+            params = sorted(request.query_params.lists())
+            fingerprint = f"{request.path}|{params}|{request.accepted_media_type}"
+            if window is not None:
+                resolved = window(data=request.query_params)
+                if not resolved.is_valid():
+                    return method(self, request, *args, **kwargs)
+                start = resolved.validated_data["start_date"]
+                end = resolved.validated_data["end_date"]
+                fingerprint = f"{fingerprint}|{start}|{end}"
+            digest = hashlib.sha1(f"{fingerprint}|{version}".encode()).hexdigest()
+            etag = f'"{digest}"'
+
+            if etag in parse_etags(request.headers.get("If-None-Match", "")):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+                response["ETag"] = etag
+                patch_vary_headers(response, ["Accept"])
+                return response
+
+            cached = cache.get(f"bookings:room-api:response:{digest}")
+            if cached is not None:
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+                response["ETag"] = etag
+                patch_vary_headers(response, ["Accept"])
+                return response
+
+            response = method(self, request, *args, **kwargs)
+            response._versioned_cache_key = f"bookings:room-api:response:{digest}"
+            response["ETag"] = etag
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+class VersionedCacheMixin:
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = getattr(response, "_versioned_cache_key", None)
+        if key is None:
+            return response
+        if response.status_code != status.HTTP_200_OK:
+            del response["ETag"]
+            return response
+
+        patch_vary_headers(response, ["Accept"])
+        response.render()
+        cache.set(
+            key,
+            (response.content, response["Content-Type"]),
+            timeout=settings.ROOM_API_CACHE_TIMEOUT,
+        )
+        return response
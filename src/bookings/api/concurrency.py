@@ -0,0 +1,76 @@
+"""
+Optimistic concurrency for detail endpoints of versioned models (Booking).
+
+Responses about one object carry a strong ``ETag`` built from its ``pk`` and
+``version``. Unsafe requests may send it back in ``If-Match``:
+    - a tag that no longer matches gets ``412 Precondition Failed`` before
+      anything is written;
+    - a write that loses the race between that check and its conditional
+      ``UPDATE ... WHERE version = n`` gets ``409 Conflict``, as does any
+      write, with or without ``If-Match``, over a concurrent edit.
+"""
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from bookings.models import VERSION_CONFLICT_ERROR, BookingVersionConflict
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = "If-Match does not match the current version"
+    default_code = "precondition_failed"
+
+
+class VersionConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = VERSION_CONFLICT_ERROR
+    default_code = "version_conflict"
+
+
+def etag(obj) -> str:
+    return f'"{obj.pk}.{obj.version}"'
+
+
+def if_match(header: str, tag: str) -> bool:
+    """RFC 9110 ``If-Match``: strong comparison, weak tags never match."""
+    if header.strip() == "*":
+        return True
+    return tag in (candidate.strip() for candidate in header.split(","))
+
+
+class OptimisticConcurrencyMixin:
+    """
+    ETag / If-Match for a ``GenericAPIView`` over a model with a ``version``
+    field that raises ``BookingVersionConflict`` on stale writes.
+    """
+
+    _etag_object = None
+
+    def get_object(self):
+        obj = super().get_object()
+        header = self.request.headers.get("If-Match")
+        if self.request.method not in SAFE_METHODS and header is not None:
+            if not if_match(header, etag(obj)):
+                raise PreconditionFailed
+        self._etag_object = obj
+        return obj
+
+    def expected_version(self, obj):
+        """``obj.version`` if the client made the request conditional on it."""
+        return obj.version if "If-Match" in self.request.headers else None
+
+    def handle_exception(self, exc):
+        if isinstance(exc, BookingVersionConflict):
+            exc = VersionConflict()
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        obj = self._etag_object
+        if obj is not None and status.is_success(response.status_code):
+            if response.status_code != status.HTTP_204_NO_CONTENT:
+                response["ETag"] = etag(obj)
+        return response
@@ -1,6 +1,31 @@
 from django_filters.rest_framework import FilterSet, filters
+from rest_framework.filters import OrderingFilter, SearchFilter
 
+from bookings.availability import exclude_booked
+from bookings.holds import held_room_ids
 from bookings.models import Booking, Room
+from bookings.search import SEARCH_RANK, ranked_search
+
+
+class RankedSearchFilter(SearchFilter):
+    """
+    ``SearchFilter`` over ``bookings.search``: trigram-indexed on PostgreSQL
+    and ordered by relevance unless the client passes ``ordering``.
+
+    ``search_fields`` must be plain field names (no ``^``/``=``/``@`` prefixes).
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        text = request.query_params.get(self.search_param, "")
+        if not search_fields or not text.strip():
+            return queryset
+
+        queryset = ranked_search(queryset, text, search_fields)
+        if OrderingFilter.ordering_param in request.query_params:
+            return queryset
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        return queryset.order_by(f"-{SEARCH_RANK}", *ordering)
 
 
 class RoomFilter(FilterSet):
@@ -19,9 +44,10 @@ class RoomFilter(FilterSet):
 
     def filter_available(self, queryset, name, value):
         """
-        Exclude rooms that are already booked in the provided date range.
+        Exclude rooms that are already booked or held for checkout in the
+        provided date range.
         """
-        data = self.data or {}
+        data = self.form.cleaned_data
 
         start = data.get("start_date")
         end = data.get("end_date")
@@ -29,13 +55,9 @@ class RoomFilter(FilterSet):
         if not start or not end:
             return queryset
 
-        overlapping = Booking.objects.filter(
-            status=Booking.STATUS_ACTIVE,
-            start_date__lt=end,
-            end_date__gt=start,
-        ).values_list("room_id", flat=True)
-
-        return queryset.exclude(id__in=overlapping)
+        queryset = exclude_booked(queryset, start, end)
+        held = held_room_ids(start, end)
+        return queryset.exclude(id__in=held) if held else queryset
 
     class Meta:
         model = Room
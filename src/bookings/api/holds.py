@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+
+from drf_spectacular.utils import extend_schema
+from rest_framework import status, viewsets
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from bookings.availability import room_has_overlap
+from bookings.holds import HoldConflict, place_hold, release_hold
+from bookings.models import HOLD_ERROR, OVERLAP_ERROR
+from bookings.serializers import RoomHoldSerializer
+
+
+class RoomHoldViewSet(viewsets.ViewSet):
+    """
+    Checkout holds.
+
+    create:
+        Hold a room for a date range for ``ROOM_HOLD_TTL`` seconds while the
+        guest completes checkout. Other guests cannot book overlapping dates
+        meanwhile and the room drops out of availability searches. Holding
+        again replaces the guest's previous hold on the room; booking the
+        dates consumes it.
+
+    destroy:
+        Release a hold by its token.
+
+    Permissions:
+        IsAuthenticated
+
+    Responses:
+        - 201: Hold placed.
+        - 400: Invalid room or dates.
+        - 409: Room already booked or held by another guest.
+    """
+
+    permission_classes = [IsAuthenticated]
+    lookup_value_regex = r"[^/]+"
+
+    @extend_schema(request=RoomHoldSerializer, responses=RoomHoldSerializer)
+    def create(self, request):
+        serializer = RoomHoldSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        room, start, end = (
+            serializer.validated_data[name]
+            for name in ("room", "start_date", "end_date")
+        )
+
+        if room_has_overlap(room, start, end):
+            return Response({"detail": OVERLAP_ERROR}, status=status.HTTP_409_CONFLICT)
+        try:
+            hold = place_hold(request.user.pk, room, start, end)
+        except HoldConflict:
+            return Response({"detail": HOLD_ERROR}, status=status.HTTP_409_CONFLICT)
+
+        data = RoomHoldSerializer(
+            {
+                "token": hold.token,
+                "room": hold.room_id,
+                "start_date": hold.start_date,
+                "end_date": hold.end_date,
+                "expires_at": datetime.fromtimestamp(hold.expires_at, tz=timezone.utc),
+            }
+        ).data
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    def destroy(self, request, pk=None):
+        if not release_hold(pk, request.user.pk):
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        return Response(status=status.HTTP_204_NO_CONTENT)
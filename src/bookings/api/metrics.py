@@ -0,0 +1,23 @@
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from bookings.db_pool import pool_metrics
+
+
+class DatabasePoolMetricsView(APIView):
+    """
+    Connection pool metrics of the worker process serving the request.
+
+    GET:
+        Per database alias: pool mode, connections opened and, when pooling
+        is enabled, utilisation, checkout wait time and checkout failures.
+
+    Permissions:
+        IsAdminUser
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(pool_metrics())
@@ -0,0 +1,102 @@
+from django.core.exceptions import ValidationError
+from django.db.models import F
+from django.db.models.fields.tuple_lookups import (
+    Tuple,
+    TupleGreaterThan,
+    TupleLessThan,
+)
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor pagination over a composite ``(ordering field, id)`` key.
+
+    DRF's ``CursorPagination`` keys on the first ordering field only and
+    falls back to an OFFSET to step over ties. Here the cursor carries both
+    the field value and the primary key of the boundary row, so every page -
+    however deep - is a single range scan on an index ending in ``id``, and
+    rows inserted concurrently never shift or repeat page contents.
+
+    Only the first ordering field is used; ``id`` breaks ties in the same
+    direction, so a single index on ``(field, id)`` serves both orderings,
+    read forwards or backwards. Views should only allow ordering on fields
+    indexed together with ``id``.
+    """
+
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.model = queryset.model
+        self.key_field = self.ordering[0].lstrip("-")
+        self.descending = self.ordering[0].startswith("-")
+
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor.reverse if self.cursor else False
+
+        descending = self.descending != reverse
+        queryset = queryset.order_by(
+            f"-{self.key_field}" if descending else self.key_field,
+            "-pk" if descending else "pk",
+        )
+        if self.cursor is not None and self.cursor.position is not None:
+            queryset = queryset.filter(self._after(self.cursor.position, reverse))
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+        return self.page
+
+    def _after(self, position: str, reverse: bool):
+        try:
+            value, pk = position.rsplit("|", 1)
+            value = self.model._meta.get_field(self.key_field).to_python(value)
+            pk = int(pk)
+        except (ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        # (key, id) < (value, pk): a row-value comparison the index can seek.
+        lookup = TupleLessThan if self.descending != reverse else TupleGreaterThan
+        return lookup(Tuple(F(self.key_field), F("pk")), (value, pk))
+
+    def _get_position_from_instance(self, instance, ordering):
+        if isinstance(instance, dict):
+            value, pk = instance[self.key_field], instance["id"]
+        else:
+            value, pk = getattr(instance, self.key_field), instance.pk
+        value = value.isoformat() if hasattr(value, "isoformat") else value
+        return f"{value}|{pk}"
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        position = self._get_position_from_instance(self.page[-1], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        position = self._get_position_from_instance(self.page[0], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+
+class BookingCursorPagination(KeysetCursorPagination):
+    ordering = "-start_date"
@@ -1,14 +1,35 @@
 from django_filters.rest_framework import DjangoFilterBackend
+from drf_spectacular.utils import extend_schema
 from rest_framework import viewsets
-from rest_framework.filters import OrderingFilter, SearchFilter
-from rest_framework.permissions import AllowAny
+from rest_framework.decorators import action
+from rest_framework.filters import OrderingFilter
+from rest_framework.generics import get_object_or_404
+from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.response import Response
 
-from bookings.api.filters import RoomFilter
+from bookings.api.caching import (
+    SCOPE_ROOM,
+    SCOPE_ROOMS,
+    VersionedCacheMixin,
+    versioned_cache,
+)
+from bookings.api.filters import RankedSearchFilter, RoomFilter
+from bookings.availability import booked_ranges
 from bookings.models import Room
-from bookings.serializers import RoomSerializer
+from bookings.occupancy import occupancy
+from bookings.pricing import quote_totals
+from bookings.serializers import (
+    AvailabilityWindowSerializer,
+    AvailableRoomsQuerySerializer,
+    OccupancyQuerySerializer,
+    QuoteQuerySerializer,
+    QuoteSerializer,
+    RoomAvailabilitySerializer,
+    RoomSerializer,
+)
 
 
-class RoomViewSet(viewsets.ReadOnlyModelViewSet):
+class RoomViewSet(VersionedCacheMixin, viewsets.ReadOnlyModelViewSet):
     """
     Room Management Endpoint.
 
@@ -22,6 +43,15 @@ class RoomViewSet(viewsets.ReadOnlyModelViewSet):
 
     availability:
         Retrieve booked dates and pricing for a specific room.
+
+    quote:
+        Price one stay in every matching available room.
+
+    occupancy:
+        Rooms x dates occupancy grid for the front desk. Staff only.
+
+    Public responses are cached per data version and carry a strong ETag;
+    send it back in ``If-None-Match`` to get ``304 Not Modified``.
     """
 
     queryset = Room.objects.all()
@@ -32,7 +62,173 @@ class RoomViewSet(viewsets.ReadOnlyModelViewSet):
     filter_backends = [
         DjangoFilterBackend,
         OrderingFilter,
-        SearchFilter,
+        RankedSearchFilter,
     ]
     ordering_fields = ["price_per_night", "capacity", "number"]
     search_fields = ["number", "name"]
+    # Public reads never look at the user; don't load it for them.
+    claims_only_auth_actions = (
+        "list",
+        "retrieve",
+        "available",
+        "availability",
+        "quote",
+    )
+
+    def get_permissions(self):
+        if self.action == "occupancy":
+            return [IsAdminUser()]
+        return super().get_permissions()
+
+    @versioned_cache(SCOPE_ROOMS)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @versioned_cache(SCOPE_ROOM)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @extend_schema(parameters=[AvailableRoomsQuerySerializer])
+    @action(detail=False, methods=["get"])
+    @versioned_cache(SCOPE_ROOMS)
+    def available(self, request):
+        """
+        Retrieve rooms available within a given date range.
+
+        GET:
+            Same filters as the room list, but ``start_date`` and
+            ``end_date`` are required and the window size is limited.
+
+        Responses:
+            - 200: Rooms free for the whole window.
+            - 400: Missing dates or invalid window.
+        """
+        window = AvailableRoomsQuerySerializer(data=request.query_params)
+        window.is_valid(raise_exception=True)
+
+        qs = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(qs)
+        serializer = self.get_serializer(qs if page is None else page, many=True)
+        return (
+            self.get_paginated_response(serializer.data)
+            if page is not None
+            else Response(serializer.data)
+        )
+
+    @extend_schema(
+        parameters=[AvailabilityWindowSerializer],
+        responses=RoomAvailabilitySerializer,
+    )
+    @action(detail=True, methods=["get"])
+    @versioned_cache(SCOPE_ROOM, window=AvailabilityWindowSerializer)
+    def availability(self, request, pk=None):
+        """
+        Retrieve booked dates and pricing for a specific room.
+
+        GET:
+            Returns merged booked ranges within the window. Ranges are
+            half-open: ``end_date`` is the check-out day and is free.
+
+        Query Parameters:
+            - start_date: Window start, defaults to today.
+            - end_date: Window end, defaults to 30 days after start.
+
+        Responses:
+            - 200: Booked ranges and nightly price.
+            - 400: Invalid window.
+            - 404: Room not found.
+        """
+        window = AvailabilityWindowSerializer(data=request.query_params)
+        window.is_valid(raise_exception=True)
+        start = window.validated_data["start_date"]
+        end = window.validated_data["end_date"]
+
+        # Not get_object(): the room filters would drop a booked room here.
+        room = get_object_or_404(self.get_queryset(), pk=pk)
+        self.check_object_permissions(request, room)
+        serializer = RoomAvailabilitySerializer(
+            {
+                "room": room.pk,
+                "price_per_night": room.price_per_night,
+                "start_date": start,
+                "end_date": end,
+                "booked": booked_ranges(room.pk, start, end),
+            }
+        )
+        return Response(serializer.data)
+
+    @extend_schema(parameters=[QuoteQuerySerializer], responses=QuoteSerializer)
+    @action(detail=False, methods=["get"])
+    @versioned_cache(SCOPE_ROOMS)
+    def quote(self, request):
+        """
+        Price a stay in many rooms at once.
+
+        GET:
+            Same filters as ``available``; every room free for
+            ``[start_date, end_date)`` gets the stay's total price from its
+            rate plans (base price on nights no plan covers).
+
+        Query Parameters:
+            - start_date, end_date: The stay, required.
+            - room: Optional room IDs to restrict the quote to.
+
+        Responses:
+            - 200: One quote per available room.
+            - 400: Missing dates or invalid window.
+        """
+        query = QuoteQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        start = query.validated_data["start_date"]
+        end = query.validated_data["end_date"]
+
+        rooms = self.filter_queryset(self.get_queryset())
+        if query.validated_data.get("room"):
+            rooms = rooms.filter(pk__in=query.validated_data["room"])
+        rooms = list(rooms.values_list("pk", "number"))
+        totals = quote_totals([pk for pk, _ in rooms], start, end)
+        serializer = QuoteSerializer(
+            {
+                "start_date": start,
+                "end_date": end,
+                "nights": (end - start).days,
+                "quotes": [
+                    {"room": pk, "number": number, "total_price": totals[pk]}
+                    for pk, number in rooms
+                ],
+            }
+        )
+        return Response(serializer.data)
+
+    @extend_schema(parameters=[OccupancyQuerySerializer])
+    @action(detail=False, methods=["get"])
+    def occupancy(self, request):
+        """
+        Occupancy grid of every room over a date window.
+
+        GET:
+            One row per room (ordered by ID), one column per night in
+            ``[start_date, end_date)``. Rows are encoded as:
+                - rle: flat ``[offset, length, ...]`` booked runs.
+                - bitset: base64 of the nights packed MSB-first.
+
+        Query Parameters:
+            - start_date: Window start, defaults to today.
+            - end_date: Window end, defaults to 90 days after start.
+            - encoding: ``rle`` (default) or ``bitset``.
+
+        Permissions:
+            IsAdminUser
+        """
+        query = OccupancyQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        rooms = list(self.get_queryset().order_by("id").values_list("id", "number"))
+        return Response(
+            occupancy(
+                rooms,
+                query.validated_data["start_date"],
+                query.validated_data["end_date"],
+                query.validated_data["encoding"],
+            )
+        )
@@ -0,0 +1,354 @@
+"""
+Room availability lookups.
+
+Every "is this room free?" question in the project boils down to the same
+predicate: an active booking for the room with ``start_date < end`` and
+``end_date > start``. This module owns that predicate and an optional
+in-process index that answers it without touching the database.
+
+The index keeps, per room, the active stays sorted by start date in parallel
+arrays. Active stays of one room never overlap (the database enforces it, see
+``BOOKING_OVERLAP_CONSTRAINT``), so the end dates are sorted too and an
+overlap test is a single ``bisect`` - O(log n) per room.
+
+Freshness:
+    - Writes in this process update the index through Booking signals once
+      they commit. Until then the writing connection answers its own
+      lookups from the database, which already sees the uncommitted rows.
+    - Writes in other processes bump a generation counter in the shared
+      cache; the index reloads when it sees a newer generation. It reads
+      the counter at most every ``AVAILABILITY_INDEX_SYNC_INTERVAL``
+      seconds, so lookups don't pay a cache round trip (a query, with the
+      database cache) each.
+    - ``AVAILABILITY_INDEX_TTL`` bounds staleness when neither applies
+      (e.g. rolled back transactions or a per-process cache backend).
+
+Settings:
+    AVAILABILITY_INDEX_ENABLED: answer lookups from the index instead of SQL.
+    AVAILABILITY_INDEX_CHECK: cross-check every index answer against the
+        database and raise ``AvailabilityIndexError`` on mismatch (tests).
+    AVAILABILITY_INDEX_TTL: seconds before a full reload.
+    AVAILABILITY_INDEX_SYNC_INTERVAL: seconds between generation checks.
+"""
+
+import threading
+import time
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Iterable, Optional
+
+from asgiref.local import Local
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.db.models import Exists, OuterRef, QuerySet
+
+GENERATION_CACHE_KEY = "bookings:availability-index:generation"
+
+
+class AvailabilityIndexError(AssertionError):
+    """Raised in check mode when the index disagrees with the database."""
+
+
+def overlapping_bookings(start: date, end: date) -> QuerySet:
+    Booking = apps.get_model("bookings", "Booking")
+    return Booking.objects.filter(
+        status=Booking.STATUS_ACTIVE,
+        start_date__lt=end,
+        end_date__gt=start,
+    )
+
+
+def merge_ranges(ranges: Iterable[tuple[date, date]]) -> list[tuple[date, date]]:
+    """
+    Merge start-sorted half-open ranges, joining back-to-back stays.
+    """
+    merged: list[tuple[date, date]] = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _room_stays(room_id: int, start: date, end: date) -> QuerySet:
+    return (
+        overlapping_bookings(start, end)
+        .filter(room_id=room_id)
+        .order_by("start_date")
+        .values_list("start_date", "end_date")
+    )
+
+
+def booked_ranges(room_id: int, start: date, end: date) -> list[tuple[date, date]]:
+    """
+    Merged booked ranges of one room, clipped to the ``[start, end)`` window.
+
+    One query over the ``(room, start_date, end_date)`` index.
+    """
+    rows = _room_stays(room_id, start, end)
+    return merge_ranges((max(s, start), min(e, end)) for s, e in rows)
+
+
+async def abooked_ranges(
+    room_id: int, start: date, end: date
+) -> list[tuple[date, date]]:
+    """Async variant of ``booked_ranges``."""
+    rows = [row async for row in _room_stays(room_id, start, end)]
+    return merge_ranges((max(s, start), min(e, end)) for s, e in rows)
+
+
+@dataclass
+class RoomIntervals:
+    starts: list[date] = field(default_factory=list)
+    ends: list[date] = field(default_factory=list)
+    ids: list[int] = field(default_factory=list)
+
+    def add(self, booking_id: int, start: date, end: date) -> None:
+        pos = bisect_right(self.starts, start)
+        self.starts.insert(pos, start)
+        self.ends.insert(pos, end)
+        self.ids.insert(pos, booking_id)
+
+    def discard(self, booking_id: int) -> None:
+        try:
+            pos = self.ids.index(booking_id)
+        except ValueError:
+            return
+        del self.starts[pos], self.ends[pos], self.ids[pos]
+
+    def overlaps(self, start: date, end: date, exclude: Optional[int] = None) -> bool:
+        # First stay ending after ``start``; it and its successors are the only
+        # candidates, and the first one starting at or after ``end`` stops us.
+        pos = bisect_right(self.ends, start)
+        while pos < len(self.starts) and self.starts[pos] < end:
+            if self.ids[pos] != exclude:
+                return True
+            pos += 1
+        return False
+
+
+class AvailabilityIndex:
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._rooms: dict[int, RoomIntervals] = {}
+        self._room_of: dict[int, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._synced_at: Optional[float] = None
+        self._generation: Optional[int] = None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._rooms = {}
+            self._room_of = {}
+            self._loaded_at = None
+            self._synced_at = None
+            self._generation = None
+
+    def load(self) -> None:
+        Booking = apps.get_model("bookings", "Booking")
+        # Always from the primary: the index backs the overlap check.
+        rows = (
+            Booking.objects.db_manager(router.db_for_write(Booking))
+            .filter(status=Booking.STATUS_ACTIVE)
+            .order_by("room_id", "start_date")
+            .values_list("room_id", "id", "start_date", "end_date")
+        )
+        cache.add(GENERATION_CACHE_KEY, 0, timeout=None)
+        generation = cache.get(GENERATION_CACHE_KEY)
+
+        rooms: dict[int, RoomIntervals] = {}
+        room_of: dict[int, int] = {}
+        for room_id, booking_id, start, end in rows.iterator(chunk_size=5000):
+            intervals = rooms.setdefault(room_id, RoomIntervals())
+            intervals.starts.append(start)
+            intervals.ends.append(end)
+            intervals.ids.append(booking_id)
+            room_of[booking_id] = room_id
+
+        with self._lock:
+            self._rooms = rooms
+            self._room_of = room_of
+            self._loaded_at = self._synced_at = time.monotonic()
+            self._generation = generation
+
+    def _ensure_loaded(self) -> None:
+        now = time.monotonic()
+        ttl = getattr(settings, "AVAILABILITY_INDEX_TTL", 60)
+        if self._loaded_at is None or now - self._loaded_at > ttl:
+            self.load()
+            return
+        interval = getattr(settings, "AVAILABILITY_INDEX_SYNC_INTERVAL", 1.0)
+        if now - self._synced_at >= interval:
+            self._synced_at = now
+            if cache.get(GENERATION_CACHE_KEY) != self._generation:
+                self.load()
+
+    def _bump_generation(self) -> None:
+        previous = self._generation
+        try:
+            generation = cache.incr(GENERATION_CACHE_KEY)
+        except ValueError:
+            generation = 1
+            cache.set(GENERATION_CACHE_KEY, generation, timeout=None)
+        self._generation = generation
+        # Someone else wrote since our last load; our local patch is not enough.
+        if previous is None or generation != previous + 1:
+            self._loaded_at = None
+
+    def _remove(self, booking_id: int) -> None:
+        room_id = self._room_of.pop(booking_id, None)
+        if room_id is not None:
+            self._rooms[room_id].discard(booking_id)
+
+    def update(self, booking) -> None:
+        """Apply a saved booking; called from the post_save signal."""
+        with self._lock:
+            self._remove(booking.pk)
+            if booking.status == booking.STATUS_ACTIVE:
+                intervals = self._rooms.setdefault(booking.room_id, RoomIntervals())
+                intervals.add(booking.pk, booking.start_date, booking.end_date)
+                self._room_of[booking.pk] = booking.room_id
+            self._bump_generation()
+
+    def discard(self, booking_id: int) -> None:
+        """Drop a deleted booking; called from the post_delete signal."""
+        with self._lock:
+            self._remove(booking_id)
+            self._bump_generation()
+
+    def invalidate(self) -> None:
+        """Force a reload, e.g. after a bulk ``QuerySet.update()``."""
+        with self._lock:
+            self._loaded_at = None
+            self._bump_generation()
+
+    def room_has_overlap(
+        self, room_id: int, start: date, end: date, exclude: Optional[int] = None
+    ) -> bool:
+        with self._lock:
+            self._ensure_loaded()
+            intervals = self._rooms.get(room_id)
+            return intervals is not None and intervals.overlaps(start, end, exclude)
+
+    def booked_room_ids(self, start: date, end: date) -> set[int]:
+        with self._lock:
+            self._ensure_loaded()
+            return {
+                room_id
+                for room_id, intervals in self._rooms.items()
+                if intervals.overlaps(start, end)
+            }
+
+
+availability_index = AvailabilityIndex()
+
+
+def index_enabled() -> bool:
+    return getattr(settings, "AVAILABILITY_INDEX_ENABLED", False)
+
+
+def _check_enabled() -> bool:
+    return getattr(settings, "AVAILABILITY_INDEX_CHECK", False)
+
+
+# Aliases whose open transaction has index changes waiting for commit
+_uncommitted = Local()
+
+
+def on_commit(func, *args, using: Optional[str] = None) -> None:
+    """
+    Apply an index change once the transaction on ``using`` commits.
+
+    A rolled back write never reaches the index. Meanwhile lookups on that
+    connection go to the database (``_pending``).
+    """
+    using = using or DEFAULT_DB_ALIAS
+    if connections[using].in_atomic_block:
+        if not hasattr(_uncommitted, "aliases"):
+            _uncommitted.aliases = set()
+        _uncommitted.aliases.add(using)
+
+    def apply() -> None:
+        getattr(_uncommitted, "aliases", set()).discard(using)
+        func(*args)
+
+    transaction.on_commit(apply, using=using)
+
+
+def _pending(using: Optional[str] = None) -> bool:
+    """Whether the open transaction on ``using`` has index changes queued."""
+    if using is None:
+        using = router.db_for_write(apps.get_model("bookings", "Booking"))
+    aliases = getattr(_uncommitted, "aliases", set())
+    if using not in aliases:
+        return False
+    if connections[using].in_atomic_block:
+        return True
+    # Rolled back: nothing will be applied.
+    aliases.discard(using)
+    return False
+
+
+def booked_room_ids(start: date, end: date) -> set[int]:
+    """
+    IDs of rooms with an active booking overlapping ``[start, end)``.
+    """
+    fallback = overlapping_bookings(start, end).values_list("room_id", flat=True)
+    if not index_enabled() or _pending():
+        return set(fallback)
+
+    room_ids = availability_index.booked_room_ids(start, end)
+    if _check_enabled() and room_ids != set(fallback):
+        raise AvailabilityIndexError(
+            f"Index returned {sorted(room_ids)} booked rooms for "
+            f"{start}..{end}, database returned {sorted(set(fallback))}"
+        )
+    return room_ids
+
+
+def exclude_booked(rooms: QuerySet, start: date, end: date) -> QuerySet:
+    """
+    ``rooms`` without those booked for ``[start, end)``.
+
+    With the index, by the booked IDs it holds in memory; otherwise with a
+    correlated ``NOT EXISTS`` rather than a materialised ID list.
+    """
+    if index_enabled() and not _pending():
+        return rooms.exclude(id__in=booked_room_ids(start, end))
+    booked = overlapping_bookings(start, end).filter(room_id=OuterRef("pk"))
+    return rooms.exclude(Exists(booked))
+
+
+def room_has_overlap(
+    room_id: int,
+    start: date,
+    end: date,
+    exclude: Optional[int] = None,
+    using: Optional[str] = None,
+) -> bool:
+    """
+    Whether ``room_id`` has an active booking overlapping ``[start, end)``.
+
+    ``using`` pins the database query (and the check-mode cross-check) to an
+    alias; the overlap check passes the primary so replica lag can't hide a
+    booking.
+    """
+    fallback = overlapping_bookings(start, end).filter(room_id=room_id)
+    if using is not None:
+        fallback = fallback.using(using)
+    if exclude is not None:
+        fallback = fallback.exclude(pk=exclude)
+    if not index_enabled() or _pending(using):
+        return fallback.exists()
+
+    overlaps = availability_index.room_has_overlap(room_id, start, end, exclude)
+    if _check_enabled() and overlaps != fallback.exists():
+        raise AvailabilityIndexError(
+            f"Index and database disagree on room {room_id} for {start}..{end}"
+        )
+    return overlaps
@@ -0,0 +1,231 @@
+"""
+Latency and query-count benchmark of the hot API and HTML endpoints.
+
+``seed_dataset()`` fills the database with rooms, guests and
+non-overlapping stays from ``bookings.seeding`` (deterministic for a given
+seed); ``run()`` sends each
+case's request ``repeat`` times through Django's test client - the full
+middleware, authentication and rendering stack - and records p50/p99
+latency and the SQL query count. ``compare()`` flags cases slower or
+chattier than a stored baseline. See ``manage.py benchmark``.
+
+Room list responses are cached (api/caching.py); the room API version is
+bumped before every request so the numbers are for the uncached path.
+"""
+
+import math
+import statistics
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from typing import Callable, Iterable, Optional
+
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from bookings.models import Room
+from bookings.seeding import plan, write
+from bookings.versions import bump_room_versions
+
+SEED_PREFIX = "bench-"
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Dataset:
+    rooms: list[int]
+    guest_id: int
+    # First date after every seeded stay; new bookings go from here on
+    free_from: date
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    # (client, dataset, iteration) -> response
+    request: Callable
+    status: int = 200
+    api: bool = True
+
+
+@dataclass
+class CaseResult:
+    name: str
+    p50_ms: float
+    p99_ms: float
+    queries: int
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile, so p99 of a few samples is their maximum."""
+    return sorted_values[max(0, math.ceil(len(sorted_values) * q) - 1)]
+
+
+def seed_dataset(rooms: int, bookings: int, users: int, seed: int = 0) -> Dataset:
+    """
+    Load ``rooms`` rooms, ``users`` guests and ``bookings`` bookings through
+    ``seeding.plan()`` / ``write()`` - the data ``manage.py seed_data``
+    loads - and describe it for the cases.
+    """
+    seed_plan = plan(rooms, bookings, users, seed=seed, prefix=SEED_PREFIX)
+    write(seed_plan)
+
+    room_ids = dict(
+        Room.objects.filter(number__startswith=SEED_PREFIX).values_list("number", "pk")
+    )
+    guest = get_user_model().objects.get(username=seed_plan.usernames[0])
+    last_end = (
+        date.fromordinal(int(seed_plan.ends.max())) if len(seed_plan) else date.today()
+    )
+    return Dataset(
+        rooms=[room_ids[number] for number in seed_plan.room_numbers],
+        guest_id=guest.pk,
+        free_from=max(last_end, date.today()) + timedelta(days=1),
+    )
+
+
+def _window(dataset: Dataset, i: int) -> dict:
+    start = date.today() + timedelta(days=i % 60)
+    return {"start_date": start, "end_date": start + timedelta(days=3)}
+
+
+def _new_booking(client: Client, dataset: Dataset, i: int):
+    # One free room-night range per iteration: rooms first, then later dates.
+    laps, index = divmod(i, len(dataset.rooms))
+    start = dataset.free_from + timedelta(days=laps * 2)
+    return client.post(
+        reverse("booking-list"),
+        {
+            "room": dataset.rooms[index],
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(days=1)).isoformat(),
+        },
+        content_type="application/json",
+    )
+
+
+ROOM_FILTERS = {
+    "min_price": 100,
+    "max_price": 400,
+    "capacity": 2,
+    "ordering": "price_per_night",
+}
+
+CASES = (
+    Case(
+        "api-rooms-filter",
+        lambda client, dataset, i: client.get(reverse("room-list"), ROOM_FILTERS),
+    ),
+    Case(
+        "api-rooms-available",
+        lambda client, dataset, i: client.get(
+            reverse("room-list"), _window(dataset, i)
+        ),
+    ),
+    Case(
+        "api-bookings-my",
+        lambda client, dataset, i: client.get(reverse("booking-my")),
+    ),
+    Case(
+        "html-rooms-list",
+        lambda client, dataset, i: client.get(
+            reverse("rooms_list"), {**ROOM_FILTERS, **_window(dataset, i)}
+        ),
+        api=False,
+    ),
+    Case(
+        "html-my-bookings",
+        lambda client, dataset, i: client.get(reverse("my_bookings")),
+        api=False,
+    ),
+    # Last: the bookings it creates would show up in the guest's lists.
+    Case("api-booking-create", _new_booking, status=201),
+)
+CASE_NAMES = tuple(case.name for case in CASES)
+
+
+def _clients(dataset: Dataset) -> tuple[Client, Client]:
+    guest = get_user_model().objects.get(pk=dataset.guest_id)
+    token = AccessToken.for_user(guest)
+    api = Client(headers={"Authorization": f"Bearer {token}"})
+    html = Client()
+    html.force_login(guest)
+    return api, html
+
+
+def run_case(case: Case, client: Client, dataset: Dataset, repeat: int) -> CaseResult:
+    # One untimed request warms per-process state (index, caches, templates).
+    iterations = range(repeat + 1)
+    timings, queries = [], 0
+    for i in iterations:
+        bump_room_versions()
+        with CaptureQueriesContext(connections["default"]) as captured:
+            started = time.perf_counter()
+            response = case.request(client, dataset, i)
+            elapsed = time.perf_counter() - started
+        if response.status_code != case.status:
+            raise BenchmarkError(
+                f"{case.name}: expected {case.status}, got {response.status_code}"
+            )
+        if i:
+            timings.append(elapsed)
+            queries = max(queries, len(captured))
+    timings.sort()
+    return CaseResult(
+        name=case.name,
+        p50_ms=statistics.median(timings) * 1000,
+        p99_ms=percentile(timings, 0.99) * 1000,
+        queries=queries,
+    )
+
+
+def run(
+    dataset: Dataset, repeat: int, names: Optional[Iterable[str]] = None
+) -> list[CaseResult]:
+    selected = set(names or CASE_NAMES)
+    api, html = _clients(dataset)
+    return [
+        run_case(case, api if case.api else html, dataset, repeat)
+        for case in CASES
+        if case.name in selected
+    ]
+
+
+def as_report(meta: dict, results: list[CaseResult]) -> dict:
+    return {
+        "meta": meta,
+        "cases": {
+            result.name: {k: v for k, v in asdict(result).items() if k != "name"}
+            for result in results
+        },
+    }
+
+
+def compare(baseline: dict, report: dict, threshold: float) -> list[str]:
+    """
+    Regressions of ``report`` against ``baseline``: a p50 or p99 more than
+    ``threshold`` (0.2 = 20%) slower, or any extra query.
+    """
+    regressions = []
+    for name, current in report["cases"].items():
+        base = baseline["cases"].get(name)
+        if base is None:
+            continue
+        for metric in ("p50_ms", "p99_ms"):
+            if current[metric] > base[metric] * (1 + threshold):
+                regressions.append(
+                    f"{name}: {metric} {current[metric]:.2f} > "
+                    f"{base[metric]:.2f} +{threshold:.0%}"
+                )
+        if current["queries"] > base["queries"]:
+            regressions.append(
+                f"{name}: {current['queries']} queries > {base['queries']}"
+            )
+    return regressions
@@ -0,0 +1,42 @@
+"""
+Which caches every worker shares.
+
+Holds, version counters, replica pins and the JWT user cache only work when
+each gunicorn / uvicorn worker sees the others' writes. ``LocMemCache`` and
+``DummyCache`` are per process; ``CACHES`` (settings.py) points at Redis, or
+at the database cache table, everywhere but tests and local development.
+"""
+
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+
+PROCESS_LOCAL_BACKENDS = (LocMemCache, DummyCache)
+
+
+def is_shared(alias: str = "default") -> bool:
+    return not isinstance(caches[alias], PROCESS_LOCAL_BACKENDS)
+
+
+def require_shared(feature: str, alias: str = "default") -> None:
+    if not is_shared(alias):
+        raise ImproperlyConfigured(
+            f"{feature} needs a cache shared by all workers, but "
+            f"CACHES[{alias!r}] is process-local; set REDIS_URL"
+        )
+
+
+@checks.register(checks.Tags.caches, deploy=True)
+def check_shared_cache(app_configs=None, **kwargs) -> list:
+    if is_shared():
+        return []
+    return [
+        checks.Error(
+            "The default cache is process-local, so holds, cache versions, "
+            "replica pins and cached users differ between workers.",
+            hint="Set REDIS_URL, or use the database cache (CACHES).",
+            id="bookings.E001",
+        )
+    ]
@@ -0,0 +1,39 @@
+"""
+SQLite's half of the booking overlap guard.
+
+PostgreSQL keeps active stays of a room apart with the exclusion constraint
+declared in ``Booking.Meta``. SQLite has no exclusion constraints, so a pair
+of triggers raises the same constraint name. Migration 0002 creates them,
+migration 0007 restores them after a table rebuild, and seeding drops them
+around a bulk load.
+"""
+
+SQLITE_OVERLAP_CHECK = """
+SELECT RAISE(ABORT, 'booking_no_overlap')
+FROM bookings_booking
+WHERE room_id = NEW.room_id
+    AND status = 'active'
+    AND id IS NOT NEW.id
+    AND start_date < NEW.end_date
+    AND end_date > NEW.start_date;
+"""
+
+CREATE_SQLITE_TRIGGERS = [
+    f"""
+    CREATE TRIGGER booking_no_overlap_insert
+    BEFORE INSERT ON bookings_booking
+    WHEN NEW.status = 'active'
+    BEGIN {SQLITE_OVERLAP_CHECK} END;
+    """,
+    f"""
+    CREATE TRIGGER booking_no_overlap_update
+    BEFORE UPDATE ON bookings_booking
+    WHEN NEW.status = 'active'
+    BEGIN {SQLITE_OVERLAP_CHECK} END;
+    """,
+]
+
+DROP_SQLITE_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS booking_no_overlap_insert;",
+    "DROP TRIGGER IF EXISTS booking_no_overlap_update;",
+]
@@ -0,0 +1,83 @@
+"""
+Database connection pool metrics.
+
+``DB_POOL_MODE`` (see settings) selects how gunicorn workers hold their
+PostgreSQL connections:
+
+    none:       a new connection per request (Django's default).
+    persistent: one connection per worker thread reused for
+                ``DB_CONN_MAX_AGE`` seconds, health-checked before reuse.
+    pool:       a psycopg 3 ``ConnectionPool`` per worker process, sized by
+                ``DB_POOL_MIN_SIZE`` / ``DB_POOL_MAX_SIZE``. Sync workers
+                serve one request at a time, so a small pool suffices;
+                budget ``workers x DB_POOL_MAX_SIZE`` server connections.
+
+Metrics are per process, like the pools themselves; ``/metrics`` exports
+them across workers (see bookings/prometheus.py).
+"""
+
+import threading
+from collections import Counter
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+_lock = threading.Lock()
+# ``connection_created`` is sent whenever Django sets up a connection: a new
+# server connection in ``none`` and ``persistent`` mode, but every checkout
+# in ``pool`` mode, where psycopg_pool counts the server connections.
+_connection_setups: Counter = Counter()
+
+
+@receiver(connection_created)
+def count_connection(sender, connection, **kwargs) -> None:
+    with _lock:
+        _connection_setups[connection.alias] += 1
+
+
+def pool_mode(settings_dict: dict) -> str:
+    if settings_dict.get("OPTIONS", {}).get("pool"):
+        return "pool"
+    if settings_dict.get("CONN_MAX_AGE"):
+        return "persistent"
+    return "none"
+
+
+def pool_metrics() -> dict[str, dict]:
+    """
+    Per database alias: the pool mode, server connections opened by this
+    process and, in ``pool`` mode, utilisation, checkouts, checkout wait time
+    and checkout failures from psycopg_pool.
+    """
+    metrics = {}
+    for alias in connections:
+        connection = connections[alias]
+        mode = pool_mode(connection.settings_dict)
+        with _lock:
+            entry = {"mode": mode, "connections_opened": _connection_setups[alias]}
+
+        pool = connection.pool if mode == "pool" else None
+        if pool is not None:
+            stats = pool.get_stats()
+            in_use = stats.get("pool_size", 0) - stats.get("pool_available", 0)
+            entry.update(
+                {
+                    "pool_min": stats.get("pool_min"),
+                    "pool_max": stats.get("pool_max"),
+                    "pool_size": stats.get("pool_size"),
+                    "pool_available": stats.get("pool_available"),
+                    "in_use": in_use,
+                    "utilisation": (
+                        in_use / stats["pool_max"] if stats.get("pool_max") else 0.0
+                    ),
+                    "connections_opened": stats.get("connections_num", 0),
+                    "requests_waiting": stats.get("requests_waiting", 0),
+                    "checkouts": stats.get("requests_num", 0),
+                    "checkout_wait_ms": stats.get("requests_wait_ms", 0),
+                    "checkout_failures": stats.get("requests_errors", 0),
+                    "connections_lost": stats.get("connections_lost", 0),
+                }
+            )
+        metrics[alias] = entry
+    return metrics
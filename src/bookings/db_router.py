@@ -0,0 +1,176 @@
+"""
+Primary / read-replica database routing.
+
+Writes always go to ``default`` (the primary). Reads go to a random alias
+from ``DATABASE_REPLICAS`` only while a safe-method (GET/HEAD/OPTIONS) request
+is being served and the client has not written a booking recently; anything
+else - unsafe requests, management commands, background jobs - reads the
+primary.
+
+Read-your-writes:
+    A booking write pins to the primary, for ``DATABASE_REPLICA_PIN_SECONDS``:
+        - the rest of the current request;
+        - the client, through the ``pin_primary`` cookie set on the response;
+        - the booking's user, through a flag in the shared cache, so JWT
+          clients without a cookie jar see their booking on the next request
+          too. Routing reads to replicas therefore requires a cache shared by
+          all workers (``bookings.caches``).
+
+Replicas are never migrated; they receive the schema through replication.
+
+Replication lag above the pin window is not covered; keep it comfortably
+above the lag the replicas normally run at.
+"""
+
+import random
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.functional import LazyObject, empty
+
+from bookings.caches import require_shared
+
+PIN_COOKIE = "pin_primary"
+PIN_USER_KEY = "bookings:pin-primary:user:{}"
+# DatabaseCache's model; pins and versions must not lag behind on a replica.
+CACHE_APP_LABEL = "django_cache"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+@dataclass
+class _RequestState:
+    request: object
+    pinned: bool = False
+    wrote: bool = False
+    user_checked: bool = False
+
+
+_state: ContextVar[Optional[_RequestState]] = ContextVar(
+    "bookings_db_routing", default=None
+)
+
+
+def replicas() -> list[str]:
+    return list(getattr(settings, "DATABASE_REPLICAS", ()))
+
+
+def pin_seconds() -> int:
+    return getattr(settings, "DATABASE_REPLICA_PIN_SECONDS", 10)
+
+
+def _resolved_user(request):
+    """The request's user if authentication already ran, without running it."""
+    user = vars(request).get("user")
+    if isinstance(user, LazyObject):
+        user = user._wrapped if user._wrapped is not empty else None
+    return user
+
+
+def _user_pinned(state: _RequestState) -> bool:
+    user = _resolved_user(state.request)
+    if user is None or not user.is_authenticated:
+        return False
+    # Authentication has run; one cache lookup settles it for the request.
+    state.user_checked = True
+    state.pinned = bool(cache.get(PIN_USER_KEY.format(user.pk)))
+    return state.pinned
+
+
+def record_write(*user_ids: Optional[int]) -> None:
+    """Pin the current request, its client and ``user_ids`` to the primary."""
+    state = _state.get()
+    if state is not None:
+        state.pinned = state.wrote = True
+    pins = {PIN_USER_KEY.format(pk): True for pk in user_ids if pk is not None}
+    if pins and replicas():
+        require_shared("Pinning users to the primary")
+        cache.set_many(pins, timeout=pin_seconds())
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        aliases = replicas()
+        state = _state.get()
+        if not aliases or state is None or state.pinned:
+            return DEFAULT_DB_ALIAS
+        if model._meta.app_label == CACHE_APP_LABEL:
+            return DEFAULT_DB_ALIAS
+        if not state.user_checked and _user_pinned(state):
+            return DEFAULT_DB_ALIAS
+        return random.choice(aliases)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replicas():
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Tracks per-request routing state for ``PrimaryReplicaRouter``."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        state = self._state(request)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self._pin(state, response)
+
+    async def __acall__(self, request):
+        # The ORM's sync_to_async threads run in a copy of this context and
+        # share the state object, so their writes pin the request too.
+        state = self._state(request)
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self._pin(state, response)
+
+    @staticmethod
+    def _state(request) -> _RequestState:
+        pinned_until = request.COOKIES.get(PIN_COOKIE, "")
+        pinned = request.method not in SAFE_METHODS or (
+            pinned_until.isdigit() and int(pinned_until) > time.time()
+        )
+        return _RequestState(request=request, pinned=pinned)
+
+    @staticmethod
+    def _pin(state: _RequestState, response):
+        if state.wrote:
+            seconds = pin_seconds()
+            response.set_cookie(
+                PIN_COOKIE,
+                str(int(time.time()) + seconds),
+                max_age=seconds,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -0,0 +1,76 @@
+"""
+Streaming booking export shared by the API and ``manage.py export_bookings``.
+
+Rows are read with ``QuerySet.iterator(chunk_size=...)``. On PostgreSQL this
+opens a server-side (named) cursor, so only one chunk of tuples is held in
+memory at a time; the CSV/NDJSON encoders are generators as well, keeping a
+worker's memory flat regardless of how many bookings match.
+"""
+
+import csv
+import json
+from typing import Iterable, Iterator
+
+from django.db.models import QuerySet
+
+EXPORT_CHUNK_SIZE = 2000
+
+FORMAT_CSV = "csv"
+FORMAT_NDJSON = "ndjson"
+FORMATS = (FORMAT_CSV, FORMAT_NDJSON)
+CONTENT_TYPES = {
+    FORMAT_CSV: "text/csv",
+    FORMAT_NDJSON: "application/x-ndjson",
+}
+
+EXPORT_COLUMNS = (
+    ("id", "id"),
+    ("user", "user__username"),
+    ("room_id", "room_id"),
+    ("room_number", "room__number"),
+    ("start_date", "start_date"),
+    ("end_date", "end_date"),
+    ("nights", None),
+    ("status", "status"),
+    ("created_at", "created_at"),
+)
+HEADER = tuple(name for name, _ in EXPORT_COLUMNS)
+
+
+def export_rows(queryset: QuerySet, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator:
+    lookups = [lookup for _, lookup in EXPORT_COLUMNS if lookup]
+    rows = queryset.order_by("pk").values_list(*lookups)
+    for pk, user, room_id, number, start, end, status, created in rows.iterator(
+        chunk_size=chunk_size
+    ):
+        nights = (end - start).days
+        yield (pk, user, room_id, number, start, end, nights, status, created)
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to csv.writer."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def render_csv(rows: Iterable) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(HEADER)
+    for row in rows:
+        yield writer.writerow(
+            [v.isoformat() if hasattr(v, "isoformat") else v for v in row]
+        )
+
+
+def render_ndjson(rows: Iterable) -> Iterator[str]:
+    for row in rows:
+        record = {
+            name: v.isoformat() if hasattr(v, "isoformat") else v
+            for name, v in zip(HEADER, row)
+        }
+        yield json.dumps(record) + "\n"
+
+
+def render(rows: Iterable, fmt: str) -> Iterator[str]:
+    return render_ndjson(rows) if fmt == FORMAT_NDJSON else render_csv(rows)
@@ -0,0 +1,285 @@
+"""
+Short-lived room holds.
+
+A guest entering checkout places a hold on ``(room, [start, end))`` for
+``ROOM_HOLD_TTL`` seconds. While it lasts, other guests' bookings for
+overlapping dates are rejected in ``Booking.save()`` before any query runs,
+and the availability filters hide the room, so a promotion rush turns into
+one booking write instead of many failing ones. The holder's own booking
+consumes the hold.
+
+Holds never touch the database. ``ROOM_HOLD_BACKEND`` picks the store:
+
+    CacheHoldStore: Django's cache, which must be shared between workers
+        (Redis or the database cache, see settings.CACHES); refuses to run
+        on a per-process cache. Per-room lists of holds, updated under a
+        short ``cache.add()`` lock, plus a registry of rooms with live holds
+        for the availability filters.
+    LocalHoldStore: the same in process memory; tests and single-process
+        development.
+
+Holds are advisory: the overlap constraint still decides between bookings.
+"""
+
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date
+from math import ceil
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+from bookings.caches import require_shared
+from bookings.versions import bump_room_versions
+
+REGISTRY = "rooms"
+
+
+class HoldConflict(Exception):
+    """The room is held by another guest for overlapping dates."""
+
+
+class HoldStoreBusy(HoldConflict):
+    """The store lock could not be taken in time."""
+
+
+@dataclass(frozen=True)
+class Hold:
+    token: str
+    room_id: int
+    user_id: int
+    start_date: date
+    end_date: date
+    expires_at: float
+
+    def overlaps(self, start: date, end: date) -> bool:
+        return self.start_date < end and self.end_date > start
+
+
+def _now() -> float:
+    return time.time()
+
+
+def _room_of(token: str) -> Optional[int]:
+    room_id, _, _ = token.partition(".")
+    return int(room_id) if room_id.isdigit() else None
+
+
+class HoldStore(ABC):
+    """Hold logic over five storage primitives implemented by subclasses."""
+
+    @abstractmethod
+    def _lock(self, name: str): ...
+
+    @abstractmethod
+    def _get(self, name: str, default): ...
+
+    @abstractmethod
+    def _get_many(self, names: Iterable[str]) -> dict: ...
+
+    @abstractmethod
+    def _set(self, name: str, value, expires_at: float) -> None: ...
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+    def live_holds(self, room_id: int) -> list[Hold]:
+        now = _now()
+        return [h for h in self._get(str(room_id), []) if h.expires_at > now]
+
+    def place(self, hold: Hold) -> None:
+        """Add ``hold``, replacing the same guest's holds on the room."""
+        with self._lock(str(hold.room_id)):
+            holds = self.live_holds(hold.room_id)
+            for other in holds:
+                if other.user_id != hold.user_id and other.overlaps(
+                    hold.start_date, hold.end_date
+                ):
+                    raise HoldConflict(other)
+            holds = [h for h in holds if h.user_id != hold.user_id] + [hold]
+            self._set(str(hold.room_id), holds, max(h.expires_at for h in holds))
+        self._register(hold.room_id, hold.expires_at)
+
+    def release(self, room_id: int, keep) -> bool:
+        """Drop the room's holds for which ``keep(hold)`` is false."""
+        with self._lock(str(room_id)):
+            holds = self.live_holds(room_id)
+            kept = [h for h in holds if keep(h)]
+            if len(kept) == len(holds):
+                return False
+            self._set(str(room_id), kept, max((h.expires_at for h in kept), default=0))
+        return True
+
+    def _register(self, room_id: int, expires_at: float) -> None:
+        with self._lock(REGISTRY):
+            rooms = self._live_registry()
+            rooms.setdefault(room_id, []).append(expires_at)
+            self._set(REGISTRY, rooms, max(max(e) for e in rooms.values()))
+
+    def _live_registry(self) -> dict[int, list[float]]:
+        """Room id to the expiry times of the holds placed on it."""
+        now = _now()
+        rooms = {
+            room_id: [e for e in expiries if e > now]
+            for room_id, expiries in self._get(REGISTRY, {}).items()
+        }
+        return {room_id: expiries for room_id, expiries in rooms.items() if expiries}
+
+    def expiries(self) -> tuple[float, ...]:
+        """
+        Expiry times of all live holds; changes whenever one lapses.
+
+        Hold expiry bumps no version, so responses that hide held rooms key
+        on this too (see api/caching.py).
+        """
+        return tuple(sorted(e for es in self._live_registry().values() for e in es))
+
+    def held_room_ids(self, start: date, end: date) -> set[int]:
+        now = _now()
+        rooms = self._live_registry()
+        if not rooms:
+            return set()
+        return {
+            int(room_id)
+            for room_id, holds in self._get_many(map(str, rooms)).items()
+            if any(h.expires_at > now and h.overlaps(start, end) for h in holds)
+        }
+
+
+class CacheHoldStore(HoldStore):
+    prefix = "bookings:holds:"
+    lock_timeout = 5
+    lock_wait = 1.0
+
+    def __init__(self) -> None:
+        # On a per-process cache, holds would only bind the worker that
+        # placed them.
+        require_shared("CacheHoldStore")
+
+    @contextmanager
+    def _lock(self, name: str):
+        key = f"{self.prefix}{name}:lock"
+        deadline = time.monotonic() + self.lock_wait
+        while not cache.add(key, 1, timeout=self.lock_timeout):
+            if time.monotonic() > deadline:
+                raise HoldStoreBusy(name)
+            time.sleep(0.005)
+        try:
+            yield
+        finally:
+            cache.delete(key)
+
+    def _get(self, name: str, default):
+        return cache.get(f"{self.prefix}{name}", default)
+
+    def _get_many(self, names: Iterable[str]) -> dict:
+        found = cache.get_many([f"{self.prefix}{name}" for name in names])
+        return {key.removeprefix(self.prefix): value for key, value in found.items()}
+
+    def _set(self, name: str, value, expires_at: float) -> None:
+        timeout = ceil(expires_at - _now())
+        if timeout > 0:
+            cache.set(f"{self.prefix}{name}", value, timeout=timeout)
+        else:
+            cache.delete(f"{self.prefix}{name}")
+
+    def clear(self) -> None:
+        rooms = self._get(REGISTRY, {})
+        cache.delete_many(
+            [f"{self.prefix}{name}" for name in [REGISTRY, *map(str, rooms)]]
+        )
+
+
+class LocalHoldStore(HoldStore):
+    def __init__(self) -> None:
+        self._mutex = threading.RLock()
+        self._data: dict[str, object] = {}
+
+    @contextmanager
+    def _lock(self, name: str):
+        with self._mutex:
+            yield
+
+    def _get(self, name: str, default):
+        return self._data.get(name, default)
+
+    def _get_many(self, names: Iterable[str]) -> dict:
+        return {name: self._data[name] for name in names if name in self._data}
+
+    def _set(self, name: str, value, expires_at: float) -> None:
+        self._data[name] = value
+
+    def clear(self) -> None:
+        with self._mutex:
+            self._data.clear()
+
+
+_stores: dict[str, HoldStore] = {}
+
+
+def hold_store() -> HoldStore:
+    path = settings.ROOM_HOLD_BACKEND
+    if path not in _stores:
+        _stores[path] = import_string(path)()
+    return _stores[path]
+
+
+def place_hold(user_id: int, room_id: int, start: date, end: date) -> Hold:
+    """Hold the room for ``user_id``; raises ``HoldConflict``."""
+    hold = Hold(
+        token=f"{room_id}.{secrets.token_urlsafe(16)}",
+        room_id=room_id,
+        user_id=user_id,
+        start_date=start,
+        end_date=end,
+        expires_at=_now() + settings.ROOM_HOLD_TTL,
+    )
+    hold_store().place(hold)
+    # Cached room listings filter out held rooms.
+    bump_room_versions([room_id])
+    return hold
+
+
+def release_hold(token: str, user_id: int) -> bool:
+    room_id = _room_of(token)
+    if room_id is None:
+        return False
+    released = hold_store().release(
+        room_id, lambda h: not (h.token == token and h.user_id == user_id)
+    )
+    if released:
+        bump_room_versions([room_id])
+    return released
+
+
+def consume_holds(user_id: int, room_id: int, start: date, end: date) -> None:
+    """Drop the guest's holds made redundant by their booking."""
+    try:
+        hold_store().release(
+            room_id, lambda h: not (h.user_id == user_id and h.overlaps(start, end))
+        )
+    except HoldStoreBusy:
+        pass  # the hold expires on its own
+
+
+def conflicting_hold(
+    room_id: int, start: date, end: date, user_id: Optional[int]
+) -> Optional[Hold]:
+    for hold in hold_store().live_holds(room_id):
+        if hold.user_id != user_id and hold.overlaps(start, end):
+            return hold
+    return None
+
+
+def held_room_ids(start: date, end: date) -> set[int]:
+    return hold_store().held_room_ids(start, end)
+
+
+def hold_expiries() -> tuple[float, ...]:
+    return hold_store().expiries()
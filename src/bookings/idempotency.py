@@ -0,0 +1,260 @@
+"""
+Idempotency-Key replay for booking creation: the HTML form, the API and the
+async API.
+
+A client that retries a POST after a timeout sends the same
+``Idempotency-Key`` header (HTML forms: the ``idempotency_key`` field) and
+gets the first attempt's stored response back, with an
+``Idempotent-Replayed: true`` header, instead of a second booking or a
+"Room is already booked" error.
+
+Per ``(user, scope, key)``:
+    - the first request claims the key by inserting a pending row (the unique
+      constraint picks one winner among concurrent retries), runs the view
+      and stores its response in the view's transaction; 5xx responses and
+      exceptions release the key so the client can retry;
+    - a retry with the same payload replays the stored response without
+      running the view;
+    - a retry while the first request is still running gets ``409``, and
+      the same key with a different payload gets ``422``.
+
+Keys expire after ``IDEMPOTENCY_KEY_TTL`` seconds; ``manage.py
+cleanup_idempotency_keys`` deletes them. A pending row older than
+``IDEMPOTENCY_LOCK_TIMEOUT`` is assumed abandoned (crashed worker) and may
+be claimed again.
+"""
+
+import hashlib
+import json
+from datetime import timedelta
+from functools import partial, wraps
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import QuerySet
+from django.http import HttpResponse, JsonResponse, QueryDict
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.views import APIView
+
+from bookings.models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+FORM_FIELD = "idempotency_key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+# Response headers stored with the body; cookies are never replayed.
+STORED_HEADERS = ("Content-Type", "Location")
+
+SCOPE_BOOKING_CREATE = "booking-create"
+SCOPE_BOOK_ROOM = "book-room"
+
+
+class IdempotencyError(Exception):
+    status_code = 400
+    message = ""
+
+    def response(self) -> HttpResponse:
+        return JsonResponse({"detail": self.message}, status=self.status_code)
+
+
+class InvalidKey(IdempotencyError):
+    message = f"{HEADER} must be 1-{MAX_KEY_LENGTH} characters"
+
+
+class RequestInProgress(IdempotencyError):
+    status_code = 409
+    message = f"A request with this {HEADER} is still being processed"
+
+
+class KeyReused(IdempotencyError):
+    status_code = 422
+    message = f"{HEADER} was already used for a different request"
+
+
+def key_ttl() -> timedelta:
+    return timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+
+
+def expired_keys() -> QuerySet:
+    return IdempotencyKey.objects.filter(created_at__lt=timezone.now() - key_ttl())
+
+
+def fingerprint(payload) -> str:
+    encoded = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def claim(user, scope: str, key: str, digest: str) -> tuple[IdempotencyKey, bool]:
+    """
+    Claim ``key`` for a new request, or find the stored response to replay.
+
+    Returns ``(record, replay)``; raises ``IdempotencyError`` subclasses.
+    """
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise InvalidKey
+    lookup = {"user": user, "scope": scope, "key": key}
+    for _ in range(2):
+        # Look first: replays - the common case for a reused key - cost one query.
+        record = IdempotencyKey.objects.filter(**lookup).first()
+        if record is None:
+            try:
+                with transaction.atomic():
+                    record = IdempotencyKey.objects.create(**lookup, fingerprint=digest)
+                return record, False
+            except IntegrityError:
+                continue  # a concurrent retry claimed it first
+
+        now = timezone.now()
+        if record.created_at < now - key_ttl():
+            IdempotencyKey.objects.filter(pk=record.pk).delete()
+            continue
+        if record.fingerprint != digest:
+            raise KeyReused
+        if record.status_code is not None:
+            return record, True
+
+        lock_timeout = timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT)
+        if record.created_at < now - lock_timeout:
+            taken = IdempotencyKey.objects.filter(
+                pk=record.pk, status_code__isnull=True, created_at=record.created_at
+            ).update(created_at=now)
+            if taken:
+                return record, False
+        raise RequestInProgress
+    raise RequestInProgress
+
+
+def complete(record: IdempotencyKey, response: HttpResponse) -> None:
+    """Store a rendered response for replay, or release the key on 5xx."""
+    if response.status_code >= 500:
+        release(record)
+        return
+    record.status_code = response.status_code
+    record.headers = {
+        name: response[name] for name in STORED_HEADERS if response.has_header(name)
+    }
+    record.body = response.content
+    record.save(update_fields=["status_code", "headers", "body"])
+
+
+def release(record: IdempotencyKey) -> None:
+    IdempotencyKey.objects.filter(pk=record.pk, status_code__isnull=True).delete()
+
+
+def replay(record: IdempotencyKey) -> HttpResponse:
+    response = HttpResponse(bytes(record.body), status=record.status_code)
+    for name, value in record.headers.items():
+        response[name] = value
+    response[REPLAYED_HEADER] = "true"
+    return response
+
+
+def request_key(request) -> Optional[str]:
+    return request.headers.get(HEADER) or request.POST.get(FORM_FIELD)
+
+
+def request_payload(request):
+    data = request.data if isinstance(request, Request) else request.POST
+    if not isinstance(data, QueryDict):
+        return data
+    return {
+        name: values
+        for name, values in data.lists()
+        if name not in ("csrfmiddlewaretoken", FORM_FIELD)
+    }
+
+
+def idempotent(scope: str):
+    """
+    Idempotency-Key support for a view that books: a plain Django view
+    handling form POSTs, or a DRF write action.
+
+    Only authenticated POSTs that carry a key are affected. The view's writes
+    and the stored response commit in one transaction, so there is never a
+    booking without the response that replays it. Plain views store
+    redirects only: a ``200`` is the form re-rendered with its errors, and
+    the key is released for the corrected submission.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # Plain views get (request, ...), DRF actions (self, request, ...).
+            api_view = args[0] if isinstance(args[0], APIView) else None
+            request, *view_args = args[1:] if api_view else args
+            key = request_key(request) if request.method == "POST" else None
+            if not key or not request.user.is_authenticated:
+                return view(*args, **kwargs)
+
+            run, replayable = partial(view, *args, **kwargs), _not_rerendered
+            if api_view is not None:
+                run = partial(_run_action, api_view, view, args, kwargs)
+                replayable = None
+            return run_once(
+                request.user,
+                scope,
+                key,
+                [request_payload(request), view_args, kwargs],
+                run,
+                replayable,
+            )
+
+        return wrapper
+
+    return decorator
+
+
+def run_once(
+    user,
+    scope: str,
+    key: str,
+    payload,
+    run: Callable[[], HttpResponse],
+    replayable: Optional[Callable[[HttpResponse], bool]] = None,
+) -> HttpResponse:
+    """
+    Claim ``key`` for ``payload`` and answer with ``run()`` the first time,
+    with the stored response after that. ``idempotent()`` wraps views in
+    it; the async API calls it directly (in a thread, for the transaction).
+
+    ``run()`` and storing its response share a transaction. Responses for
+    which ``replayable`` is false release the key instead of being stored.
+    """
+    try:
+        record, replayed = claim(user, scope, key, fingerprint(payload))
+    except IdempotencyError as exc:
+        return exc.response()
+    if replayed:
+        return replay(record)
+
+    try:
+        with transaction.atomic():
+            response = run()
+            if replayable is None or replayable(response):
+                complete(record, response)
+            else:
+                release(record)
+    except BaseException:
+        release(record)
+        raise
+    return response
+
+
+def _not_rerendered(response: HttpResponse) -> bool:
+    return response.status_code != 200
+
+
+def _run_action(api_view: APIView, method, args, kwargs) -> HttpResponse:
+    try:
+        with transaction.atomic():
+            response = method(*args, **kwargs)
+    except Exception as exc:
+        # Validation errors are outcomes worth replaying too.
+        response = api_view.handle_exception(exc)
+    # Rendered here so the stored bytes commit with the booking; finalizing
+    # again in dispatch() leaves the response as it is.
+    response = api_view.finalize_response(args[1], response, *args[2:], **kwargs)
+    response.render()
+    return response
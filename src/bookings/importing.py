@@ -0,0 +1,432 @@
+"""
+Bulk booking import shared by the API and ``manage.py import_bookings``.
+
+Channel managers send thousands of bookings at once; saving them one by one
+would run ``full_clean()`` and an overlap SELECT per row. Instead the whole
+file is read and validated as a set:
+
+    1. each row is parsed (CSV or NDJSON, the columns ``export.py`` writes:
+       ``user``, ``room_number`` or ``room_id``, ``start_date``, ``end_date``
+       and optionally ``status``; others are ignored, so exports re-import);
+    2. guests and rooms are resolved with one query per chunk of names;
+    3. active rows are checked against other guests' checkout holds, and
+       against existing active bookings fetched with one query per chunk of
+       rooms - a ``searchsorted`` of every row into the sorted bookings;
+    4. a sort-and-sweep over the remaining active rows, by room and start
+       date, rejects rows overlapping an earlier accepted row of the file.
+
+Valid rows are priced, then inserted ``IMPORT_CHUNK_SIZE`` at a time, each
+chunk committed on its own. A chunk hitting the database overlap guard -
+a booking made concurrently since validation - is retried row by row so
+only the clashing rows are rejected.
+
+``import_bookings()`` is a generator of report records: one per rejected
+row, as soon as the row is rejected, then a summary. ``render_report()``
+encodes them as NDJSON. The API runs the import to completion before it
+responds and streams only the report: writes made while the response
+streams would escape the request's routing state, and a client that
+disconnects would stop the import halfway.
+"""
+
+import csv
+import io
+import json
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import IO, Iterable, Iterator, Optional
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, router, transaction
+
+from bookings.db_router import record_write
+from bookings.export import FORMAT_CSV, FORMAT_NDJSON
+from bookings.holds import conflicting_hold, held_room_ids
+from bookings.models import (
+    HOLD_ERROR,
+    OVERLAP_ERROR,
+    Booking,
+    RatePlan,
+    Room,
+    is_overlap_violation,
+)
+from bookings.prometheus import (
+    BOOKINGS_CREATED,
+    CONFLICT_HOLD,
+    CONFLICT_OVERLAP,
+    booking_conflict,
+)
+from bookings.versions import bookings_written
+
+IMPORT_CHUNK_SIZE = 1000
+
+REPORT_CONTENT_TYPE = "application/x-ndjson"
+STATUSES = {value for value, _ in Booking.STATUS_CHOICES}
+
+
+class ImportFormatError(Exception):
+    pass
+
+
+@dataclass
+class ImportRow:
+    line: int
+    username: str
+    room_key: tuple
+    start: date
+    end: date
+    status: str
+    user_id: Optional[int] = None
+    room_id: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class RowError:
+    line: int
+    field: Optional[str]
+    error: str
+
+    def as_record(self) -> dict:
+        return {"line": self.line, "field": self.field, "error": self.error}
+
+
+def read_records(stream: IO[str], fmt: str) -> Iterator[tuple[int, object]]:
+    """``(line, dict)`` per row, or ``(line, RowError)`` if it can't be read."""
+    if fmt == FORMAT_CSV:
+        reader = csv.DictReader(stream)
+        if reader.fieldnames is None:
+            return
+        while True:
+            try:
+                record = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as exc:
+                yield reader.line_num, RowError(reader.line_num, None, str(exc))
+                continue
+            yield reader.line_num, record
+    elif fmt == FORMAT_NDJSON:
+        for line, text in enumerate(stream, start=1):
+            if not text.strip():
+                continue
+            try:
+                record = json.loads(text)
+            except ValueError as exc:
+                yield line, RowError(line, None, f"Invalid JSON: {exc}")
+                continue
+            if not isinstance(record, dict):
+                yield line, RowError(line, None, "Expected a JSON object")
+                continue
+            yield line, record
+    else:
+        raise ImportFormatError(f"Unknown format {fmt!r}")
+
+
+def _text(record: dict, name: str) -> str:
+    value = record.get(name)
+    return "" if value is None else str(value).strip()
+
+
+def parse_row(line: int, record: dict):
+    """An ``ImportRow``, or a ``RowError`` for the first invalid field."""
+    username = _text(record, "user")
+    if not username:
+        return RowError(line, "user", "This field is required")
+
+    number, room_id = _text(record, "room_number"), _text(record, "room_id")
+    if number:
+        room_key = ("number", number)
+    elif room_id.isdigit():
+        room_key = ("pk", int(room_id))
+    else:
+        return RowError(line, "room_number", "room_number or room_id is required")
+
+    dates = {}
+    for name in ("start_date", "end_date"):
+        try:
+            dates[name] = date.fromisoformat(_text(record, name))
+        except ValueError:
+            return RowError(line, name, "Expected a date as YYYY-MM-DD")
+    if dates["end_date"] <= dates["start_date"]:
+        return RowError(line, "end_date", "end_date must be after start_date")
+
+    status = _text(record, "status") or Booking.STATUS_ACTIVE
+    if status not in STATUSES:
+        return RowError(
+            line, "status", f"Expected one of: {', '.join(sorted(STATUSES))}"
+        )
+    return ImportRow(
+        line=line,
+        username=username,
+        room_key=room_key,
+        start=dates["start_date"],
+        end=dates["end_date"],
+        status=status,
+    )
+
+
+def _chunks(values: Iterable, size: int) -> Iterator[list]:
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i : i + size]
+
+
+def _resolve(rows: list[ImportRow], using: str, chunk_size: int) -> Iterator:
+    """Fill in user and room IDs; yield errors for unknown ones."""
+    usernames, numbers, pks = set(), set(), set()
+    for row in rows:
+        usernames.add(row.username)
+        (numbers if row.room_key[0] == "number" else pks).add(row.room_key[1])
+
+    users = {}
+    for chunk in _chunks(usernames, chunk_size):
+        users.update(
+            get_user_model()
+            .objects.using(using)
+            .filter(username__in=chunk)
+            .values_list("username", "pk")
+        )
+    rooms = {}
+    for field, keys in (("number", numbers), ("pk", pks)):
+        for chunk in _chunks(keys, chunk_size):
+            rooms.update(
+                ((field, key), pk)
+                for key, pk in Room.objects.using(using)
+                .filter(**{f"{field}__in": chunk})
+                .values_list(field, "pk")
+            )
+
+    for row in rows:
+        row.user_id = users.get(row.username)
+        row.room_id = rooms.get(row.room_key)
+        if row.user_id is None:
+            yield RowError(row.line, "user", f"Unknown user {row.username!r}")
+        elif row.room_id is None:
+            field = "room_number" if row.room_key[0] == "number" else "room_id"
+            yield RowError(row.line, field, f"Unknown room {row.room_key[1]!r}")
+
+
+def _held(rows: list[ImportRow]) -> Iterator[RowError]:
+    held = held_room_ids(min(r.start for r in rows), max(r.end for r in rows))
+    for row in rows:
+        if row.room_id in held and conflicting_hold(
+            row.room_id, row.start, row.end, row.user_id
+        ):
+            booking_conflict(CONFLICT_HOLD)
+            yield RowError(row.line, None, HOLD_ERROR)
+
+
+def _key(rooms: Iterable[int], days: Iterable[date]) -> np.ndarray:
+    # Sorts by room, then day: ordinals stay far below 2**32.
+    rooms = np.fromiter(rooms, np.int64)
+    return (rooms << 32) | np.fromiter(map(date.toordinal, days), np.int64)
+
+
+def _clash_existing(
+    rows: list[ImportRow], using: str, chunk_size: int
+) -> Iterator[RowError]:
+    """Rows overlapping an existing active booking, one query per room chunk."""
+    first, last = min(r.start for r in rows), max(r.end for r in rows)
+    existing = []
+    # Ascending room chunks keep the results in key order as a whole.
+    for chunk in _chunks(sorted({r.room_id for r in rows}), chunk_size):
+        existing.extend(
+            Booking.objects.using(using)
+            .filter(
+                room_id__in=chunk,
+                status=Booking.STATUS_ACTIVE,
+                start_date__lt=last,
+                end_date__gt=first,
+            )
+            .order_by("room_id", "start_date")
+            .values_list("pk", "room_id", "start_date", "end_date")
+        )
+    if not existing:
+        return
+
+    pks, rooms, starts, ends = zip(*existing)
+    start_keys, end_keys = _key(rooms, starts), _key(rooms, ends)
+    # Furthest end so far, and whose: keys of an earlier room are always
+    # below this room's, so one running maximum serves every room.
+    reach = np.maximum.accumulate(end_keys)
+    owner = np.maximum.accumulate(
+        np.where(end_keys == reach, np.arange(len(end_keys)), 0)
+    )
+
+    row_rooms = [r.room_id for r in rows]
+    row_starts = _key(row_rooms, (r.start for r in rows))
+    row_ends = _key(row_rooms, (r.end for r in rows))
+    # Last existing booking starting before each row ends
+    before = np.searchsorted(start_keys, row_ends) - 1
+    clash = (before >= 0) & (reach[np.maximum(before, 0)] > row_starts)
+    for i in np.flatnonzero(clash):
+        booking_conflict(CONFLICT_OVERLAP)
+        pk = pks[owner[before[i]]]
+        yield RowError(rows[i].line, None, f"{OVERLAP_ERROR} (booking {pk})")
+
+
+def _clash_within(rows: list[ImportRow]) -> Iterator[RowError]:
+    """Sort-and-sweep: rows overlapping an earlier accepted row of the file."""
+    room, reach, owner = None, None, None
+    for row in sorted(rows, key=lambda r: (r.room_id, r.start, r.line)):
+        if row.room_id == room and row.start < reach:
+            booking_conflict(CONFLICT_OVERLAP)
+            yield RowError(row.line, None, f"{OVERLAP_ERROR} (line {owner})")
+            continue
+        room, reach, owner = row.room_id, row.end, row.line
+
+
+def _totals(rows: list[ImportRow], using: str) -> list[Decimal]:
+    """
+    Stay prices as ``Booking.save()`` would compute them.
+
+    Rooms without a rate plan over the stay price at base rate here; the
+    rest go through pricing.py.
+    """
+    from bookings.pricing import stay_total
+
+    room_ids = {r.room_id for r in rows}
+    base = dict(
+        Room.objects.using(using)
+        .filter(pk__in=room_ids)
+        .values_list("pk", "price_per_night")
+    )
+    plans = {}
+    for room_id, start, end in (
+        RatePlan.objects.using(using)
+        .filter(
+            room_id__in=room_ids,
+            start_date__lt=max(r.end for r in rows),
+            end_date__gt=min(r.start for r in rows),
+        )
+        .values_list("room_id", "start_date", "end_date")
+    ):
+        plans.setdefault(room_id, []).append((start, end))
+
+    totals = []
+    for row in rows:
+        if any(s < row.end and e > row.start for s, e in plans.get(row.room_id, ())):
+            totals.append(stay_total(row.room_id, row.start, row.end))
+        else:
+            totals.append(base[row.room_id] * (row.end - row.start).days)
+    return totals
+
+
+def _insert_each(rows: list[ImportRow], bookings: list[Booking], using: str):
+    """Insert one by one, rejecting rows a concurrent booking took."""
+    inserted = []
+    for row, booking in zip(rows, bookings):
+        try:
+            with transaction.atomic(using=using):
+                Booking.objects.using(using).bulk_create([booking])
+        except IntegrityError as exc:
+            if not is_overlap_violation(exc):
+                raise
+            booking_conflict(CONFLICT_OVERLAP)
+            yield RowError(row.line, None, OVERLAP_ERROR)
+        else:
+            inserted.append(booking)
+    return inserted
+
+
+def _insert(rows: list[ImportRow], using: str, chunk_size: int):
+    """Insert in chunks, each committed on its own."""
+    for chunk in _chunks(rows, chunk_size):
+        bookings = [
+            Booking(
+                user_id=row.user_id,
+                room_id=row.room_id,
+                start_date=row.start,
+                end_date=row.end,
+                status=row.status,
+                total_price=total,
+            )
+            for row, total in zip(chunk, _totals(chunk, using))
+        ]
+        try:
+            with transaction.atomic(using=using):
+                Booking.objects.using(using).bulk_create(bookings)
+        except IntegrityError as exc:
+            if not is_overlap_violation(exc):
+                raise
+            bookings = yield from _insert_each(chunk, bookings, using)
+        bookings_written((b.room_id for b in bookings), using=using)
+        transaction.on_commit(
+            lambda n=len(bookings): BOOKINGS_CREATED.inc(n), using=using
+        )
+
+
+def _reported(errors: Iterable[RowError]):
+    """Yield report records for ``errors``; return the rejected lines."""
+    failed = set()
+    for error in errors:
+        failed.add(error.line)
+        yield error.as_record()
+    return failed
+
+
+def import_bookings(
+    stream: IO[str],
+    fmt: str = FORMAT_CSV,
+    dry_run: bool = False,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> Iterator[dict]:
+    """
+    Validate and insert the bookings in ``stream``.
+
+    Yields ``{"line", "field", "error"}`` for each rejected row and finally
+    ``{"summary": {"rows", "imported", "rejected", "dry_run"}}``. With
+    ``dry_run`` nothing is written; ``imported`` counts rows that would be.
+    """
+    using = router.db_for_write(Booking)
+    rows, total = [], 0
+    for line, record in read_records(stream, fmt):
+        total += 1
+        parsed = record if isinstance(record, RowError) else parse_row(line, record)
+        if isinstance(parsed, RowError):
+            yield parsed.as_record()
+        else:
+            rows.append(parsed)
+
+    checks = (
+        _held,
+        lambda active: _clash_existing(active, using, chunk_size),
+        _clash_within,
+    )
+    if rows:
+        failed = yield from _reported(_resolve(rows, using, chunk_size))
+        rows = [r for r in rows if r.line not in failed]
+    for check in checks:
+        active = [r for r in rows if r.status == Booking.STATUS_ACTIVE]
+        if not active:
+            break
+        failed = yield from _reported(check(active))
+        rows = [r for r in rows if r.line not in failed]
+
+    imported = len(rows)
+    if not dry_run and rows:
+        # Reads that follow the import, by the caller or the guests, must
+        # see it.
+        record_write(*{r.user_id for r in rows})
+        failed = yield from _reported(_insert(rows, using, chunk_size))
+        imported -= len(failed)
+
+    yield {
+        "summary": {
+            "rows": total,
+            "imported": imported,
+            "rejected": total - imported,
+            "dry_run": dry_run,
+        }
+    }
+
+
+def render_report(records: Iterable[dict]) -> Iterator[str]:
+    for record in records:
+        yield json.dumps(record) + "\n"
+
+
+def text_stream(binary: IO[bytes]) -> IO[str]:
+    """Decode an uploaded file; a UTF-8 byte order mark is skipped."""
+    return io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
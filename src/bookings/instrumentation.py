@@ -0,0 +1,203 @@
+"""
+Per-request SQL and timing instrumentation.
+
+``RequestTimingMiddleware`` (first in ``MIDDLEWARE``) measures each request:
+
+    - SQL query count and time, from an execute wrapper installed on every
+      database connection as it opens;
+    - render time: DRF and ``TemplateResponse`` rendering, and templates
+      rendered inside views through ``InstrumentedDjangoTemplates``. Lazy
+      querysets evaluated while rendering count towards both;
+    - total time spent below the middleware.
+
+The numbers go out as a ``Server-Timing`` header (``SERVER_TIMING_HEADER``,
+off by default unless DEBUG) and as one ``bookings.requests`` log line per
+request, with the fields also attached to the record for structured
+handlers. Requests running more than
+``REQUEST_QUERY_WARNING`` queries log at WARNING - usually an N+1.
+``request_measured`` is sent with the stats; the ``query_budget`` pytest
+marker (tests/conftest.py) and the latency histogram (bookings/prometheus.py)
+listen to it.
+
+Streamed response bodies are produced after the middleware returns and are
+not measured.
+"""
+
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import Signal, receiver
+from django.template.backends.django import DjangoTemplates
+
+logger = logging.getLogger("bookings.requests")
+
+# Sent with ``request``, ``response``, ``stats`` and ``duration`` (seconds)
+# after every request
+request_measured = Signal()
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_time: float = 0.0
+    render_time: float = 0.0
+    # Set while a render is being timed, so nested templates count once.
+    rendering: bool = False
+
+
+_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "bookings_request_stats", default=None
+)
+
+
+def record_query(execute, sql, params, many, context):
+    stats = _stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - started
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs) -> None:
+    # The wrapper object outlives reconnects; install the hook once.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class _TimedTemplate:
+    def __init__(self, template) -> None:
+        self._wrapped = template
+
+    def __getattr__(self, name):
+        return getattr(self._wrapped, name)
+
+    def render(self, context=None, request=None):
+        stats = _stats.get()
+        if stats is None or stats.rendering:
+            return self._wrapped.render(context, request)
+        stats.rendering = True
+        started = time.perf_counter()
+        try:
+            return self._wrapped.render(context, request)
+        finally:
+            stats.render_time += time.perf_counter() - started
+            stats.rendering = False
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Django template backend that adds render time to the request stats."""
+
+    def from_string(self, template_code):
+        return _TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return _TimedTemplate(super().get_template(template_name))
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+def server_timing(stats: RequestStats, total: float) -> str:
+    return (
+        f'db;dur={_ms(stats.db_time)};desc="{stats.queries} queries", '
+        f"render;dur={_ms(stats.render_time)}, "
+        f"total;dur={_ms(total)}"
+    )
+
+
+def log_request(request, response, stats: RequestStats, total: float) -> None:
+    fields = {
+        "method": request.method,
+        "path": request.path,
+        "status": response.status_code,
+        "duration_ms": _ms(total),
+        "db_queries": stats.queries,
+        "db_ms": _ms(stats.db_time),
+        "render_ms": _ms(stats.render_time),
+    }
+    level = (
+        logging.WARNING
+        if stats.queries > settings.REQUEST_QUERY_WARNING
+        else logging.INFO
+    )
+    logger.log(
+        level,
+        " ".join(f"{name}={value}" for name, value in fields.items()),
+        extra=fields,
+    )
+
+
+class RequestTimingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _stats.set(stats)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _stats.reset(token)
+        return self._measured(request, response, stats, started)
+
+    async def __acall__(self, request):
+        # Sync code below runs via sync_to_async, which copies this context,
+        # so its queries land in the same stats.
+        stats = RequestStats()
+        token = _stats.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _stats.reset(token)
+        return self._measured(request, response, stats, started)
+
+    def _measured(self, request, response, stats: RequestStats, started: float):
+        total = time.perf_counter() - started
+        if settings.SERVER_TIMING_HEADER:
+            response["Server-Timing"] = server_timing(stats, total)
+        log_request(request, response, stats, total)
+        request_measured.send(
+            sender=self.__class__,
+            request=request,
+            response=response,
+            stats=stats,
+            duration=total,
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        # Called right before Django renders a DRF or template response.
+        stats = _stats.get()
+        if stats is None or stats.rendering:
+            return response
+        stats.rendering = True
+        started = time.perf_counter()
+
+        def rendered(response):
+            stats.render_time += time.perf_counter() - started
+            stats.rendering = False
+
+        response.add_post_render_callback(rendered)
+        return response
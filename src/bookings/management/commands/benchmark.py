@@ -0,0 +1,99 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import override_settings
+
+from bookings.benchmark import (
+    CASE_NAMES,
+    BenchmarkError,
+    as_report,
+    compare,
+    run,
+    seed_dataset,
+)
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed rooms, guests and bookings in a rolled-back transaction, time the "
+        "hot API and HTML endpoints (p50/p99, SQL queries) and compare the "
+        "results against a stored baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rooms", type=int, default=10_000)
+        parser.add_argument("--bookings", type=int, default=2_000_000)
+        parser.add_argument("--users", type=int, default=1_000)
+        parser.add_argument("--repeat", type=int, default=50)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--case",
+            action="append",
+            choices=CASE_NAMES,
+            help="Run only this case (repeatable)",
+        )
+        parser.add_argument("--save-baseline", metavar="PATH")
+        parser.add_argument("--baseline", metavar="PATH")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="Allowed latency increase over the baseline (0.2 = 20%%)",
+        )
+
+    def handle(self, *args, **options):
+        meta = {
+            name: options[name]
+            for name in ("rooms", "bookings", "users", "repeat", "seed")
+        }
+        meta["vendor"] = connection.vendor
+        try:
+            # Seeded rows are never committed, so replicas can't see them.
+            with transaction.atomic(), override_settings(DATABASE_REPLICAS=[]):
+                dataset = seed_dataset(
+                    options["rooms"],
+                    options["bookings"],
+                    options["users"],
+                    meta["seed"],
+                )
+                self.stdout.write(
+                    f"Seeded {meta['rooms']} rooms, {meta['bookings']} bookings, "
+                    f"{meta['users']} guests ({meta['vendor']})"
+                )
+                results = run(dataset, options["repeat"], options["case"])
+                raise Rollback
+        except Rollback:
+            pass
+        except BenchmarkError as exc:
+            raise CommandError(str(exc)) from exc
+
+        for result in results:
+            self.stdout.write(
+                f"{result.name:>20}: p50 {result.p50_ms:8.2f} ms  "
+                f"p99 {result.p99_ms:8.2f} ms  {result.queries:>5} queries"
+            )
+        report = as_report(meta, results)
+
+        if options["save_baseline"]:
+            with open(options["save_baseline"], "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+                f.write("\n")
+
+        if options["baseline"]:
+            with open(options["baseline"], encoding="utf-8") as f:
+                baseline = json.load(f)
+            if baseline["meta"] != meta:
+                self.stderr.write(
+                    f"Baseline was recorded with {baseline['meta']}, not {meta}"
+                )
+            regressions = compare(baseline, report, options["threshold"])
+            if regressions:
+                raise CommandError(
+                    "Regressions against the baseline:\n  " + "\n  ".join(regressions)
+                )
+            self.stdout.write("No regressions against the baseline")
@@ -0,0 +1,62 @@
+import time
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from bookings.api.renderers import MessagePackRenderer, ORJSONRenderer
+from bookings.serializers import BookingRowSerializer
+
+RENDERERS = (
+    ("drf-json", JSONRenderer),
+    ("orjson", ORJSONRenderer),
+    ("msgpack", MessagePackRenderer),
+)
+
+
+def booking_rows(count: int) -> list[dict]:
+    """Synthetic values() rows shaped like a booking list query."""
+    start = date(2030, 1, 1)
+    created = datetime(2029, 6, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc)
+    return [
+        {
+            "id": i,
+            "user__username": f"user{i % 500}",
+            "room_id": i % 2000,
+            "room__number": str(100 + i % 2000),
+            "room__name": "Deluxe Room",
+            "room__price_per_night": Decimal("129.90"),
+            "room__capacity": 2,
+            "start_date": start + timedelta(days=i % 365),
+            "end_date": start + timedelta(days=i % 365 + 3),
+            "status": "active",
+            "total_price": Decimal("389.70"),
+            "version": 1,
+            "created_at": created,
+        }
+        for i in range(count)
+    ]
+
+
+class Command(BaseCommand):
+    help = "Compare API renderers on a booking list payload"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        data = BookingRowSerializer().to_representation(booking_rows(options["rows"]))
+        self.stdout.write(f"{options['rows']} rows, best of {options['repeat']} runs")
+        for name, renderer_class in RENDERERS:
+            renderer = renderer_class()
+            timings = []
+            for _ in range(options["repeat"]):
+                started = time.perf_counter()
+                body = renderer.render(data, renderer.media_type, {})
+                timings.append(time.perf_counter() - started)
+            self.stdout.write(
+                f"{name:>10}: {min(timings) * 1000:8.2f} ms  {len(body):>10} bytes"
+            )
@@ -0,0 +1,81 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from bookings.models import Room
+from bookings.search import SEARCH_RANK, search_rooms
+
+NAMES = ("Standard", "Deluxe", "Superior", "Junior Suite", "Family", "Penthouse")
+VIEWS = ("Garden", "Sea View", "City View", "Courtyard", "Pool")
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed rooms in a rolled-back transaction and time ranked room search "
+        "(p50/p99), printing the PostgreSQL query plan"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rooms", type=int, default=100_000)
+        parser.add_argument("--repeat", type=int, default=200)
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument(
+            "--term", action="append", default=[], help="Search term (repeatable)"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.seed(options["rooms"])
+                terms = options["term"] or ["B2-03412", "penthouse sea", "3412", "x9z"]
+                for term in terms:
+                    self.run(term, options["repeat"], options["limit"])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, count: int) -> None:
+        rng = random.Random(0)
+        rooms = (
+            Room(
+                number=f"B{i % 10}-{i:05d}",
+                name=f"{rng.choice(NAMES)} {rng.choice(VIEWS)}",
+                capacity=rng.randint(1, 6),
+                price_per_night=rng.randint(50, 900),
+            )
+            for i in range(count)
+        )
+        started = time.perf_counter()
+        Room.objects.bulk_create(rooms, batch_size=5000)
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE bookings_room")
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"Seeded {count} rooms in {elapsed:.1f}s ({connection.vendor})"
+        )
+
+    def run(self, term: str, repeat: int, limit: int) -> None:
+        qs = search_rooms(Room.objects.all(), term).order_by(f"-{SEARCH_RANK}")
+        qs = qs[:limit]
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            found = len(qs.all())
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        p99 = timings[max(0, int(len(timings) * 0.99) - 1)]
+        self.stdout.write(
+            f"{term!r:>18}: {found:>3} rows  "
+            f"p50 {statistics.median(timings) * 1000:7.3f} ms  "
+            f"p99 {p99 * 1000:7.3f} ms"
+        )
+        if connection.vendor == "postgresql":
+            self.stdout.write(qs.explain(analyze=True))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from bookings.idempotency import expired_keys
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete stored Idempotency-Key responses older than IDEMPOTENCY_KEY_TTL. "
+        "Run periodically, e.g. hourly from cron"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        deleted = 0
+        # Small batches keep each DELETE's locks and WAL short.
+        while batch := list(
+            expired_keys().values_list("pk", flat=True)[: options["batch_size"]]
+        ):
+            deleted += expired_keys().filter(pk__in=batch).delete()[0]
+        self.stdout.write(f"Deleted {deleted} expired idempotency key(s)")
@@ -0,0 +1,46 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.api.filters import BookingFilter
+from bookings.export import EXPORT_CHUNK_SIZE, FORMAT_CSV, FORMATS, export_rows, render
+from bookings.models import Booking
+
+
+class Command(BaseCommand):
+    help = "Stream bookings to a CSV or NDJSON file without loading them in memory"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=FORMATS, default=FORMAT_CSV)
+        parser.add_argument(
+            "--output", help="File to write to, defaults to standard output"
+        )
+        parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+        parser.add_argument(
+            "--filter",
+            action="append",
+            default=[],
+            metavar="NAME=VALUE",
+            help="BookingFilter parameter, e.g. status=active. Repeatable.",
+        )
+
+    def handle(self, *args, **options):
+        data = {}
+        for item in options["filter"]:
+            name, sep, value = item.partition("=")
+            if not sep:
+                raise CommandError(f"Invalid filter {item!r}, expected NAME=VALUE")
+            data[name] = value
+
+        filterset = BookingFilter(data=data, queryset=Booking.objects.all())
+        if not filterset.is_valid():
+            raise CommandError(filterset.errors.as_text())
+
+        rows = export_rows(filterset.qs, chunk_size=options["chunk_size"])
+        chunks = render(rows, options["format"])
+
+        if options["output"]:
+            with open(options["output"], "w", newline="", encoding="utf-8") as f:
+                f.writelines(chunks)
+        else:
+            sys.stdout.writelines(chunks)
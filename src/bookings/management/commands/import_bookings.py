@@ -0,0 +1,58 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.export import FORMAT_CSV, FORMATS
+from bookings.importing import IMPORT_CHUNK_SIZE, import_bookings
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-import bookings from a CSV or NDJSON file, validated as a set; "
+        "writes an NDJSON report of rejected rows"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, - for standard input")
+        parser.add_argument("--format", choices=FORMATS, default=FORMAT_CSV)
+        parser.add_argument(
+            "--report", help="File for the report, defaults to standard output"
+        )
+        parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Validate without writing"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            source = (
+                sys.stdin
+                if options["path"] == "-"
+                else open(options["path"], encoding="utf-8-sig", newline="")
+            )
+            report = (
+                open(options["report"], "w", encoding="utf-8")
+                if options["report"]
+                else self.stdout
+            )
+        except OSError as exc:
+            raise CommandError(str(exc)) from exc
+
+        records = import_bookings(
+            source,
+            options["format"],
+            dry_run=options["dry_run"],
+            chunk_size=options["chunk_size"],
+        )
+        try:
+            for record in records:
+                if "summary" in record:
+                    # The report may be standard output; keep it NDJSON only.
+                    self.stderr.write(json.dumps(record["summary"]))
+                report.write(json.dumps(record) + "\n")
+        finally:
+            if source is not sys.stdin:
+                source.close()
+            if report is not self.stdout:
+                report.close()
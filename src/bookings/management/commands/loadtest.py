@@ -0,0 +1,59 @@
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+
+def fetch(url: str, headers: dict) -> tuple[float, int]:
+    request = urllib.request.Request(url, headers=headers)
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            response.read()
+            code = response.status
+    except urllib.error.HTTPError as exc:
+        code = exc.code
+    except OSError:
+        code = 0
+    return time.perf_counter() - started, code
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire concurrent GETs at one or more URLs and report throughput and "
+        "latency, e.g. to compare a sync WSGI endpoint with its async ASGI "
+        "counterpart at the same worker count"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("urls", nargs="+")
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument(
+            "--header", action="append", default=[], metavar="NAME:VALUE"
+        )
+
+    def handle(self, *args, **options):
+        headers = dict(item.split(":", 1) for item in options["header"] if ":" in item)
+        headers = {name.strip(): value.strip() for name, value in headers.items()}
+
+        for url in options["urls"]:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+                results = list(
+                    pool.map(lambda _: fetch(url, headers), range(options["requests"]))
+                )
+            elapsed = time.perf_counter() - started
+
+            latencies = sorted(latency for latency, _ in results)
+            errors = sum(1 for _, code in results if not 200 <= code < 400)
+            p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)]
+            self.stdout.write(
+                f"{url}\n"
+                f"  {len(results) / elapsed:8.1f} req/s  "
+                f"p50 {statistics.median(latencies) * 1000:7.1f} ms  "
+                f"p99 {p99 * 1000:7.1f} ms  errors {errors}"
+            )
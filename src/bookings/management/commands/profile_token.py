@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.profiling import HEADER, make_token
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Issue a request profiling token for a staff user; send it as the "
+        f"{HEADER} header (PROFILING_ENABLED must be on)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("username")
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(
+            username=options["username"], is_staff=True, is_active=True
+        ).first()
+        if user is None:
+            raise CommandError(f"No active staff user {options['username']!r}")
+        if not settings.PROFILING_ENABLED:
+            self.stderr.write("PROFILING_ENABLED is off; the token has no effect")
+        self.stdout.write(make_token(user))
@@ -0,0 +1,52 @@
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+
+import bookings.models
+from bookings.db_constraints import CREATE_SQLITE_TRIGGERS, DROP_SQLITE_TRIGGERS
+
+
+def add_sqlite_overlap_guard(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        for sql in CREATE_SQLITE_TRIGGERS:
+            schema_editor.execute(sql)
+
+
+def remove_sqlite_overlap_guard(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        for sql in DROP_SQLITE_TRIGGERS:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0001_initial"),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.AddConstraint(
+            model_name="booking",
+            constraint=models.CheckConstraint(
+                condition=models.Q(("end_date__gt", models.F("start_date"))),
+                name="booking_end_after_start",
+                violation_error_message="end_date must be after start_date",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="booking",
+            constraint=bookings.models.PostgresExclusionConstraint(
+                condition=models.Q(("status", "active")),
+                expressions=[
+                    ("room", "="),
+                    (
+                        bookings.models.DateRange("start_date", "end_date"),
+                        "&&",
+                    ),
+                ],
+                name="booking_no_overlap",
+                violation_error_message="Room is already booked for the given dates",
+            ),
+        ),
+        migrations.RunPython(add_sqlite_overlap_guard, remove_sqlite_overlap_guard),
+    ]
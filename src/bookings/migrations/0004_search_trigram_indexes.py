@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# GIN trigram indexes on UPPER(col): the expression Django's icontains
+# lookup compiles to on PostgreSQL. See bookings/search.py.
+TRIGRAM_INDEXES = (
+    ("bookings_room_number_trgm", "bookings", "Room", "number"),
+    ("bookings_room_name_trgm", "bookings", "Room", "name"),
+    ("bookings_user_username_trgm", *settings.AUTH_USER_MODEL.split("."), "username"),
+)
+
+
+def add_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, app_label, model_name, column in TRIGRAM_INDEXES:
+        table = apps.get_model(app_label, model_name)._meta.db_table
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {schema_editor.quote_name(table)} "
+            f"USING gin (UPPER({schema_editor.quote_name(column)}) gin_trgm_ops);"
+        )
+
+
+def remove_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, *_ in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name};")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("bookings", "0003_booking_keyset_indexes"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(add_trigram_indexes, remove_trigram_indexes),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 6.1.2 on 2026-10-18 02:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BACKFILL_BATCH_SIZE = 2000
+
+
+def backfill_total_price(apps, schema_editor):
+    # No rate plans exist yet, so every night costs the room's base price.
+    # Adding a nullable column keeps the SQLite overlap triggers intact.
+    Booking = apps.get_model("bookings", "Booking")
+    bookings = Booking.objects.using(schema_editor.connection.alias)
+    rows = bookings.order_by("pk").values_list(
+        "pk", "room__price_per_night", "start_date", "end_date"
+    )
+    last_pk = 0
+    while batch := list(rows.filter(pk__gt=last_pk)[:BACKFILL_BATCH_SIZE]):
+        bookings.bulk_update(
+            [
+                Booking(pk=pk, total_price=price * (end - start).days)
+                for pk, price, start, end in batch
+            ],
+            ["total_price"],
+        )
+        last_pk = batch[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0004_search_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="booking",
+            name="total_price",
+            field=models.DecimalField(
+                decimal_places=2, editable=False, max_digits=12, null=True
+            ),
+        ),
+        migrations.CreateModel(
+            name="RatePlan",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                ("start_date", models.DateField()),
+                ("end_date", models.DateField()),
+                (
+                    "weekdays",
+                    models.PositiveSmallIntegerField(
+                        default=127, help_text="Bitmask of weekdays, bit 0 is Monday"
+                    ),
+                ),
+                (
+                    "price_per_night",
+                    models.DecimalField(decimal_places=2, max_digits=10),
+                ),
+                ("priority", models.SmallIntegerField(default=0)),
+                (
+                    "room",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rate_plans",
+                        to="bookings.room",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["room", "start_date"],
+                "indexes": [
+                    models.Index(
+                        fields=["room", "start_date", "end_date"],
+                        name="bookings_ra_room_id_287b24_idx",
+                    )
+                ],
+                "constraints": [
+                    models.CheckConstraint(
+                        condition=models.Q(("end_date__gt", models.F("start_date"))),
+                        name="rateplan_end_after_start",
+                        violation_error_message="end_date must be after start_date",
+                    ),
+                    models.CheckConstraint(
+                        condition=models.Q(
+                            ("weekdays__gte", 1), ("weekdays__lte", 127)
+                        ),
+                        name="rateplan_weekdays_mask",
+                        violation_error_message="Select at least one weekday",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_total_price, migrations.RunPython.noop),
+    ]
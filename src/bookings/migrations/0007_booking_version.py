@@ -0,0 +1,29 @@
+from django.db import migrations, models
+
+from bookings.db_constraints import CREATE_SQLITE_TRIGGERS, DROP_SQLITE_TRIGGERS
+
+
+def restore_sqlite_overlap_guard(apps, schema_editor):
+    # SQLite can't ADD COLUMN ... NOT NULL DEFAULT, so Django rebuilds the
+    # table and the overlap triggers of migration 0002 go with the old one.
+    if schema_editor.connection.vendor == "sqlite":
+        for sql in DROP_SQLITE_TRIGGERS + CREATE_SQLITE_TRIGGERS:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0006_idempotency_keys"),
+    ]
+
+    operations = [
+        # Runs when unapplying, after RemoveField rebuilt the table again.
+        migrations.RunPython(migrations.RunPython.noop, restore_sqlite_overlap_guard),
+        migrations.AddField(
+            model_name="booking",
+            name="version",
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.RunPython(restore_sqlite_overlap_guard, migrations.RunPython.noop),
+    ]
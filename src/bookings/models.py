@@ -2,11 +2,87 @@ from typing import Optional
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AbstractUser
-from django.core.exceptions import ValidationError
-from django.db import models
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateRangeField, RangeOperators
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    IntegrityError,
+    connections,
+    models,
+    router,
+    transaction,
+)
+from django.db.models.signals import post_save, pre_save
+from django.utils import timezone
+
+from bookings.prometheus import (
+    BOOKINGS_CANCELLED,
+    CONFLICT_HOLD,
+    CONFLICT_OVERLAP,
+    CONFLICT_VERSION,
+    booking_conflict,
+)
 
 User: type[AbstractUser] = get_user_model()
 
+# Name of the database-level overlap guard: a GiST exclusion constraint over
+# ``daterange(start_date, end_date)`` on PostgreSQL (Booking.Meta) and an
+# equivalent pair of triggers on SQLite (bookings.db_constraints).
+BOOKING_OVERLAP_CONSTRAINT = "booking_no_overlap"
+OVERLAP_ENFORCING_VENDORS = ("postgresql", "sqlite")
+OVERLAP_ERROR = "Room is already booked for the given dates"
+HOLD_ERROR = "Room is being booked by another guest, try again in a few minutes"
+VERSION_CONFLICT_ERROR = "Booking was changed by another request, reload and retry"
+
+
+class BookingVersionConflict(Exception):
+    """The booking's row no longer has the version the instance was loaded at."""
+
+
+def overlap_enforced_by_db(using: str) -> bool:
+    return connections[using].vendor in OVERLAP_ENFORCING_VENDORS
+
+
+def is_overlap_violation(exc: IntegrityError) -> bool:
+    diag = getattr(exc.__cause__, "diag", None)
+    constraint_name = getattr(diag, "constraint_name", None)
+    if constraint_name:
+        return constraint_name == BOOKING_OVERLAP_CONSTRAINT
+    return BOOKING_OVERLAP_CONSTRAINT in str(exc)
+
+
+class DateRange(models.Func):
+    function = "DATERANGE"
+    output_field = DateRangeField()
+
+
+class PostgresExclusionConstraint(ExclusionConstraint):
+    """
+    An ``ExclusionConstraint`` with no DDL outside PostgreSQL.
+
+    Booking.clean() checks overlaps itself, skipping the SELECT where the
+    database enforces them, so ``validate()`` adds nothing.
+    """
+
+    def _applies(self, schema_editor) -> bool:
+        return schema_editor.connection.vendor == "postgresql"
+
+    def constraint_sql(self, model, schema_editor):
+        if self._applies(schema_editor):
+            return super().constraint_sql(model, schema_editor)
+
+    def create_sql(self, model, schema_editor):
+        if self._applies(schema_editor):
+            return super().create_sql(model, schema_editor)
+
+    def remove_sql(self, model, schema_editor):
+        if self._applies(schema_editor):
+            return super().remove_sql(model, schema_editor)
+
+    def validate(self, model, instance, exclude=None, using=DEFAULT_DB_ALIAS):
+        pass
+
 
 class Room(models.Model):
     number = models.CharField(max_length=50, unique=True)
@@ -23,6 +99,46 @@ class Room(models.Model):
         return f"{self.number} {self.name or ''}".strip()
 
 
+class RatePlan(models.Model):
+    """
+    Nightly price of a room over ``[start_date, end_date)``, optionally only
+    on some weekdays (seasons, weekend rates). Where plans overlap the
+    highest ``priority`` wins; nights no plan covers cost
+    ``Room.price_per_night``. See bookings/pricing.py.
+    """
+
+    ALL_WEEKDAYS = 0b1111111
+
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name="rate_plans")
+    name = models.CharField(max_length=100)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    weekdays = models.PositiveSmallIntegerField(
+        default=ALL_WEEKDAYS, help_text="Bitmask of weekdays, bit 0 is Monday"
+    )
+    price_per_night = models.DecimalField(max_digits=10, decimal_places=2)
+    priority = models.SmallIntegerField(default=0)
+
+    class Meta:
+        ordering = ["room", "start_date"]
+        indexes = [models.Index(fields=["room", "start_date", "end_date"])]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(end_date__gt=models.F("start_date")),
+                name="rateplan_end_after_start",
+                violation_error_message="end_date must be after start_date",
+            ),
+            models.CheckConstraint(
+                condition=models.Q(weekdays__gte=1, weekdays__lte=0b1111111),
+                name="rateplan_weekdays_mask",
+                violation_error_message="Select at least one weekday",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.room} {self.name} {self.start_date}..{self.end_date}"
+
+
 class Booking(models.Model):
     STATUS_ACTIVE = "active"
     STATUS_CANCELLED = "cancelled"
@@ -38,6 +154,12 @@ class Booking(models.Model):
     status = models.CharField(
         max_length=16, choices=STATUS_CHOICES, default=STATUS_ACTIVE
     )
+    # Priced once on save (bookings/pricing.py) so lists never recompute it
+    total_price = models.DecimalField(
+        max_digits=12, decimal_places=2, null=True, editable=False
+    )
+    # Bumped by every update; saves only apply to the version they loaded
+    version = models.PositiveIntegerField(default=1, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -45,29 +167,166 @@ class Booking(models.Model):
         ordering = ["-start_date"]
         indexes = [
             models.Index(fields=["room", "start_date", "end_date"]),
+            # Keyset pagination of the booking API, see api/pagination.py
+            models.Index(fields=["start_date", "id"]),
+            models.Index(fields=["user", "start_date", "id"]),
         ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(end_date__gt=models.F("start_date")),
+                name="booking_end_after_start",
+                violation_error_message="end_date must be after start_date",
+            ),
+            PostgresExclusionConstraint(
+                name=BOOKING_OVERLAP_CONSTRAINT,
+                expressions=[
+                    ("room", RangeOperators.EQUAL),
+                    (DateRange("start_date", "end_date"), RangeOperators.OVERLAPS),
+                ],
+                condition=models.Q(status="active"),
+                violation_error_message=OVERLAP_ERROR,
+            ),
+        ]
+
+    # Set by save() when the database guards against overlaps itself, so
+    # full_clean() can skip the extra SELECT round trip.
+    _overlap_checked_by_db = False
+    # Set by save(), which checks holds before any validation query.
+    _hold_checked = False
+    # (room_id, start_date, end_date) that total_price was computed for
+    _priced_stay: Optional[tuple] = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values, **kwargs):
+        instance = super().from_db(db, field_names, values, **kwargs)
+        loaded = instance.__dict__  # deferred fields are absent
+        if loaded.get("total_price") is not None and loaded.keys() >= {
+            "room_id",
+            "start_date",
+            "end_date",
+        }:
+            instance._priced_stay = instance.stay
+        return instance
+
+    @property
+    def stay(self) -> tuple:
+        return (self.room_id, self.start_date, self.end_date)
 
     def clean(self) -> None:
         if self.end_date <= self.start_date:
             raise ValidationError({"end_date": "end_date must be after start_date"})
 
-        overlapping = (
-            Booking.objects.filter(
-                room=self.room,
-                status=Booking.STATUS_ACTIVE,
-            )
-            .exclude(pk=self.pk)
-            .filter(
-                start_date__lt=self.end_date,
-                end_date__gt=self.start_date,
-            )
-        )
-        if overlapping.exists():
-            raise ValidationError("Room is already booked for the given dates")
+        if not self._hold_checked:
+            self.check_hold()
+        if not self._overlap_checked_by_db:
+            self.check_overlap()
+
+    def check_hold(self) -> None:
+        from bookings.holds import conflicting_hold
+
+        if self.status != self.STATUS_ACTIVE:
+            return
+        if conflicting_hold(self.room_id, self.start_date, self.end_date, self.user_id):
+            booking_conflict(CONFLICT_HOLD)
+            raise ValidationError({NON_FIELD_ERRORS: [HOLD_ERROR]})
+
+    def check_overlap(self) -> None:
+        from bookings.availability import room_has_overlap
+
+        # Read the primary: a replica may not have the conflicting booking yet.
+        using = router.db_for_write(Booking, instance=self)
+        if room_has_overlap(
+            self.room_id, self.start_date, self.end_date, self.pk, using=using
+        ):
+            booking_conflict(CONFLICT_OVERLAP)
+            raise ValidationError(OVERLAP_ERROR)
 
     def save(self, *args, **kwargs) -> None:
-        self.full_clean()
-        super().save(*args, **kwargs)
+        using = kwargs.get("using") or router.db_for_write(Booking, instance=self)
+
+        # Guests racing for a held room are turned away before any query.
+        if self.room_id and self.start_date and self.end_date:
+            self.check_hold()
+        self._hold_checked = True
+
+        self._overlap_checked_by_db = overlap_enforced_by_db(using)
+        try:
+            self.full_clean()
+        finally:
+            del self._overlap_checked_by_db, self._hold_checked
+
+        if self.total_price is None or self.stay != self._priced_stay:
+            from bookings.pricing import stay_total
+
+            self.total_price = stay_total(*self.stay)
+            self._priced_stay = self.stay
+
+        # Concurrent writers can both pass validation; the constraint decides
+        # the winner and the loser gets the same error clean() would raise.
+        try:
+            with transaction.atomic(using=using):
+                if self._state.adding or kwargs.get("force_insert"):
+                    super().save(*args, **kwargs)
+                else:
+                    self._update_version(using, kwargs.get("update_fields"))
+        except IntegrityError as exc:
+            if not is_overlap_violation(exc):
+                raise
+            booking_conflict(CONFLICT_OVERLAP)
+            raise ValidationError({NON_FIELD_ERRORS: [OVERLAP_ERROR]}) from exc
+
+    def _update_version(self, using: str, update_fields=None) -> None:
+        """
+        ``UPDATE ... SET version = n + 1 WHERE id = ... AND version = n``.
+
+        Raises ``BookingVersionConflict`` instead of overwriting a concurrent
+        edit (or, for a deleted row, falling back to an INSERT). Sends
+        ``pre_save`` and ``post_save`` as ``Model.save()`` would.
+        """
+        if update_fields is None and self.get_deferred_fields():
+            update_fields = set(self.__dict__) & {
+                f.attname for f in self._meta.concrete_fields
+            }
+        if update_fields is not None:
+            update_fields = frozenset(update_fields)
+        pre_save.send(
+            sender=Booking,
+            instance=self,
+            raw=False,
+            using=using,
+            update_fields=update_fields,
+        )
+
+        values = {
+            field.attname: field.pre_save(self, add=False)
+            for field in self._meta.concrete_fields
+            if not field.primary_key
+            and field.name != "version"
+            and (
+                update_fields is None
+                or field.name in update_fields
+                or field.attname in update_fields
+            )
+        }
+        expected = self.version
+        updated = (
+            Booking.objects.using(using)
+            .filter(pk=self.pk, version=expected)
+            .update(**values, version=expected + 1)
+        )
+        if not updated:
+            booking_conflict(CONFLICT_VERSION)
+            raise BookingVersionConflict(VERSION_CONFLICT_ERROR)
+        self.version = expected + 1
+        self._state.db = using
+        post_save.send(
+            sender=Booking,
+            instance=self,
+            created=False,
+            update_fields=update_fields,
+            raw=False,
+            using=using,
+        )
 
     @property
     def nights(self) -> int:
@@ -75,6 +334,76 @@ class Booking(models.Model):
             return (self.end_date - self.start_date).days
         return 0
 
-    def cancel(self, by_user: Optional[type[AbstractUser]] = None) -> None:
+    def cancel(
+        self,
+        by_user: Optional[type[AbstractUser]] = None,
+        expected_version: Optional[int] = None,
+    ) -> bool:
+        """
+        Cancel with one conditional UPDATE. Freeing dates can't create an
+        overlap, so there's no validation and no overlap query; post_save is
+        still sent for the availability index and caches.
+
+        Returns False if the booking was already cancelled. With
+        ``expected_version``, raises ``BookingVersionConflict`` if the booking
+        changed since that version.
+        """
+        using = router.db_for_write(Booking, instance=self)
+        row = Booking.objects.using(using).filter(pk=self.pk)
+        version = self.version if expected_version is None else expected_version
+        now = timezone.now()
+        while not row.filter(status=self.STATUS_ACTIVE, version=version).update(
+            status=self.STATUS_CANCELLED, version=version + 1, updated_at=now
+        ):
+            current = row.values_list("status", "version").first()
+            if current is None:
+                raise Booking.DoesNotExist(f"Booking {self.pk} no longer exists")
+            if current[0] != self.STATUS_ACTIVE:
+                self.status, self.version = current
+                return False
+            if expected_version is not None:
+                booking_conflict(CONFLICT_VERSION)
+                raise BookingVersionConflict(VERSION_CONFLICT_ERROR)
+            version = current[1]  # edited meanwhile; cancel the current version
+
         self.status = self.STATUS_CANCELLED
-        self.save()
+        self.version = version + 1
+        self.updated_at = now
+        BOOKINGS_CANCELLED.inc()
+        post_save.send(
+            sender=Booking,
+            instance=self,
+            created=False,
+            update_fields=frozenset({"status", "version", "updated_at"}),
+            raw=False,
+            using=using,
+        )
+        return True
+
+
+class IdempotencyKey(models.Model):
+    """
+    Stored outcome of a request sent with an ``Idempotency-Key`` header,
+    replayed for retries of the same request. See bookings/idempotency.py.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    scope = models.CharField(max_length=100)
+    key = models.CharField(max_length=255)
+    # SHA-256 of the request payload; a reused key must carry the same one
+    fingerprint = models.CharField(max_length=64)
+    # Null while the first request is still being processed
+    status_code = models.PositiveSmallIntegerField(null=True)
+    headers = models.JSONField(default=dict)
+    body = models.BinaryField(default=b"")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "scope", "key"], name="idempotency_key_unique"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.scope} {self.key}"
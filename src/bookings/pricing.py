@@ -0,0 +1,88 @@
+"""
+Stay pricing from per-date rate plans.
+
+A quote builds a ``rooms x nights`` matrix of nightly prices in integer
+cents: every row starts at the room's base price, then each rate plan
+overlapping the stay (lowest priority first, so higher priorities win)
+overwrites the nights it covers in one masked NumPy assignment - its date
+range sliced out of the row, filtered by a weekday bitmask test. Totals are a
+single ``sum`` along the nights axis. Python only loops over plans, never
+over nights.
+
+Quotes are cached under ``RATES_VERSION_KEY``, which signals bump whenever a
+room or rate plan changes, so a cached total is never served for prices that
+no longer exist.
+"""
+
+import hashlib
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from bookings.models import RatePlan, Room
+from bookings.versions import RATES_VERSION_KEY, get_version
+
+
+def to_cents(amount: Decimal) -> int:
+    return int(amount.scaleb(2))
+
+
+def from_cents(cents) -> Decimal:
+    return Decimal(int(cents)).scaleb(-2)
+
+
+def nightly_prices(room_ids: list[int], start: date, end: date) -> np.ndarray:
+    """
+    ``len(room_ids) x nights`` matrix of nightly prices in cents. Unknown
+    room IDs price at zero.
+    """
+    nights = (end - start).days
+    row_of = {room_id: row for row, room_id in enumerate(room_ids)}
+    base = np.zeros(len(room_ids), dtype=np.int64)
+    for room_id, price in Room.objects.filter(pk__in=room_ids).values_list(
+        "pk", "price_per_night"
+    ):
+        base[row_of[room_id]] = to_cents(price)
+    prices = np.repeat(base[:, np.newaxis], nights, axis=1)
+
+    plans = (
+        RatePlan.objects.filter(
+            room_id__in=room_ids, start_date__lt=end, end_date__gt=start
+        )
+        .order_by("priority", "id")
+        .values_list("room_id", "start_date", "end_date", "weekdays", "price_per_night")
+    )
+    # Bit of each night's weekday in a RatePlan.weekdays mask.
+    night_bits = 1 << ((np.arange(nights) + start.weekday()) % 7)
+    for room_id, plan_start, plan_end, weekdays, price in plans:
+        first = max((plan_start - start).days, 0)
+        last = min((plan_end - start).days, nights)
+        covered = (night_bits[first:last] & weekdays) != 0
+        row = prices[row_of[room_id], first:last]
+        row[covered] = to_cents(price)
+    return prices
+
+
+def _quote_key(room_ids: list[int], start: date, end: date) -> str:
+    rooms = hashlib.sha1(",".join(map(str, room_ids)).encode()).hexdigest()
+    version = get_version(RATES_VERSION_KEY)
+    return f"bookings:quote:{version}:{start}:{end}:{rooms}"
+
+
+def quote_totals(room_ids: list[int], start: date, end: date) -> dict[int, Decimal]:
+    """Total price of a ``[start, end)`` stay for each room, cached."""
+    room_ids = sorted(set(room_ids))
+    key = _quote_key(room_ids, start, end)
+    totals = cache.get(key)
+    if totals is None:
+        sums = nightly_prices(room_ids, start, end).sum(axis=1)
+        totals = dict(zip(room_ids, map(from_cents, sums)))
+        cache.set(key, totals, timeout=settings.QUOTE_CACHE_TIMEOUT)
+    return totals
+
+
+def stay_total(room_id: int, start: date, end: date) -> Decimal:
+    return quote_totals([room_id], start, end)[room_id]
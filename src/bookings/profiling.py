@@ -0,0 +1,213 @@
+"""
+On-demand profiling of single requests, for staff.
+
+With ``PROFILING_ENABLED`` on, a request carrying a profiling token - the
+``X-Profile`` header or the ``_profile`` query parameter - runs everything
+below ``ProfilingMiddleware`` (other middleware, the view, rendering) under
+a profiler. Tokens are signed, name a staff user and expire after
+``PROFILING_TOKEN_MAX_AGE`` seconds; ``manage.py profile_token <username>``
+issues them. Other requests pass straight through; with profiling disabled
+the middleware is not even loaded.
+
+Mode (``X-Profile-Mode`` / ``_profile_mode``):
+    cprofile: deterministic ``cProfile``; stores a ``.prof`` file for
+        ``pstats`` / snakeviz. The default.
+    sample: samples the request thread's stack every
+        ``PROFILING_SAMPLE_INTERVAL`` seconds; stores collapsed stacks
+        (``frame;frame;frame count``) for flamegraph.pl / speedscope. Much
+        lower overhead, so timings stay realistic.
+
+Output is written to ``PROFILING_DIR`` and named in the ``X-Profile-File``
+response header. With ``X-Profile-Inline: 1`` / ``_profile_inline=1`` the
+response body is replaced by the text report (top functions by cumulative
+time, or the collapsed stacks) and the view's status moves to
+``X-Profile-Status``.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from secrets import token_hex
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+
+TOKEN_SALT = "bookings.profiling"
+HEADER = "X-Profile"
+PARAM = "_profile"
+MODE_CPROFILE = "cprofile"
+MODE_SAMPLE = "sample"
+MODES = (MODE_CPROFILE, MODE_SAMPLE)
+REPORT_LIMIT = 60
+
+
+def make_token(user) -> str:
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(str(user.pk))
+
+
+def token_user_id(token: str) -> Optional[int]:
+    """The staff user a valid, unexpired token was issued to."""
+    try:
+        user_id = signing.TimestampSigner(salt=TOKEN_SALT).unsign(
+            token, max_age=settings.PROFILING_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return None
+    staff = (
+        get_user_model()
+        .objects.filter(pk=user_id, is_staff=True, is_active=True)
+        .exists()
+    )
+    return int(user_id) if staff else None
+
+
+def _option(request, name: str) -> str:
+    return request.headers.get(f"{HEADER}-{name}") or request.GET.get(
+        f"{PARAM}_{name.lower()}", ""
+    )
+
+
+class StackSampler:
+    """Samples one thread's Python stack from a background thread."""
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.items())
+
+
+class _Profile:
+    """One profiled request: a profiler around the rest of the stack."""
+
+    def __init__(self, request, mode: str) -> None:
+        self.mode = mode
+        self.inline = _option(request, "Inline") in ("1", "true")
+        self.directory = Path(settings.PROFILING_DIR)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{token_hex(3)}"
+        self.report = ""
+
+    def __enter__(self):
+        if self.mode == MODE_SAMPLE:
+            interval = settings.PROFILING_SAMPLE_INTERVAL
+            self.profiler = StackSampler(threading.get_ident(), interval)
+            self.profiler.__enter__()
+        else:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self.mode == MODE_SAMPLE:
+            self.profiler.__exit__(*exc_info)
+            self.name += ".collapsed"
+            self.report = self.profiler.collapsed()
+            (self.directory / self.name).write_text(self.report)
+        else:
+            self.profiler.disable()
+            self.name += ".prof"
+            stats = pstats.Stats(self.profiler)
+            stats.dump_stats(self.directory / self.name)
+            if self.inline:
+                self.report = self._pstats_text(stats)
+
+    def finish(self, response):
+        if self.inline:
+            status = response.status_code
+            response = HttpResponse(
+                self.report, content_type="text/plain; charset=utf-8"
+            )
+            response["X-Profile-Status"] = str(status)
+        response["X-Profile-File"] = self.name
+        return response
+
+    @staticmethod
+    def _pstats_text(stats: pstats.Stats) -> str:
+        out = io.StringIO()
+        stats.stream = out
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(REPORT_LIMIT)
+        return out.getvalue()
+
+
+def _unknown_mode() -> HttpResponse:
+    return HttpResponse(
+        f"Unknown profile mode, expected one of: {', '.join(MODES)}",
+        status=400,
+        content_type="text/plain",
+    )
+
+
+class ProfilingMiddleware:
+    # Under ASGI, everything on the event loop thread is profiled, including
+    # other requests' coroutines interleaved with this one.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = request.headers.get(HEADER) or request.GET.get(PARAM)
+        if not token or token_user_id(token) is None:
+            return self.get_response(request)
+
+        mode = _option(request, "Mode") or MODE_CPROFILE
+        if mode not in MODES:
+            return _unknown_mode()
+        with _Profile(request, mode) as profile:
+            response = self.get_response(request)
+        return profile.finish(response)
+
+    async def __acall__(self, request):
+        token = request.headers.get(HEADER) or request.GET.get(PARAM)
+        if not token or await sync_to_async(token_user_id)(token) is None:
+            return await self.get_response(request)
+
+        mode = _option(request, "Mode") or MODE_CPROFILE
+        if mode not in MODES:
+            return _unknown_mode()
+        with _Profile(request, mode) as profile:
+            response = await self.get_response(request)
+        return profile.finish(response)
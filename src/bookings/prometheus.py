@@ -0,0 +1,182 @@
+"""
+Prometheus metrics, served at ``/metrics``.
+
+    http_request_duration_seconds{method, route, status}
+        Histogram of request latency, observed by RequestTimingMiddleware
+        (bookings/instrumentation.py). ``route`` is the resolved URL name -
+        ``room-list``, ``booking-cancel``, ``rooms_list``, ... - or
+        ``unmatched`` for requests no URL pattern resolved.
+    bookings_created_total, bookings_cancelled_total
+    booking_conflicts_total{reason}
+        Booking writes rejected because of another booking: ``overlap``
+        (``Booking.clean()`` or the database constraint), ``hold`` (another
+        guest's checkout hold) or ``version`` (a concurrent edit).
+    db_connections_opened_total{alias}
+        Server connections opened, in every ``DB_POOL_MODE``.
+    db_pool_connections{alias, state}, db_pool_max_connections{alias},
+    db_pool_requests_waiting{alias}
+        ``pool`` mode only: pooled connections ``in_use`` or ``available``,
+        the configured maximum and requests queued for a connection.
+    db_pool_checkouts_total{alias}, db_pool_checkout_wait_seconds_total{alias},
+    db_pool_checkout_failures_total{alias}
+        ``pool`` mode only, from psycopg_pool's own statistics.
+
+    The database metrics (bookings/db_pool.py) are refreshed after every
+    request and before every scrape.
+
+Multiprocess: gunicorn workers each keep their own values. With
+``PROMETHEUS_MULTIPROC_DIR`` set (see entrypoint.sh) before the workers
+start, every worker writes its values to files there and ``/metrics``
+sums them across workers, whichever worker serves the scrape; gauges of
+exited workers are dropped by the ``child_exit`` hook in
+hotel_booking/gunicorn.py. Without it, e.g. in tests and ``runserver``,
+metrics are per process.
+
+``METRICS_TOKEN`` must be sent as ``Authorization: Bearer ...``. Without
+one configured, ``/metrics`` is only served with DEBUG on; otherwise it
+answers ``403``, so a deployment never exposes its metrics by accident.
+"""
+
+import os
+import secrets
+import threading
+
+from django.conf import settings
+from django.dispatch import receiver
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from bookings.db_pool import pool_metrics
+from bookings.instrumentation import request_measured
+
+CONFLICT_OVERLAP = "overlap"
+CONFLICT_HOLD = "hold"
+CONFLICT_VERSION = "version"
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by resolved route",
+    ["method", "route", "status"],
+)
+BOOKINGS_CREATED = Counter("bookings_created", "Bookings created")
+BOOKINGS_CANCELLED = Counter("bookings_cancelled", "Bookings cancelled")
+BOOKING_CONFLICTS = Counter(
+    "booking_conflicts",
+    "Booking writes rejected by a conflicting booking, hold or edit",
+    ["reason"],
+)
+
+DB_CONNECTIONS_OPENED = Counter(
+    "db_connections_opened", "Server connections opened", ["alias"]
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Pooled connections by state",
+    ["alias", "state"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_MAX = Gauge(
+    "db_pool_max_connections",
+    "Configured pool maximum",
+    ["alias"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAITING = Gauge(
+    "db_pool_requests_waiting",
+    "Requests waiting for a pooled connection",
+    ["alias"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKOUTS = Counter("db_pool_checkouts", "Pool checkouts", ["alias"])
+DB_POOL_CHECKOUT_WAIT = Counter(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a checkout", ["alias"]
+)
+DB_POOL_CHECKOUT_FAILURES = Counter(
+    "db_pool_checkout_failures", "Checkouts that timed out or failed", ["alias"]
+)
+
+# bookings/db_pool.py reports running totals; counters only move forward,
+# so each refresh adds what changed since the last one.
+_totals_lock = threading.Lock()
+_exported_totals: dict[tuple, float] = {}
+
+
+def _advance(counter: Counter, alias: str, total: float) -> None:
+    key = (counter, alias)
+    with _totals_lock:
+        previous = _exported_totals.get(key, 0)
+        _exported_totals[key] = total
+    # A smaller total means the pool was recreated and counts from zero.
+    increase = total - previous if total >= previous else total
+    if increase:
+        counter.labels(alias=alias).inc(increase)
+
+
+def export_pool_metrics() -> None:
+    for alias, entry in pool_metrics().items():
+        _advance(DB_CONNECTIONS_OPENED, alias, entry["connections_opened"])
+        if entry["mode"] != "pool":
+            continue
+        DB_POOL_CONNECTIONS.labels(alias=alias, state="in_use").set(entry["in_use"])
+        DB_POOL_CONNECTIONS.labels(alias=alias, state="available").set(
+            entry["pool_available"] or 0
+        )
+        DB_POOL_MAX.labels(alias=alias).set(entry["pool_max"] or 0)
+        DB_POOL_WAITING.labels(alias=alias).set(entry["requests_waiting"])
+        _advance(DB_POOL_CHECKOUTS, alias, entry["checkouts"])
+        _advance(DB_POOL_CHECKOUT_WAIT, alias, entry["checkout_wait_ms"] / 1000)
+        _advance(DB_POOL_CHECKOUT_FAILURES, alias, entry["checkout_failures"])
+
+
+def booking_conflict(reason: str) -> None:
+    BOOKING_CONFLICTS.labels(reason=reason).inc()
+
+
+def route_name(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.view_name or match.route
+
+
+@receiver(request_measured)
+def observe_request(sender, request, response, duration: float, **kwargs) -> None:
+    REQUEST_LATENCY.labels(
+        method=request.method,
+        route=route_name(request),
+        status=response.status_code,
+    ).observe(duration)
+    export_pool_metrics()
+
+
+def registry():
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    aggregated = CollectorRegistry()
+    multiprocess.MultiProcessCollector(aggregated)
+    return aggregated
+
+
+def metrics_view(request) -> HttpResponse:
+    token = settings.METRICS_TOKEN
+    if not token and not settings.DEBUG:
+        return HttpResponse(
+            "Set METRICS_TOKEN to enable /metrics",
+            status=403,
+            content_type="text/plain",
+        )
+    if token and not secrets.compare_digest(
+        request.headers.get("Authorization", ""), f"Bearer {token}"
+    ):
+        return HttpResponse(status=401)
+    export_pool_metrics()
+    return HttpResponse(generate_latest(registry()), content_type=CONTENT_TYPE_LATEST)
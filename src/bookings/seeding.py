@@ -0,0 +1,390 @@
+"""
+High-volume synthetic data: rooms, guests and non-overlapping bookings.
+
+``plan()`` generates everything as NumPy arrays from one seeded generator,
+so a seed always yields the same rooms, guests and stays:
+
+    - each room gets an occupancy rate from a Beta distribution (most rooms
+      busy, a few rarely let) and a share of the bookings proportional to it;
+    - stays are 1-14 nights, short stays and full weeks most common;
+    - the idle days before each stay are geometric, sized so the room's
+      booked share of its timeline matches its occupancy rate;
+    - each room's stays run back to back from there, the whole run centred
+      on ``around`` (today) so there are past, current and future stays;
+    - a few guests book far more than the rest (lognormal weights), and
+      about ``CANCELLED_SHARE`` of the stays are cancelled.
+
+Stays are laid out per room with one cumulative sum, so no Python loop
+touches individual bookings. ``overlaps()`` checks the plan set-wise - one
+sort by (room, start date) and a comparison of neighbours - instead of the
+per-row query ``Booking.clean()`` runs.
+
+``write()`` inserts the plan in one transaction: rooms and guests with
+``bulk_create``, bookings by method:
+
+    copy: PostgreSQL ``COPY``; the default there.
+    insert: one prepared ``INSERT`` run with ``executemany`` per chunk; the
+        default elsewhere.
+    bulk: chunked ``bulk_create``; portable, but model instances and SQL
+        compilation make it several times slower.
+
+Every stay belongs to a newly created room, so the plan cannot clash with
+bookings already in the database. See ``manage.py seed_data``.
+"""
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from itertools import islice
+from typing import Iterator, Optional
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.db import connection, transaction
+from django.utils import timezone
+
+from bookings.db_constraints import CREATE_SQLITE_TRIGGERS, DROP_SQLITE_TRIGGERS
+from bookings.models import BOOKING_OVERLAP_CONSTRAINT, Booking, Room
+from bookings.versions import RATES_VERSION_KEY, bookings_written, bump_version
+
+SEED_BATCH_SIZE = 5000
+METHOD_AUTO = "auto"
+METHOD_BULK = "bulk"
+METHOD_INSERT = "insert"
+METHOD_COPY = "copy"
+METHODS = (METHOD_AUTO, METHOD_BULK, METHOD_INSERT, METHOD_COPY)
+# Page cache while loading, so the booking indexes stay in memory
+SQLITE_LOAD_CACHE_KIB = 256 * 1024
+
+# Beta(a, b) occupancy per room; mean a / (a + b) = 0.625
+OCCUPANCY_BETA = (5.0, 3.0)
+# Share of stays lasting 1, 2, ... 14 nights
+NIGHTS_WEIGHTS = np.array([28, 24, 15, 9, 6, 4, 7, 2, 1, 1, 1, 0.5, 0.5, 1])
+CANCELLED_SHARE = 0.08
+ROOM_NAMES = ("Standard", "Deluxe", "Superior", "Junior Suite", "Family")
+ROOM_VIEWS = ("Garden", "Sea View", "City View", "Courtyard", "Pool")
+CAPACITIES = np.array([1, 2, 3, 4, 6])
+CAPACITY_WEIGHTS = np.array([0.15, 0.45, 0.15, 0.2, 0.05])
+# Lognormal nightly price around exp(mu), in whole currency units
+PRICE_MU, PRICE_SIGMA = np.log(120), 0.45
+# Spread of guest activity; a larger sigma concentrates bookings
+GUEST_SIGMA = 1.0
+
+BOOKING_COLUMNS = (
+    "user_id",
+    "room_id",
+    "start_date",
+    "end_date",
+    "status",
+    "total_price",
+    "version",
+    "created_at",
+    "updated_at",
+)
+
+
+class SeedError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class SeedPlan:
+    room_numbers: list[str]
+    room_names: list[str]
+    # Nightly price in cents
+    room_prices: np.ndarray
+    room_capacities: np.ndarray
+    usernames: list[str]
+    # One entry per booking; rooms and guests are indexes into the lists
+    # above, dates are proleptic ordinals (date.toordinal())
+    booking_rooms: np.ndarray
+    booking_users: np.ndarray
+    starts: np.ndarray
+    ends: np.ndarray
+    cancelled: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.booking_rooms)
+
+
+def plan(
+    rooms: int,
+    bookings: int,
+    users: int,
+    seed: int = 0,
+    around: Optional[date] = None,
+    prefix: str = "seed-",
+) -> SeedPlan:
+    if rooms < 0 or bookings < 0 or users < 0:
+        raise SeedError("Counts must not be negative")
+    if bookings and not (rooms and users):
+        raise SeedError("Bookings need at least one room and one guest")
+    rng = np.random.default_rng(seed)
+    around = around or date.today()
+
+    occupancy = rng.beta(*OCCUPANCY_BETA, size=rooms)
+    capacities = rng.choice(CAPACITIES, size=rooms, p=CAPACITY_WEIGHTS)
+    prices = np.round(rng.lognormal(PRICE_MU, PRICE_SIGMA, size=rooms)) * 100
+    names = [
+        f"{ROOM_NAMES[i]} {ROOM_VIEWS[j]}"
+        for i, j in zip(
+            rng.integers(len(ROOM_NAMES), size=rooms),
+            rng.integers(len(ROOM_VIEWS), size=rooms),
+        )
+    ]
+
+    counts = (
+        rng.multinomial(bookings, occupancy / occupancy.sum())
+        if bookings
+        else np.zeros(rooms, dtype=np.int64)
+    )
+    booking_rooms = np.repeat(np.arange(rooms), counts)
+    nights = 1 + rng.choice(
+        len(NIGHTS_WEIGHTS), size=bookings, p=NIGHTS_WEIGHTS / NIGHTS_WEIGHTS.sum()
+    )
+    # Idle days before each stay: mean nights * (1 - occupancy) / occupancy
+    rate = occupancy[booking_rooms]
+    idle = rng.geometric(rate / (rate + nights * (1 - rate))) - 1
+
+    # Stays run back to back per room: one cumulative sum over every room,
+    # minus what the rooms before it used up.
+    elapsed = np.concatenate(([0], np.cumsum(idle + nights)))
+    first = np.cumsum(counts) - counts
+    used_before = elapsed[first]
+    span = elapsed[first + counts] - used_before
+    offset = np.repeat(around.toordinal() - span // 2 - used_before, counts)
+    ends = elapsed[1:] + offset
+    starts = ends - nights
+
+    weights = rng.lognormal(0, GUEST_SIGMA, size=users)
+    booking_users = (
+        rng.choice(users, size=bookings, p=weights / weights.sum())
+        if bookings
+        else np.zeros(0, dtype=np.int64)
+    )
+    cancelled = rng.random(bookings) < CANCELLED_SHARE
+
+    return SeedPlan(
+        room_numbers=[f"{prefix}{n:05d}" for n in range(1, rooms + 1)],
+        room_names=names,
+        room_prices=prices.astype(np.int64),
+        room_capacities=capacities,
+        usernames=[f"{prefix}guest{n:06d}" for n in range(1, users + 1)],
+        booking_rooms=booking_rooms,
+        booking_users=booking_users,
+        starts=starts,
+        ends=ends,
+        cancelled=cancelled,
+    )
+
+
+def overlaps(seed_plan: SeedPlan) -> int:
+    """Number of active stays that start before the previous one ends."""
+    active = ~seed_plan.cancelled
+    rooms = seed_plan.booking_rooms[active]
+    starts = seed_plan.starts[active]
+    ends = seed_plan.ends[active]
+    order = np.lexsort((starts, rooms))
+    rooms, starts, ends = rooms[order], starts[order], ends[order]
+    same_room = rooms[1:] == rooms[:-1]
+    return int(np.count_nonzero(same_room & (starts[1:] < ends[:-1])))
+
+
+def validate(seed_plan: SeedPlan) -> None:
+    if np.any(seed_plan.ends <= seed_plan.starts):
+        raise SeedError("Plan has stays that end before they start")
+    clashes = overlaps(seed_plan)
+    if clashes:
+        raise SeedError(f"Plan has {clashes} overlapping active stays")
+
+
+def _booking_rows(
+    seed_plan: SeedPlan, room_ids: list[int], user_ids: list[int]
+) -> Iterator[tuple]:
+    """
+    ``(user_id, room_id, start, end, status, total_price)`` per booking.
+
+    Priced at the room's base rate: new rooms have no rate plans yet.
+    """
+    room_pks = np.asarray(room_ids)[seed_plan.booking_rooms].tolist()
+    user_pks = np.asarray(user_ids)[seed_plan.booking_users].tolist()
+    totals = (
+        seed_plan.room_prices[seed_plan.booking_rooms]
+        * (seed_plan.ends - seed_plan.starts)
+    ).tolist()
+    statuses = np.where(
+        seed_plan.cancelled, Booking.STATUS_CANCELLED, Booking.STATUS_ACTIVE
+    ).tolist()
+    for user_pk, room_pk, start, end, status, total in zip(
+        user_pks,
+        room_pks,
+        seed_plan.starts.tolist(),
+        seed_plan.ends.tolist(),
+        statuses,
+        totals,
+    ):
+        yield (
+            user_pk,
+            room_pk,
+            date.fromordinal(start),
+            date.fromordinal(end),
+            status,
+            Decimal(total).scaleb(-2),
+        )
+
+
+def _bulk_create(rows: Iterator[tuple], batch_size: int) -> None:
+    batch = []
+    for user_id, room_id, start, end, status, total in rows:
+        batch.append(
+            Booking(
+                user_id=user_id,
+                room_id=room_id,
+                start_date=start,
+                end_date=end,
+                status=status,
+                total_price=total,
+            )
+        )
+        if len(batch) >= batch_size:
+            Booking.objects.bulk_create(batch)
+            batch = []
+    Booking.objects.bulk_create(batch)
+
+
+def _insert(rows: Iterator[tuple], batch_size: int) -> None:
+    ops = connection.ops
+    now = ops.adapt_datetimefield_value(timezone.now())
+    placeholders = ", ".join(["%s"] * len(BOOKING_COLUMNS))
+    sql = (
+        f"INSERT INTO bookings_booking ({', '.join(BOOKING_COLUMNS)}) "
+        f"VALUES ({placeholders})"
+    )
+    with connection.cursor() as cursor:
+        while batch := [
+            (
+                user_id,
+                room_id,
+                ops.adapt_datefield_value(start),
+                ops.adapt_datefield_value(end),
+                status,
+                total,
+                1,
+                now,
+                now,
+            )
+            for user_id, room_id, start, end, status, total in islice(rows, batch_size)
+        ]:
+            cursor.executemany(sql, batch)
+
+
+def _copy(rows: Iterator[tuple]) -> None:
+    now = timezone.now()
+    sql = f"COPY bookings_booking ({', '.join(BOOKING_COLUMNS)}) FROM STDIN"
+    with connection.cursor() as cursor:
+        # The psycopg cursor under Django's wrapper
+        with cursor.cursor.copy(sql) as copy:
+            for row in rows:
+                copy.write_row((*row, 1, now, now))
+
+
+@contextmanager
+def _bulk_load() -> Iterator[None]:
+    """
+    Lift per-row overhead for the load; must run inside the transaction.
+
+    The overlap guard (the exclusion constraint on PostgreSQL, migration
+    0002's triggers on SQLite) checks every inserted row with its own index
+    lookup, which costs more than the insert; the plan was validated
+    set-wise already. It is dropped for the load and recreated
+    after - on PostgreSQL that re-checks every row in one constraint build,
+    and holds an exclusive lock on the bookings table until commit. SQLite
+    also gets a larger page cache, so the booking indexes stay in memory.
+    """
+    vendor = connection.vendor
+    drop, create, cache_size = [], [], None
+    if vendor == "postgresql":
+        guard = next(
+            constraint
+            for constraint in Booking._meta.constraints
+            if constraint.name == BOOKING_OVERLAP_CONSTRAINT
+        )
+        with connection.schema_editor(collect_sql=True, atomic=False) as editor:
+            drop = [str(guard.remove_sql(Booking, editor))]
+            create = [str(guard.create_sql(Booking, editor))]
+    elif vendor == "sqlite":
+        drop, create = DROP_SQLITE_TRIGGERS, CREATE_SQLITE_TRIGGERS
+    with connection.cursor() as cursor:
+        if vendor == "sqlite":
+            cache_size = cursor.execute("PRAGMA cache_size").fetchone()[0]
+            cursor.execute(f"PRAGMA cache_size = {-SQLITE_LOAD_CACHE_KIB}")
+        for sql in drop:
+            cursor.execute(sql)
+        try:
+            yield
+            for sql in create:
+                cursor.execute(sql)
+        finally:
+            if cache_size is not None:
+                cursor.execute(f"PRAGMA cache_size = {int(cache_size)}")
+
+
+def write(
+    seed_plan: SeedPlan,
+    method: str = METHOD_AUTO,
+    batch_size: int = SEED_BATCH_SIZE,
+) -> str:
+    """Insert the plan; return the method used for bookings."""
+    if method not in METHODS:
+        raise SeedError(f"Unknown method {method!r}, expected one of {METHODS}")
+    postgres = connection.vendor == "postgresql"
+    if method == METHOD_AUTO:
+        method = METHOD_COPY if postgres else METHOD_INSERT
+    if method == METHOD_COPY and not postgres:
+        raise SeedError("COPY needs PostgreSQL")
+    validate(seed_plan)
+
+    with transaction.atomic():
+        rooms = Room.objects.bulk_create(
+            [
+                Room(
+                    number=number,
+                    name=name,
+                    price_per_night=Decimal(price).scaleb(-2),
+                    capacity=capacity,
+                )
+                for number, name, price, capacity in zip(
+                    seed_plan.room_numbers,
+                    seed_plan.room_names,
+                    seed_plan.room_prices.tolist(),
+                    seed_plan.room_capacities.tolist(),
+                )
+            ],
+            batch_size=batch_size,
+        )
+        users = get_user_model().objects.bulk_create(
+            [
+                get_user_model()(username=username, password=UNUSABLE_PASSWORD_PREFIX)
+                for username in seed_plan.usernames
+            ],
+            batch_size=batch_size,
+        )
+        room_ids = [room.pk for room in rooms]
+        rows = _booking_rows(seed_plan, room_ids, [user.pk for user in users])
+        with _bulk_load():
+            if method == METHOD_COPY:
+                _copy(rows)
+            elif method == METHOD_INSERT:
+                _insert(rows, batch_size)
+            else:
+                _bulk_create(rows, batch_size)
+
+        bookings_written(room_ids)
+        transaction.on_commit(lambda: bump_version(RATES_VERSION_KEY))
+
+    if postgres:
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE bookings_room, bookings_booking, auth_user")
+    return method
@@ -1,3 +1,7 @@
+from datetime import date, timedelta
+from typing import Optional
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
@@ -13,6 +17,81 @@ class RoomSerializer(serializers.ModelSerializer):
         fields = ("id", "number", "name", "price_per_night", "capacity")
 
 
+class AvailabilityWindowSerializer(serializers.Serializer):
+    """
+    Query parameters of a calendar window; defaults to the next
+    ``AVAILABILITY_DEFAULT_WINDOW_DAYS`` days.
+    """
+
+    default_window_days: Optional[int] = None
+
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        start = attrs.get("start_date") or date.today()
+        end = attrs.get("end_date") or start + timedelta(
+            days=self.default_window_days or settings.AVAILABILITY_DEFAULT_WINDOW_DAYS
+        )
+        if end <= start:
+            raise serializers.ValidationError(
+                {"end_date": "end_date must be after start_date"}
+            )
+        if (end - start).days > settings.AVAILABILITY_MAX_WINDOW_DAYS:
+            raise serializers.ValidationError(
+                {
+                    "end_date": "Window must not exceed "
+                    f"{settings.AVAILABILITY_MAX_WINDOW_DAYS} days"
+                }
+            )
+        return {**attrs, "start_date": start, "end_date": end}
+
+
+class AvailableRoomsQuerySerializer(AvailabilityWindowSerializer):
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+
+
+class OccupancyQuerySerializer(AvailabilityWindowSerializer):
+    default_window_days = 90
+
+    # bookings.occupancy.ENCODINGS, spelled out to keep NumPy, which that
+    # module needs, out of every import of the serializers.
+    encoding = serializers.ChoiceField(choices=("rle", "bitset"), default="rle")
+
+
+class RoomAvailabilitySerializer(serializers.Serializer):
+    room = serializers.IntegerField()
+    price_per_night = serializers.DecimalField(max_digits=10, decimal_places=2)
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    booked = serializers.ListField(
+        child=serializers.ListField(child=serializers.DateField()),
+        help_text="Merged [start_date, end_date) ranges booked within the window",
+    )
+
+
+class QuoteQuerySerializer(AvailableRoomsQuerySerializer):
+    room = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        help_text="Limit the quote to these room IDs (repeat the parameter)",
+    )
+
+
+class RoomQuoteSerializer(serializers.Serializer):
+    room = serializers.IntegerField()
+    number = serializers.CharField()
+    total_price = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class QuoteSerializer(serializers.Serializer):
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    nights = serializers.IntegerField()
+    quotes = RoomQuoteSerializer(many=True)
+
+
 class BookingSerializer(serializers.ModelSerializer):
     user = serializers.StringRelatedField(read_only=True)
     room = RoomSerializer(read_only=True)
@@ -27,9 +106,82 @@ class BookingSerializer(serializers.ModelSerializer):
             "end_date",
             "status",
             "nights",
+            "total_price",
+            "version",
             "created_at",
         )
 
+    def update(self, instance, validated_data):
+        try:
+            return super().update(instance, validated_data)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.message_dict or e.messages)
+
+
+class BookingRowSerializer:
+    """
+    Read-only fast path for booking lists.
+
+    Builds exactly what ``BookingSerializer(many=True)`` returns, but from
+    ``values(*BookingRowSerializer.values)`` rows: no Booking, Room or User
+    instances and no per-row field binding. ``user`` is rendered as the
+    username, which is what ``str(user)`` gives for the default user model.
+    """
+
+    values = (
+        "id",
+        f"user__{User.USERNAME_FIELD}",
+        "room_id",
+        "room__number",
+        "room__name",
+        "room__price_per_night",
+        "room__capacity",
+        "start_date",
+        "end_date",
+        "status",
+        "total_price",
+        "version",
+        "created_at",
+    )
+
+    def __init__(self) -> None:
+        # Reuse DRF's formatting so decimals, dates and timezones match.
+        self._price = serializers.DecimalField(max_digits=10, decimal_places=2)
+        self._total = serializers.DecimalField(max_digits=12, decimal_places=2)
+        self._date = serializers.DateField()
+        self._datetime = serializers.DateTimeField()
+
+    def to_representation(self, rows) -> list[dict]:
+        username = f"user__{User.USERNAME_FIELD}"
+        price, as_date = self._price.to_representation, self._date.to_representation
+        as_datetime = self._datetime.to_representation
+        total = self._total.to_representation
+        return [
+            {
+                "id": row["id"],
+                "user": row[username],
+                "room": {
+                    "id": row["room_id"],
+                    "number": row["room__number"],
+                    "name": row["room__name"],
+                    "price_per_night": price(row["room__price_per_night"]),
+                    "capacity": row["room__capacity"],
+                },
+                "start_date": as_date(row["start_date"]),
+                "end_date": as_date(row["end_date"]),
+                "status": row["status"],
+                "nights": (row["end_date"] - row["start_date"]).days,
+                "total_price": (
+                    total(row["total_price"])
+                    if row["total_price"] is not None
+                    else None
+                ),
+                "version": row["version"],
+                "created_at": as_datetime(row["created_at"]),
+            }
+            for row in rows
+        ]
+
 
 class BookingCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -44,6 +196,25 @@ class BookingCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(e.message_dict or e.messages)
 
 
+class RoomHoldSerializer(serializers.Serializer):
+    token = serializers.CharField(read_only=True)
+    room = serializers.IntegerField()
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    expires_at = serializers.DateTimeField(read_only=True)
+
+    def validate(self, attrs):
+        if attrs["end_date"] <= attrs["start_date"]:
+            raise serializers.ValidationError(
+                {"end_date": "end_date must be after start_date"}
+            )
+        if not Room.objects.filter(pk=attrs["room"]).exists():
+            raise serializers.ValidationError(
+                {"room": f'Invalid pk "{attrs["room"]}" - object does not exist.'}
+            )
+        return attrs
+
+
 class RegisterSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
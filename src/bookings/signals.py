@@ -0,0 +1,74 @@
+from copy import copy
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from bookings.api.authentication import user_cache
+from bookings.availability import availability_index, on_commit
+from bookings.db_router import record_write
+from bookings.holds import consume_holds
+from bookings.models import Booking, RatePlan, Room
+from bookings.prometheus import BOOKINGS_CREATED
+from bookings.versions import RATES_VERSION_KEY, bump_room_versions, bump_version
+
+
+@receiver(post_save, sender=Booking)
+def count_created_booking(sender, instance: Booking, created: bool, **kwargs) -> None:
+    # Not until it commits: a rolled-back booking was never created.
+    if created:
+        transaction.on_commit(BOOKINGS_CREATED.inc, using=kwargs.get("using"))
+
+
+@receiver(post_save, sender=Booking)
+def consume_booked_holds(sender, instance: Booking, created: bool, **kwargs) -> None:
+    if created:
+        consume_holds(
+            instance.user_id, instance.room_id, instance.start_date, instance.end_date
+        )
+
+
+@receiver(post_save, sender=Booking)
+def sync_availability_on_save(sender, instance: Booking, **kwargs) -> None:
+    # Covers creation, edits and Booking.cancel(), which saves the new status.
+    # A copy, so edits made after the save don't reach the index on commit.
+    using = kwargs.get("using")
+    on_commit(availability_index.update, copy(instance), using=using)
+    # After commit, or a concurrent GET could cache the old data as new.
+    transaction.on_commit(partial(bump_room_versions, [instance.room_id]), using=using)
+    record_write(instance.user_id)
+
+
+@receiver(post_delete, sender=Booking)
+def sync_availability_on_delete(sender, instance: Booking, **kwargs) -> None:
+    using = kwargs.get("using")
+    on_commit(availability_index.discard, instance.pk, using=using)
+    transaction.on_commit(partial(bump_room_versions, [instance.room_id]), using=using)
+    record_write(instance.user_id)
+
+
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+def bump_room_api_version(sender, instance: Room, **kwargs) -> None:
+    using = kwargs.get("using")
+    transaction.on_commit(partial(bump_room_versions, [instance.pk]), using=using)
+    transaction.on_commit(partial(bump_version, RATES_VERSION_KEY), using=using)
+
+
+@receiver(post_save, sender=RatePlan)
+@receiver(post_delete, sender=RatePlan)
+def bump_rates_version(sender, instance: RatePlan, **kwargs) -> None:
+    # Cached quotes and the room API's quote responses
+    using = kwargs.get("using")
+    transaction.on_commit(partial(bump_version, RATES_VERSION_KEY), using=using)
+    transaction.on_commit(partial(bump_room_versions, [instance.room_id]), using=using)
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_cached_user(sender, instance, **kwargs) -> None:
+    # Password changes and deactivation must reach JWT authentication.
+    user_cache.invalidate(getattr(instance, jwt_settings.USER_ID_FIELD))
@@ -0,0 +1,62 @@
+"""
+Version counters for data the Room API renders.
+
+Kept in the shared cache so every worker sees a bump. A global counter
+covers room lists and searches; a per-room counter covers one room's detail
+and calendar. Both are bumped by Room and Booking signals (see signals.py)
+and by bulk updates that bypass them.
+"""
+
+import time
+from typing import Iterable
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from bookings import availability
+from bookings.availability import availability_index
+
+ROOMS_VERSION_KEY = "bookings:room-api:version"
+# Bumped on any Room or RatePlan change; keys cached quotes, see pricing.py.
+RATES_VERSION_KEY = "bookings:rates:version"
+
+
+def room_version_key(room_id: int) -> str:
+    return f"bookings:room-api:room:{room_id}"
+
+
+def _fresh_version() -> int:
+    # Seed from the clock so an evicted counter never restarts at a value
+    # some client may already hold an ETag for.
+    return time.time_ns() // 1000
+
+
+def get_version(key: str) -> int:
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _fresh_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key: str) -> None:
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _fresh_version(), timeout=None)
+
+
+def bump_room_versions(room_ids: Iterable[int] = ()) -> None:
+    bump_version(ROOMS_VERSION_KEY)
+    for room_id in set(room_ids):
+        bump_version(room_version_key(room_id))
+
+
+def bookings_written(room_ids: Iterable[int], using: str = DEFAULT_DB_ALIAS) -> None:
+    """
+    Refresh what the Booking signals would have for writes that bypass them
+    (``QuerySet.update()``, ``bulk_create()``, COPY), once they commit.
+    """
+    room_ids = set(room_ids)
+    availability.on_commit(availability_index.invalidate, using=using)
+    transaction.on_commit(lambda: bump_room_versions(room_ids), using=using)
@@ -1,5 +1,6 @@
 from datetime import date
 from urllib.parse import urlencode
+from uuid import uuid4
 
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
@@ -9,6 +10,9 @@ from django.http import HttpResponse, HttpResponseRedirect
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils.dateparse import parse_date
 
+from bookings.availability import exclude_booked
+from bookings.holds import held_room_ids
+from bookings.idempotency import SCOPE_BOOK_ROOM, idempotent
 from bookings.models import Booking, Room
 
 
@@ -26,11 +30,10 @@ def rooms_list(request) -> HttpResponse:
     end = parse_date(params.get("end_date") or "")
 
     if start and end:
-        rooms = rooms.exclude(
-            bookings__status=Booking.STATUS_ACTIVE,
-            bookings__start_date__lt=end,
-            bookings__end_date__gt=start,
-        )
+        rooms = exclude_booked(rooms, start, end)
+        held = held_room_ids(start, end)
+        if held:
+            rooms = rooms.exclude(id__in=held)
 
     if params.get("min_price"):
         rooms = rooms.filter(price_per_night__gte=params["min_price"])
@@ -92,17 +95,21 @@ def logout_view(request) -> HttpResponseRedirect:
 
 @login_required
 def my_bookings_view(request) -> HttpResponse:
-    bookings = Booking.objects.filter(user=request.user)
+    # The template shows each booking's room number.
+    bookings = Booking.objects.filter(user=request.user).select_related("room")
     return render(request, "bookings/my_bookings.html", {"bookings": bookings})
 
 
 @login_required
+@idempotent(SCOPE_BOOK_ROOM)
 def book_room_view(request, room_id: int) -> HttpResponse | HttpResponseRedirect:
     """
     HTML booking creation view.
 
     Validation logic lives in the Booking model.
     This view only handles user input and error presentation.
+    Every rendered form carries a fresh idempotency key, so a double submit
+    replays the first outcome instead of booking twice.
     """
     room = get_object_or_404(Room, id=room_id)
     guests_range = range(1, room.capacity + 1)
@@ -118,6 +125,7 @@ def book_room_view(request, room_id: int) -> HttpResponse | HttpResponseRedirect
                 {
                     "room": room,
                     "guests_range": guests_range,
+                    "idempotency_key": uuid4().hex,
                     "error": "Invalid dates",
                 },
             )
@@ -145,6 +153,7 @@ def book_room_view(request, room_id: int) -> HttpResponse | HttpResponseRedirect
                 {
                     "room": room,
                     "guests_range": guests_range,
+                    "idempotency_key": uuid4().hex,
                     "error": error,
                 },
             )
@@ -155,6 +164,7 @@ def book_room_view(request, room_id: int) -> HttpResponse | HttpResponseRedirect
         {
             "room": room,
             "guests_range": guests_range,
+            "idempotency_key": uuid4().hex,
         },
     )
 
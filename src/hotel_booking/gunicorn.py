@@ -0,0 +1,10 @@
+"""
+gunicorn settings, loaded by entrypoint.sh with ``-c python:hotel_booking.gunicorn``.
+"""
+
+from prometheus_client import multiprocess
+
+
+def child_exit(server, worker):
+    # Live gauges (bookings/prometheus.py) must not count a worker that is gone.
+    multiprocess.mark_process_dead(worker.pid)
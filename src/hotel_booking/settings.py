@@ -17,6 +17,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.staticfiles",
     "django.contrib.messages",
+    "django.contrib.postgres",
     "rest_framework",
     "django_filters",
     "bookings.apps.BookingsConfig",
@@ -25,6 +26,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its numbers cover the rest of the stack
+    "bookings.instrumentation.RequestTimingMiddleware",
+    # Not loaded unless PROFILING_ENABLED, see bookings/profiling.py
+    "bookings.profiling.ProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -32,13 +37,21 @@ MIDDLEWARE = [
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
+    "bookings.db_router.ReplicaRoutingMiddleware",
 ]
+# Every middleware above is async-capable except WhiteNoise, which an ASGI
+# worker would have to run in a thread per request. ASGI workers (web-async)
+# set SERVE_STATIC=0 and leave static files to the WSGI ones.
+SERVE_STATIC = os.getenv("SERVE_STATIC", "1") in ("1", "True", "true")
+if not SERVE_STATIC:
+    MIDDLEWARE.remove("whitenoise.middleware.WhiteNoiseMiddleware")
 
 ROOT_URLCONF = "hotel_booking.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates that reports render time, see bookings/instrumentation.py
+        "BACKEND": "bookings.instrumentation.InstrumentedDjangoTemplates",
         "DIRS": [],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -65,13 +78,77 @@ DATABASES = {
     }
 }
 
+# Connection handling per gunicorn worker, see bookings/db_pool.py
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "none")  # none | persistent | pool
+if DB_POOL_MODE == "persistent":
+    DATABASES["default"]["CONN_MAX_AGE"] = int(os.getenv("DB_CONN_MAX_AGE", "60"))
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+elif DB_POOL_MODE == "pool":
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "1")),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "4")),
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+        }
+    }
+
+# Read replicas, see bookings/db_router.py
+DATABASE_REPLICAS = []
+for index, host in enumerate(
+    filter(None, os.getenv("DB_REPLICA_HOSTS", "").split(","))
+):
+    DATABASES[f"replica{index}"] = {
+        **DATABASES["default"],
+        "HOST": host.strip(),
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica{index}")
+DATABASE_REPLICA_PIN_SECONDS = int(os.getenv("DB_REPLICA_PIN_SECONDS", "10"))
+DATABASE_ROUTERS = ["bookings.db_router.PrimaryReplicaRouter"]
+
+# Shared by every worker: holds, cache versions, replica pins, cached users
+# (see bookings/caches.py). Redis when REDIS_URL is set, otherwise the
+# database cache table created by entrypoint.sh.
+REDIS_URL = os.getenv("REDIS_URL", "")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "bookings_cache",
+        }
+    }
+
+# Checkout holds, see bookings/holds.py. CacheHoldStore needs the shared
+# cache above; LocalHoldStore keeps holds in process memory (tests).
+ROOM_HOLD_BACKEND = os.getenv("ROOM_HOLD_BACKEND", "bookings.holds.CacheHoldStore")
+ROOM_HOLD_TTL = int(os.getenv("ROOM_HOLD_TTL", "300"))
+
 if os.getenv("LOCAL_DEV") in ("1", "true", "True"):  # Used only for tests
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": BASE_DIR / "db.sqlite3",
-        }
+        },
+        # Separate database standing in for a replica; routing to it is off
+        # unless DATABASE_REPLICAS lists it.
+        "replica": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / "db.replica.sqlite3",
+        },
     }
+    DATABASE_REPLICAS = []
+    # One process; tests clear it between cases
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    # CacheHoldStore refuses the per-process cache
+    ROOM_HOLD_BACKEND = "bookings.holds.LocalHoldStore"
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -99,9 +176,20 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "bookings.api.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.AllowAny",),
+    "DEFAULT_RENDERER_CLASSES": (
+        "bookings.api.renderers.ORJSONRenderer",
+        "bookings.api.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "bookings.api.parsers.ORJSONParser",
+        "bookings.api.parsers.MessagePackParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "DEFAULT_FILTER_BACKENDS": (
         "django_filters.rest_framework.DjangoFilterBackend",
         "rest_framework.filters.OrderingFilter",
@@ -123,11 +211,72 @@ LOGGING = {
     "formatters": {
         "verbose": {"format": "%(levelname)s %(asctime)s %(module)s %(message)s"},
     },
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "formatter": "verbose"},
+    },
     "loggers": {
         "django": {"handlers": [], "level": "INFO", "propagate": True},
+        # One key=value line per request, see bookings/instrumentation.py
+        "bookings.requests": {
+            "handlers": ["console"],
+            "level": os.getenv("REQUEST_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
     },
 }
 
+# Per-request query count and timings, see bookings/instrumentation.py. The
+# Server-Timing header tells any client how long its queries took, so it is
+# only on by default with DEBUG.
+SERVER_TIMING_HEADER = os.getenv("SERVER_TIMING_HEADER", "1" if DEBUG else "0") in (
+    "1",
+    "True",
+    "true",
+)
+REQUEST_QUERY_WARNING = int(os.getenv("REQUEST_QUERY_WARNING", "50"))
+
+# Bearer token required by /metrics, which is disabled without one unless
+# DEBUG is on, see bookings/prometheus.py.
+# Set PROMETHEUS_MULTIPROC_DIR in the environment to aggregate across workers.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Staff request profiling with signed tokens, see bookings/profiling.py
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") in ("1", "True", "true")
+PROFILING_TOKEN_MAX_AGE = int(os.getenv("PROFILING_TOKEN_MAX_AGE", "900"))
+PROFILING_SAMPLE_INTERVAL = float(os.getenv("PROFILING_SAMPLE_INTERVAL", "0.002"))
+PROFILING_DIR = os.getenv("PROFILING_DIR", "/tmp/hotel_booking-profiles")
+
+# In-process room availability index, see bookings/availability.py
+AVAILABILITY_INDEX_ENABLED = os.getenv("AVAILABILITY_INDEX_ENABLED", "0") in (
+    "1",
+    "True",
+    "true",
+)
+AVAILABILITY_INDEX_CHECK = False
+AVAILABILITY_INDEX_TTL = int(os.getenv("AVAILABILITY_INDEX_TTL", "60"))
+AVAILABILITY_INDEX_SYNC_INTERVAL = float(
+    os.getenv("AVAILABILITY_INDEX_SYNC_INTERVAL", "1")
+)
+
+# Seconds a rendered Room API response stays cached, see bookings/api/caching.py
+ROOM_API_CACHE_TIMEOUT = int(os.getenv("ROOM_API_CACHE_TIMEOUT", "300"))
+# Idempotency-Key retention and abandoned-request takeover, see
+# bookings/idempotency.py; expired keys are removed by cleanup_idempotency_keys
+IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL", "86400"))
+IDEMPOTENCY_LOCK_TIMEOUT = int(os.getenv("IDEMPOTENCY_LOCK_TIMEOUT", "60"))
+
+# Quotes are keyed by the rate-plan version, so this only bounds cache size
+QUOTE_CACHE_TIMEOUT = int(os.getenv("QUOTE_CACHE_TIMEOUT", "3600"))
+
+# Calendar windows accepted by the room availability endpoints
+AVAILABILITY_DEFAULT_WINDOW_DAYS = 30
+AVAILABILITY_MAX_WINDOW_DAYS = int(os.getenv("AVAILABILITY_MAX_WINDOW_DAYS", "366"))
+
+# User resolution cache of bookings.api.authentication.CachedJWTAuthentication
+JWT_USER_CACHE_SIZE = 1024
+JWT_USER_CACHE_TTL = int(os.getenv("JWT_USER_CACHE_TTL", "30"))
+JWT_USER_SHARED_CACHE_TTL = 300
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
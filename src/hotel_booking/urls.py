@@ -8,23 +8,44 @@ from drf_spectacular.views import (
 from rest_framework import routers
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
-from bookings import views
+from bookings import prometheus, views
+from bookings.api import async_views as async_api
 from bookings.api import auth as auth_api
 from bookings.api import bookings as bookings_api
+from bookings.api import holds as holds_api
+from bookings.api import metrics as metrics_api
 from bookings.api import rooms as rooms_api
 
 router = routers.DefaultRouter()
 router.register(r"rooms", rooms_api.RoomViewSet, basename="room")
 router.register(r"bookings", bookings_api.BookingViewSet, basename="booking")
+router.register(r"holds", holds_api.RoomHoldViewSet, basename="hold")
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("metrics", prometheus.metrics_view, name="prometheus-metrics"),
     path("api/auth/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/auth/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("api/auth/register/", auth_api.RegisterAPIView.as_view(), name="api-register"),
+    path(
+        "api/metrics/db-pool/",
+        metrics_api.DatabasePoolMetricsView.as_view(),
+        name="db-pool-metrics",
+    ),
     path("api/", include(router.urls)),
 ]
 
+# Async variants of the hot paths, meant for the ASGI workers
+urlpatterns += [
+    path("api/async/rooms/", async_api.room_list, name="async-room-list"),
+    path(
+        "api/async/rooms/<int:pk>/availability/",
+        async_api.room_availability,
+        name="async-room-availability",
+    ),
+    path("api/async/bookings/", async_api.booking_create, name="async-booking-create"),
+]
+
 urlpatterns += [
     path("", views.rooms_list, name="rooms_list"),
     path("register/", views.register_view, name="register"),
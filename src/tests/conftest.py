@@ -2,13 +2,73 @@ from datetime import date, timedelta
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from rest_framework.test import APIClient
 
+from bookings.api.authentication import user_cache
+from bookings.availability import availability_index
+from bookings.holds import hold_store
+from bookings.instrumentation import request_measured
 from bookings.models import Booking, Room
 
 User = get_user_model()
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # The locmem cache outlives the per-test database rollback.
+    cache.clear()
+    user_cache.clear()
+    yield
+    cache.clear()
+    user_cache.clear()
+
+
+@pytest.fixture
+def availability_index_checked(settings):
+    # Opt in: serve lookups from the index but verify each answer against
+    # the database. The rest of the suite runs on the default, index off.
+    settings.AVAILABILITY_INDEX_ENABLED = True
+    settings.AVAILABILITY_INDEX_CHECK = True
+    availability_index.reset()
+    yield
+    availability_index.reset()
+
+
+@pytest.fixture(autouse=True)
+def local_holds():
+    hold_store().clear()
+    yield
+    hold_store().clear()
+
+
+@pytest.fixture(autouse=True)
+def query_budget(request):
+    """
+    ``@pytest.mark.query_budget(n)``: fail the test if any request it makes
+    runs more than ``n`` SQL queries (counted by RequestTimingMiddleware).
+    """
+    marker = request.node.get_closest_marker("query_budget")
+    if marker is None:
+        yield
+        return
+
+    budget = marker.args[0]
+    over = []
+
+    def check(sender, request, stats, **kwargs):
+        if stats.queries > budget:
+            over.append(f"{request.method} {request.get_full_path()}: {stats.queries}")
+
+    request_measured.connect(check, weak=False)
+    try:
+        yield
+    finally:
+        request_measured.disconnect(check)
+    if over:
+        pytest.fail(f"Query budget of {budget} exceeded:\n  " + "\n  ".join(over))
+
+
 @pytest.fixture
 def api_client():
     return APIClient()
@@ -0,0 +1,126 @@
+from datetime import date, timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from bookings.models import Booking, Room
+
+
+@pytest.mark.django_db
+def test_room_changelist_queries_do_not_grow_with_rooms(
+    admin_client, user, django_assert_max_num_queries
+):
+    start = date.today()
+    for i in range(20):
+        room = Room.objects.create(number=f"{i}", capacity=2, price_per_night=50)
+        Booking.objects.create(
+            user=user, room=room, start_date=start, end_date=start + timedelta(days=1)
+        )
+
+    with django_assert_max_num_queries(10):
+        resp = admin_client.get("/admin/bookings/room/")
+
+    assert resp.status_code == 200
+    assert b"<b>1</b> active" in resp.content
+
+
+@pytest.mark.django_db
+def test_room_autocomplete_skips_the_booking_count(admin_client, booking):
+    with CaptureQueriesContext(connection) as queries:
+        resp = admin_client.get(
+            reverse("admin:autocomplete"),
+            {
+                "term": booking.room.number,
+                "app_label": "bookings",
+                "model_name": "booking",
+                "field_name": "room",
+            },
+        )
+
+    assert resp.status_code == 200
+    assert resp.json()["results"][0]["id"] == str(booking.room.pk)
+    assert not any("bookings_booking" in q["sql"] for q in queries.captured_queries)
+
+
+@pytest.mark.django_db
+def test_available_today_filter(admin_client, user, room):
+    free = Room.objects.create(number="102", capacity=2, price_per_night=50)
+    Booking.objects.create(
+        user=user,
+        room=room,
+        start_date=date.today(),
+        end_date=date.today() + timedelta(days=2),
+    )
+
+    available = admin_client.get("/admin/bookings/room/", {"available": "yes"})
+    occupied = admin_client.get("/admin/bookings/room/", {"available": "no"})
+
+    assert list(available.context["cl"].result_list) == [free]
+    assert list(occupied.context["cl"].result_list) == [room]
+
+
+@pytest.mark.django_db
+def test_room_change_page_inlines_only_recent_bookings(admin_client, user, room):
+    old = date.today() - timedelta(days=400)
+    Booking.objects.create(
+        user=user, room=room, start_date=old, end_date=old + timedelta(days=2)
+    )
+    upcoming = Booking.objects.create(
+        user=user,
+        room=room,
+        start_date=date.today() + timedelta(days=3),
+        end_date=date.today() + timedelta(days=5),
+    )
+
+    resp = admin_client.get(f"/admin/bookings/room/{room.pk}/change/")
+
+    formset = resp.context["inline_admin_formsets"][0].formset
+    assert [form.instance for form in formset.forms] == [upcoming]
+
+
+@pytest.mark.django_db
+def test_booking_search_by_username_and_room(admin_client, user, booking):
+    other = Room.objects.create(
+        number="7", name="Garden", capacity=2, price_per_night=50
+    )
+    guest = Booking.objects.create(
+        user=user,
+        room=other,
+        start_date=booking.end_date,
+        end_date=booking.end_date + timedelta(days=1),
+    )
+
+    def search(term):
+        resp = admin_client.get("/admin/bookings/booking/", {"q": term})
+        assert resp.status_code == 200
+        return list(resp.context["cl"].result_list)
+
+    assert search("deluxe") == [booking]
+    assert search("user garden") == [guest]
+    # Exact room number ranks first, ahead of the start_date ordering.
+    assert search("7")[0] == guest
+
+
+@pytest.mark.django_db
+def test_cancel_action_bumps_booking_version(admin_client, booking):
+    resp = admin_client.post(
+        "/admin/bookings/booking/",
+        {"action": "cancel_bookings", "_selected_action": [booking.pk]},
+    )
+
+    assert resp.status_code == 302
+    booking.refresh_from_db()
+    assert booking.status == Booking.STATUS_CANCELLED
+    assert booking.version == 2
+
+
+@pytest.mark.django_db
+def test_cancel_button_cancels_through_the_model(admin_client, booking):
+    url = reverse("admin:bookings_booking_cancel", args=[booking.pk])
+
+    assert admin_client.get(url).status_code == 302
+    booking.refresh_from_db()
+    assert booking.status == Booking.STATUS_CANCELLED
+    assert booking.version == 2
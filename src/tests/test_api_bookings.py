@@ -3,6 +3,8 @@ from datetime import date, timedelta
 import pytest
 from django.urls import reverse
 
+from bookings.models import OVERLAP_ERROR, Booking
+
 
 @pytest.mark.django_db
 def test_authenticated_user_can_create_booking(auth_client, room):
@@ -16,3 +18,54 @@ def test_authenticated_user_can_create_booking(auth_client, room):
     )
 
     assert resp.status_code == 201
+
+
+@pytest.mark.django_db
+def test_overlapping_booking_returns_validation_error(auth_client, booking):
+    resp = auth_client.post(
+        reverse("booking-list"),
+        {
+            "room": booking.room_id,
+            "start_date": booking.start_date,
+            "end_date": booking.end_date,
+        },
+        format="json",
+    )
+
+    assert resp.status_code == 400
+    assert resp.data == {"__all__": ["Room is already booked for the given dates"]}
+
+
+@pytest.mark.django_db
+def test_update_into_another_booking_returns_validation_error(
+    auth_client, user, booking
+):
+    later = Booking.objects.create(
+        user=user,
+        room=booking.room,
+        start_date=booking.end_date,
+        end_date=booking.end_date + timedelta(days=2),
+    )
+
+    resp = auth_client.patch(
+        reverse("booking-detail", args=[later.pk]),
+        {"start_date": booking.start_date},
+        format="json",
+    )
+
+    assert resp.status_code == 400
+    assert resp.data == {"__all__": [OVERLAP_ERROR]}
+
+
+@pytest.mark.django_db
+def test_update_with_end_before_start_returns_validation_error(auth_client, booking):
+    resp = auth_client.patch(
+        reverse("booking-detail", args=[booking.pk]),
+        {"end_date": booking.start_date},
+        format="json",
+    )
+
+    assert resp.status_code == 400
+    assert "end_date" in resp.data
+    booking.refresh_from_db()
+    assert booking.version == 1
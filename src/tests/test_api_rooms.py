@@ -2,6 +2,8 @@ from datetime import date, timedelta
 
 import pytest
 
+from bookings.models import Booking
+
 
 @pytest.mark.django_db
 def test_rooms_available_endpoint(api_client, room):
@@ -15,3 +17,57 @@ def test_rooms_available_endpoint(api_client, room):
 
     assert resp.status_code == 200
     assert any(r["id"] == room.id for r in resp.data)
+
+
+@pytest.mark.django_db
+def test_available_requires_dates(api_client, room):
+    resp = api_client.get("/api/rooms/available/")
+
+    assert resp.status_code == 400
+    assert set(resp.data) == {"start_date", "end_date"}
+
+
+@pytest.mark.django_db
+def test_available_excludes_booked_rooms(api_client, room, booking):
+    resp = api_client.get(
+        "/api/rooms/available/",
+        {"start_date": booking.start_date, "end_date": booking.end_date},
+    )
+
+    assert resp.status_code == 200
+    assert resp.data == []
+
+
+@pytest.mark.django_db
+def test_available_rejects_oversized_window(api_client, settings):
+    settings.AVAILABILITY_MAX_WINDOW_DAYS = 7
+    start = date.today()
+
+    resp = api_client.get(
+        "/api/rooms/available/",
+        {"start_date": start, "end_date": start + timedelta(days=8)},
+    )
+
+    assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_availability_returns_merged_booked_ranges(api_client, user, room, booking):
+    Booking.objects.create(
+        user=user,
+        room=room,
+        start_date=booking.end_date,
+        end_date=booking.end_date + timedelta(days=2),
+    )
+    start = date.today()
+
+    resp = api_client.get(
+        f"/api/rooms/{room.id}/availability/",
+        {"start_date": start, "end_date": start + timedelta(days=5)},
+    )
+
+    assert resp.status_code == 200
+    assert resp.data["price_per_night"] == "100.00"
+    assert resp.data["booked"] == [
+        [str(booking.start_date), str(start + timedelta(days=5))]
+    ]
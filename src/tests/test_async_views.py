@@ -0,0 +1,159 @@
+import logging
+from datetime import date, timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.handlers.asgi import ASGIHandler
+from django.test import AsyncClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from bookings.db_router import PIN_COOKIE
+from bookings.models import Booking, Room
+
+
+@pytest.mark.django_db
+def test_async_room_list_matches_sync(client, room, booking):
+    resp = client.get("/api/async/rooms/")
+    booked = client.get(
+        "/api/async/rooms/",
+        {"start_date": booking.start_date, "end_date": booking.end_date},
+    )
+
+    assert resp.status_code == 200
+    assert resp.json() == client.get("/api/rooms/").json()
+    assert booked.json() == []
+
+
+@pytest.mark.django_db
+def test_async_room_availability_matches_sync(client, room, booking):
+    url = f"/api/rooms/{room.id}/availability/"
+
+    assert client.get(f"/api/async{url[4:]}").json() == client.get(url).json()
+
+
+@pytest.mark.django_db
+def test_async_booking_create(client, user, room, booking):
+    auth = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(user)}"}
+    start = booking.end_date + timedelta(days=1)
+    payload = {
+        "room": room.id,
+        "start_date": start.isoformat(),
+        "end_date": (start + timedelta(days=2)).isoformat(),
+    }
+
+    created = client.post(
+        "/api/async/bookings/", payload, content_type="application/json", **auth
+    )
+    conflict = client.post(
+        "/api/async/bookings/", payload, content_type="application/json", **auth
+    )
+    anonymous = client.post(
+        "/api/async/bookings/", payload, content_type="application/json"
+    )
+
+    assert created.status_code == 201
+    assert Booking.objects.filter(pk=created.json()["id"], user=user).exists()
+    assert conflict.status_code == 400
+    assert conflict.json() == {
+        "__all__": ["Room is already booked for the given dates"]
+    }
+    assert anonymous.status_code == 401
+
+
+@pytest.mark.django_db
+def test_async_booking_create_replays_idempotent_retries(client, user, room):
+    auth = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(user)}"}
+    start = date.today() + timedelta(days=3)
+    payload = {
+        "room": room.id,
+        "start_date": start.isoformat(),
+        "end_date": (start + timedelta(days=2)).isoformat(),
+    }
+
+    def post(url, key, body=payload):
+        return client.post(
+            url,
+            body,
+            content_type="application/json",
+            HTTP_IDEMPOTENCY_KEY=key,
+            **auth,
+        )
+
+    first = post("/api/async/bookings/", "async-1")
+    retry = post("/api/async/bookings/", "async-1")
+    # A retry may land on the other path: same scope, same fingerprint.
+    synced = post("/api/bookings/", "sync-1")
+    switched = post("/api/async/bookings/", "sync-1")
+    later = (start + timedelta(days=5)).isoformat()
+    reused = post("/api/async/bookings/", "async-1", {**payload, "end_date": later})
+
+    assert first.status_code == retry.status_code == 201
+    assert retry["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+    assert synced.status_code == 400  # already booked by "async-1"
+    assert switched.status_code == 400
+    assert switched["Idempotent-Replayed"] == "true"
+    assert reused.status_code == 422
+    assert Booking.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_async_booking_create_validates_payload(client, user):
+    resp = client.post(
+        "/api/async/bookings/",
+        {"room": "x", "start_date": date.today().isoformat()},
+        content_type="application/json",
+        HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}",
+    )
+
+    assert resp.status_code == 400
+    assert set(resp.json()) == {"room", "end_date"}
+
+
+@pytest.mark.django_db
+def test_async_room_list_searches_like_sync(client, room):
+    Room.objects.create(
+        number="202", name="Garden Suite", capacity=2, price_per_night=80
+    )
+    params = {"search": "garden"}
+
+    resp = client.get("/api/async/rooms/", params)
+
+    assert [r["number"] for r in resp.json()] == ["202"]
+    assert resp.json() == client.get("/api/rooms/", params).json()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_stack_times_and_pins_requests(user, room, settings):
+    settings.SERVER_TIMING_HEADER = True
+    start = date.today() + timedelta(days=1)
+    payload = {
+        "room": room.id,
+        "start_date": start.isoformat(),
+        "end_date": (start + timedelta(days=2)).isoformat(),
+    }
+    client = AsyncClient()
+
+    listed = async_to_sync(client.get)("/api/async/rooms/")
+    created = async_to_sync(client.post)(
+        "/api/async/bookings/",
+        payload,
+        content_type="application/json",
+        headers={"Authorization": f"Bearer {AccessToken.for_user(user)}"},
+    )
+
+    assert listed["Server-Timing"].startswith("db;dur=")
+    assert created.status_code == 201
+    assert PIN_COOKIE in created.cookies
+
+
+def test_asgi_middleware_needs_no_sync_adapters(settings, caplog):
+    settings.DEBUG = True  # adaptations are only logged in debug
+    settings.MIDDLEWARE = [
+        m for m in settings.MIDDLEWARE if not m.startswith("whitenoise.")
+    ]
+
+    with caplog.at_level(logging.DEBUG, logger="django.request"):
+        ASGIHandler()
+
+    assert not [r for r in caplog.records if "adapted" in r.getMessage()]
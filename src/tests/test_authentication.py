@@ -0,0 +1,66 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
+
+from bookings.api.authentication import CachedJWTAuthentication, user_cache
+
+
+def user_queries(api_client, path):
+    with CaptureQueriesContext(connection) as ctx:
+        resp = api_client.get(path)
+    assert resp.status_code == 200
+    return [q["sql"] for q in ctx.captured_queries if 'FROM "auth_user"' in q["sql"]]
+
+
+@pytest.fixture
+def token_client(api_client, user):
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    return api_client
+
+
+@pytest.mark.django_db
+def test_user_is_resolved_once_then_cached(token_client):
+    assert user_queries(token_client, "/api/bookings/my/")
+    assert user_queries(token_client, "/api/bookings/my/") == []
+
+
+@pytest.mark.django_db
+def test_deactivated_user_is_rejected(token_client, user):
+    token_client.get("/api/bookings/my/")
+
+    user.is_active = False
+    user.save()
+
+    assert token_client.get("/api/bookings/my/").status_code == 401
+
+
+@pytest.mark.django_db
+def test_claims_only_actions_skip_user_lookup(token_client, room):
+    assert user_queries(token_client, "/api/rooms/") == []
+
+
+@pytest.mark.django_db
+def test_shared_cache_holds_a_snapshot_not_the_user(token_client, user):
+    token_client.get("/api/bookings/my/")
+
+    snapshot = cache.get(f"bookings:auth-user:{user.pk}")
+    assert set(snapshot) == {"id", "is_active", "is_staff", "password_stamp"}
+    assert user.password not in snapshot.values()
+
+    user_cache.clear()  # another worker: only the shared layer is warm
+    cached = CachedJWTAuthentication().get_user(AccessToken.for_user(user))
+    assert (cached.pk, cached.is_staff) == (user.pk, False)
+    assert cached.get_deferred_fields() >= {"username", "password"}
+    assert cached.username == user.username
+
+
+@pytest.mark.django_db
+def test_password_change_drops_the_cached_user(token_client, user):
+    token_client.get("/api/bookings/my/")
+
+    user.set_password("changed")
+    user.save()
+
+    assert cache.get(f"bookings:auth-user:{user.pk}") is None
@@ -0,0 +1,117 @@
+from datetime import date, timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import transaction
+
+from bookings import availability
+from bookings.availability import (
+    GENERATION_CACHE_KEY,
+    RoomIntervals,
+    availability_index,
+    booked_room_ids,
+    exclude_booked,
+    room_has_overlap,
+)
+from bookings.models import Booking, Room
+
+pytestmark = pytest.mark.usefixtures("availability_index_checked")
+
+
+def test_room_intervals_overlap_uses_half_open_ranges():
+    d = date(2030, 1, 1)
+    intervals = RoomIntervals()
+    intervals.add(2, d + timedelta(days=5), d + timedelta(days=7))
+    intervals.add(1, d, d + timedelta(days=3))
+
+    assert intervals.overlaps(d + timedelta(days=2), d + timedelta(days=4))
+    assert not intervals.overlaps(d + timedelta(days=3), d + timedelta(days=5))
+    assert not intervals.overlaps(d + timedelta(days=6), d + timedelta(days=8), 2)
+
+
+# Transactional, so the signals' on_commit index updates run.
+@pytest.mark.django_db(transaction=True)
+def test_index_follows_create_cancel_and_delete(user, room, booking):
+    start, end = booking.start_date, booking.end_date
+
+    assert booked_room_ids(start, end) == {room.id}
+
+    booking.cancel()
+    assert booked_room_ids(start, end) == set()
+
+    rebooked = Booking.objects.create(
+        user=user, room=room, start_date=start, end_date=end
+    )
+    assert room_has_overlap(room.id, start, end)
+    assert not room_has_overlap(room.id, start, end, exclude=rebooked.pk)
+
+    rebooked.delete()
+    assert not room_has_overlap(room.id, start, end)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_index_reloads_after_bulk_update(user, room, booking):
+    other = Room.objects.create(number="102", capacity=2, price_per_night=80)
+    assert booked_room_ids(booking.start_date, booking.end_date) == {room.id}
+
+    Booking.objects.filter(pk=booking.pk).update(room=other)
+    availability_index.invalidate()
+
+    assert booked_room_ids(booking.start_date, booking.end_date) == {other.id}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_index_only_sees_committed_bookings(user, room):
+    start, end = date(2030, 1, 1), date(2030, 1, 3)
+    assert booked_room_ids(start, end) == set()
+
+    with transaction.atomic():
+        Booking.objects.create(user=user, room=room, start_date=start, end_date=end)
+        # The writer still sees its own booking, from the database.
+        assert room_has_overlap(room.id, start, end)
+        assert booked_room_ids(start, end) == {room.id}
+        assert not availability_index.room_has_overlap(room.id, start, end)
+        transaction.set_rollback(True)
+
+    assert not availability_index.room_has_overlap(room.id, start, end)
+    assert not room_has_overlap(room.id, start, end)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_room_search_is_answered_from_the_index(room, booking, settings):
+    settings.AVAILABILITY_INDEX_CHECK = False
+    free = Room.objects.create(number="102", capacity=2, price_per_night=80)
+
+    rooms = exclude_booked(Room.objects.all(), booking.start_date, booking.end_date)
+
+    assert "bookings_booking" not in str(rooms.query)
+    assert list(rooms) == [free]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_other_writers_are_seen_after_the_sync_interval(
+    room, booking, settings, monkeypatch
+):
+    settings.AVAILABILITY_INDEX_CHECK = False
+    start, end = booking.start_date, booking.end_date
+    assert availability_index.room_has_overlap(room.id, start, end)
+
+    # Another process cancels the booking and bumps the generation.
+    Booking.objects.filter(pk=booking.pk).update(status=Booking.STATUS_CANCELLED)
+    cache.incr(GENERATION_CACHE_KEY)
+    assert availability_index.room_has_overlap(room.id, start, end)
+
+    later = availability.time.monotonic() + settings.AVAILABILITY_INDEX_SYNC_INTERVAL
+    monkeypatch.setattr(availability.time, "monotonic", lambda: later)
+    assert not availability_index.room_has_overlap(room.id, start, end)
+
+
+@pytest.mark.django_db
+def test_rooms_list_hides_booked_rooms(client, room, booking):
+    free = Room.objects.create(number="102", capacity=2, price_per_night=80)
+
+    resp = client.get(
+        "/", {"start_date": booking.start_date, "end_date": booking.end_date}
+    )
+
+    assert list(resp.context["rooms"]) == [free]
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from bookings.benchmark import CASE_NAMES, compare, percentile, seed_dataset
+from bookings.models import Booking, Room
+
+SMALL = ["--rooms=4", "--bookings=40", "--users=3", "--repeat=2"]
+
+
+def stays():
+    return list(
+        Booking.objects.order_by("room__number", "start_date").values_list(
+            "room__number", "user__username", "start_date", "end_date", "status"
+        )
+    )
+
+
+@pytest.mark.django_db
+def test_seed_dataset_is_deterministic():
+    dataset = seed_dataset(rooms=4, bookings=42, users=3, seed=7)
+    first = stays()
+    assert len(first) == 42
+    assert Room.objects.count() == 4
+    assert not Booking.objects.filter(total_price__isnull=True).exists()
+    assert all(b.end_date < dataset.free_from for b in Booking.objects.all())
+
+    Room.objects.all().delete()
+    get_user_model().objects.all().delete()
+    seed_dataset(rooms=4, bookings=42, users=3, seed=7)
+    assert stays() == first
+
+
+def test_compare_flags_slower_and_chattier_cases():
+    baseline = {"cases": {"a": {"p50_ms": 10, "p99_ms": 20, "queries": 3}}}
+    report = {
+        "cases": {
+            "a": {"p50_ms": 11, "p99_ms": 30, "queries": 4},
+            "new": {"p50_ms": 1, "p99_ms": 1, "queries": 1},
+        }
+    }
+
+    assert compare(baseline, report, threshold=0.2) == [
+        "a: p99_ms 30.00 > 20.00 +20%",
+        "a: 4 queries > 3",
+    ]
+
+
+@pytest.mark.django_db
+def test_benchmark_command_saves_and_checks_baseline(tmp_path):
+    baseline = tmp_path / "baseline.json"
+
+    call_command("benchmark", *SMALL, f"--save-baseline={baseline}")
+
+    report = json.loads(baseline.read_text())
+    assert set(report["cases"]) == set(CASE_NAMES)
+    assert not Booking.objects.exists()  # rolled back
+
+    for case in report["cases"].values():
+        case["queries"] = 0
+    baseline.write_text(json.dumps(report))
+    with pytest.raises(CommandError, match="Regressions against the baseline"):
+        call_command("benchmark", *SMALL, f"--baseline={baseline}")
+
+
+def test_percentile_uses_the_nearest_rank():
+    assert percentile([1.0, 2.0], 0.99) == 2.0
+    assert percentile([1.0, 2.0], 0.5) == 1.0
+    assert percentile([float(i) for i in range(1, 101)], 0.99) == 99.0
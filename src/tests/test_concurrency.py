@@ -0,0 +1,134 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+
+from bookings.availability import room_has_overlap
+from bookings.models import Booking, BookingVersionConflict
+
+
+def detail(booking):
+    return reverse("booking-detail", args=[booking.pk])
+
+
+@pytest.mark.django_db
+def test_stale_save_raises_instead_of_overwriting(booking):
+    first = Booking.objects.get(pk=booking.pk)
+    second = Booking.objects.get(pk=booking.pk)
+
+    first.end_date += timedelta(days=1)
+    first.save()
+    second.end_date += timedelta(days=2)
+    with pytest.raises(BookingVersionConflict):
+        second.save()
+
+    booking.refresh_from_db()
+    assert (booking.end_date, booking.version) == (first.end_date, 2)
+    assert second.version == 1
+
+
+@pytest.mark.django_db
+def test_update_fields_save_bumps_version(booking):
+    booking.status = Booking.STATUS_CANCELLED
+    booking.save(update_fields=["status"])
+
+    assert Booking.objects.values_list("version", flat=True).get() == 2
+
+
+@pytest.mark.django_db
+def test_save_of_deleted_booking_conflicts_instead_of_inserting(booking):
+    stale = Booking.objects.get(pk=booking.pk)
+    booking.delete()
+
+    with pytest.raises(BookingVersionConflict):
+        stale.save()
+
+    assert not Booking.objects.exists()
+
+
+@pytest.mark.django_db
+def test_cancel_is_one_update_without_overlap_query(booking, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        assert booking.cancel() is True
+
+    assert (booking.status, booking.version) == (Booking.STATUS_CANCELLED, 2)
+    assert not room_has_overlap(booking.room_id, booking.start_date, booking.end_date)
+    assert booking.cancel() is False
+
+
+@pytest.mark.django_db
+def test_cancel_of_stale_instance_cancels_current_version(booking):
+    edited = Booking.objects.get(pk=booking.pk)
+    edited.end_date += timedelta(days=1)
+    edited.save()
+
+    with pytest.raises(BookingVersionConflict):
+        booking.cancel(expected_version=booking.version)
+    assert booking.cancel() is True
+    assert Booking.objects.values_list("status", "version").get() == ("cancelled", 3)
+
+
+@pytest.mark.django_db
+def test_detail_etag_and_if_match(auth_client, booking):
+    resp = auth_client.get(detail(booking))
+    etag = resp["ETag"]
+    assert etag == f'"{booking.pk}.1"'
+
+    resp = auth_client.patch(
+        detail(booking),
+        {"end_date": booking.end_date + timedelta(days=1)},
+        format="json",
+        HTTP_IF_MATCH=etag,
+    )
+    assert resp.status_code == 200
+    assert resp.data["version"] == 2
+    assert resp["ETag"] == f'"{booking.pk}.2"'
+
+    resp = auth_client.patch(
+        detail(booking),
+        {"end_date": booking.end_date},
+        format="json",
+        HTTP_IF_MATCH=etag,
+    )
+    assert resp.status_code == 412
+    booking.refresh_from_db()
+    assert booking.version == 2
+
+
+@pytest.mark.django_db
+def test_cancel_and_delete_honour_if_match(auth_client, booking):
+    url = reverse("booking-cancel", args=[booking.pk])
+    assert auth_client.post(url, HTTP_IF_MATCH='"0.0"').status_code == 412
+    assert auth_client.delete(detail(booking), HTTP_IF_MATCH='"0.0"').status_code == 412
+
+    resp = auth_client.post(url, HTTP_IF_MATCH=f'"{booking.pk}.1"')
+    assert resp.status_code == 200
+    assert resp["ETag"] == f'"{booking.pk}.2"'
+
+    resp = auth_client.delete(detail(booking), HTTP_IF_MATCH="*")
+    assert resp.status_code == 204
+    assert not Booking.objects.exists()
+
+
+@pytest.mark.django_db
+def test_write_racing_a_concurrent_edit_gets_409(auth_client, booking, monkeypatch):
+    from bookings.api.bookings import BookingViewSet
+
+    get_object = BookingViewSet.get_object
+
+    def edited_after_check(self):
+        obj = get_object(self)
+        Booking.objects.filter(pk=obj.pk).update(version=obj.version + 1)
+        return obj
+
+    monkeypatch.setattr(BookingViewSet, "get_object", edited_after_check)
+    resp = auth_client.patch(
+        detail(booking),
+        {"end_date": booking.end_date + timedelta(days=1)},
+        format="json",
+        HTTP_IF_MATCH=f'"{booking.pk}.1"',
+    )
+
+    assert resp.status_code == 409
+    booking.refresh_from_db()
+    assert booking.version == 2
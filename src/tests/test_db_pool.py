@@ -0,0 +1,52 @@
+import pytest
+from django.db import connections
+
+from bookings.db_pool import pool_metrics, pool_mode
+
+
+def test_pool_mode_from_settings():
+    assert pool_mode({"OPTIONS": {"pool": {"max_size": 4}}}) == "pool"
+    assert pool_mode({"CONN_MAX_AGE": 60, "OPTIONS": {}}) == "persistent"
+    assert pool_mode({"CONN_MAX_AGE": 0}) == "none"
+
+
+@pytest.mark.django_db
+def test_pool_metrics_report_psycopg_pool_stats(monkeypatch):
+    class FakePool:
+        def get_stats(self):
+            return {
+                "pool_min": 1,
+                "pool_max": 4,
+                "pool_size": 3,
+                "pool_available": 1,
+                "connections_num": 3,
+                "requests_num": 10,
+                "requests_wait_ms": 25,
+                "requests_errors": 2,
+            }
+
+    connection = connections["default"]
+    monkeypatch.setitem(connection.settings_dict, "OPTIONS", {"pool": True})
+    monkeypatch.setattr(type(connection), "pool", FakePool(), raising=False)
+
+    metrics = pool_metrics()["default"]
+
+    assert metrics["mode"] == "pool"
+    assert metrics["connections_opened"] == 3
+    assert metrics["checkouts"] == 10
+    assert metrics["in_use"] == 2
+    assert metrics["utilisation"] == 0.5
+    assert metrics["checkout_wait_ms"] == 25
+    assert metrics["checkout_failures"] == 2
+
+
+@pytest.mark.django_db
+def test_db_pool_metrics_endpoint_is_staff_only(api_client, admin_user, user):
+    api_client.force_authenticate(user=user)
+    assert api_client.get("/api/metrics/db-pool/").status_code == 403
+
+    api_client.force_authenticate(user=admin_user)
+    resp = api_client.get("/api/metrics/db-pool/")
+
+    assert resp.status_code == 200
+    assert resp.data["default"]["mode"] == "none"
@@ -0,0 +1,102 @@
+from datetime import date, timedelta
+
+import pytest
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+
+from bookings.db_router import (
+    PIN_COOKIE,
+    PrimaryReplicaRouter,
+    ReplicaRoutingMiddleware,
+    record_write,
+)
+from bookings.models import Booking, Room
+
+# "replica" is a separate SQLite database, so rows only show up where written.
+pytestmark = pytest.mark.django_db(databases=["default", "replica"])
+
+
+@pytest.fixture(autouse=True)
+def replica(settings, tmp_path):
+    settings.DATABASE_REPLICAS = ["replica"]
+    # User pins need a cache every worker sees.
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path),
+        }
+    }
+
+
+def test_anonymous_reads_go_to_the_replica(api_client, room):
+    Room.objects.using("replica").create(
+        number="R1", name="Replica", capacity=1, price_per_night=10
+    )
+
+    resp = api_client.get(reverse("room-list"))
+
+    assert [r["number"] for r in resp.data] == ["R1"]
+
+
+def test_reads_outside_requests_use_the_primary(room):
+    assert list(Room.objects.values_list("number", flat=True)) == ["101"]
+
+
+def test_booking_write_pins_client_and_user_to_primary(auth_client, room):
+    start = date.today() + timedelta(days=1)
+    resp = auth_client.post(
+        reverse("booking-list"),
+        {"room": room.id, "start_date": start, "end_date": start + timedelta(2)},
+        format="json",
+    )
+    assert resp.status_code == 201
+    assert PIN_COOKIE in resp.cookies
+
+    # Pinned by cookie.
+    assert len(auth_client.get(reverse("booking-my")).data["results"]) == 1
+
+    # Pinned by user, e.g. a JWT client that drops cookies.
+    auth_client.cookies.clear()
+    assert len(auth_client.get(reverse("booking-my")).data["results"]) == 1
+
+    # Pin expired: back on the (empty) replica.
+    cache.clear()
+    assert auth_client.get(reverse("booking-my")).data["results"] == []
+
+
+def test_overlap_check_reads_the_primary(booking):
+    def view(request):
+        # A plain read in this request is served by the replica...
+        assert not Booking.objects.exists()
+        # ...but the overlap check still sees the primary's booking.
+        clash = Booking(
+            user=booking.user,
+            room=booking.room,
+            start_date=booking.start_date,
+            end_date=booking.end_date,
+        )
+        with pytest.raises(ValidationError):
+            clash.full_clean()
+        return HttpResponse()
+
+    cache.clear()  # drop the user pin left by the booking fixture
+    ReplicaRoutingMiddleware(view)(RequestFactory().get("/"))
+
+
+def test_user_pins_refuse_a_per_process_cache(settings, user):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+
+    with pytest.raises(ImproperlyConfigured, match="shared"):
+        record_write(user.pk)
+
+
+def test_replicas_are_never_migrated():
+    router = PrimaryReplicaRouter()
+
+    assert router.allow_migrate("replica", "bookings") is False
+    assert router.allow_migrate("default", "bookings") is None
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+from bookings.models import Booking
+
+
+@pytest.mark.django_db
+def test_export_is_staff_only(auth_client, booking):
+    resp = auth_client.get("/api/bookings/export/")
+
+    assert resp.status_code == 403
+
+
+@pytest.mark.django_db
+def test_export_streams_csv(api_client, admin_user, booking):
+    api_client.force_authenticate(user=admin_user)
+
+    resp = api_client.get("/api/bookings/export/")
+
+    assert resp.status_code == 200
+    assert resp.streaming
+    lines = b"".join(resp.streaming_content).decode().splitlines()
+    assert lines[0] == (
+        "id,user,room_id,room_number,start_date,end_date,nights,status,created_at"
+    )
+    assert lines[1].startswith(
+        f"{booking.id},user,{booking.room_id},101,{booking.start_date},"
+        f"{booking.end_date},3,active,"
+    )
+
+
+@pytest.mark.django_db
+def test_export_ndjson_honours_booking_filter(api_client, admin_user, booking):
+    api_client.force_authenticate(user=admin_user)
+
+    active = api_client.get(
+        "/api/bookings/export/", {"export_format": "ndjson", "status": "active"}
+    )
+    cancelled = api_client.get(
+        "/api/bookings/export/", {"export_format": "ndjson", "status": "cancelled"}
+    )
+
+    rows = [
+        json.loads(line) for line in b"".join(active.streaming_content).splitlines()
+    ]
+    assert [row["id"] for row in rows] == [booking.id]
+    assert b"".join(cancelled.streaming_content) == b""
+
+
+@pytest.mark.django_db
+def test_export_bookings_command(tmp_path, booking):
+    Booking.objects.filter(pk=booking.pk).update(status=Booking.STATUS_CANCELLED)
+    output = tmp_path / "bookings.ndjson"
+
+    call_command(
+        "export_bookings",
+        "--format=ndjson",
+        f"--output={output}",
+        "--filter=status=cancelled",
+    )
+
+    rows = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [(row["id"], row["status"]) for row in rows] == [(booking.id, "cancelled")]
@@ -0,0 +1,152 @@
+from datetime import date, timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from bookings import holds
+from bookings.models import HOLD_ERROR, Booking
+
+User = get_user_model()
+
+START = date.today() + timedelta(days=5)
+END = START + timedelta(days=3)
+
+
+@pytest.fixture
+def guest(db):
+    return User.objects.create_user(username="guest", password="pass")
+
+
+@pytest.fixture
+def guest_client(guest):
+    client = APIClient()
+    client.force_authenticate(user=guest)
+    return client
+
+
+@pytest.fixture
+def hold(auth_client, room):
+    resp = auth_client.post(
+        reverse("hold-list"),
+        {"room": room.id, "start_date": START, "end_date": END},
+        format="json",
+    )
+    assert resp.status_code == 201
+    return resp.data
+
+
+def test_held_room_turns_other_guests_away_before_the_write(
+    hold, guest_client, room, django_assert_max_num_queries
+):
+    with django_assert_max_num_queries(1):  # the serializer's room lookup
+        resp = guest_client.post(
+            reverse("booking-list"),
+            {"room": room.id, "start_date": START + timedelta(1), "end_date": END},
+            format="json",
+        )
+
+    assert resp.status_code == 400
+    assert resp.data == {"__all__": [HOLD_ERROR]}
+    assert not Booking.objects.exists()
+
+
+def test_holder_books_and_consumes_the_hold(hold, auth_client, room):
+    resp = auth_client.post(
+        reverse("booking-list"),
+        {"room": room.id, "start_date": START, "end_date": END},
+        format="json",
+    )
+
+    assert resp.status_code == 201
+    assert holds.hold_store().live_holds(room.id) == []
+
+
+def test_held_room_is_hidden_from_availability(hold, api_client, room):
+    params = {"start_date": START, "end_date": START + timedelta(days=1)}
+
+    assert api_client.get(reverse("room-list"), params).data == []
+    params = {"start_date": END, "end_date": END + timedelta(days=1)}
+    assert len(api_client.get(reverse("room-list"), params).data) == 1
+
+
+def test_conflicting_hold_and_booked_dates_are_rejected(
+    hold, guest_client, room, booking
+):
+    held = guest_client.post(
+        reverse("hold-list"),
+        {"room": room.id, "start_date": START, "end_date": END},
+        format="json",
+    )
+    booked = guest_client.post(
+        reverse("hold-list"),
+        {"room": room.id, "start_date": booking.start_date, "end_date": START},
+        format="json",
+    )
+
+    assert held.status_code == booked.status_code == 409
+
+
+def test_only_the_holder_releases(hold, auth_client, guest_client):
+    url = reverse("hold-detail", args=[hold["token"]])
+
+    assert guest_client.delete(url).status_code == 404
+    assert auth_client.delete(url).status_code == 204
+    assert auth_client.delete(url).status_code == 404
+
+
+def test_expired_hold_no_longer_blocks(hold, guest_client, room, monkeypatch, settings):
+    now = holds._now()
+    monkeypatch.setattr(holds, "_now", lambda: now + settings.ROOM_HOLD_TTL + 1)
+
+    resp = guest_client.post(
+        reverse("booking-list"),
+        {"room": room.id, "start_date": START, "end_date": END},
+        format="json",
+    )
+
+    assert resp.status_code == 201
+
+
+def test_hold_store_subclasses_must_implement_storage():
+    class Partial(holds.HoldStore):
+        def clear(self) -> None:
+            pass
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_local_dev_settings_use_the_local_store(settings):
+    # LOCAL_DEV's LocMemCache would make CacheHoldStore refuse every save.
+    assert isinstance(holds.hold_store(), holds.LocalHoldStore)
+
+
+def test_cache_hold_store_refuses_a_per_process_cache():
+    with pytest.raises(ImproperlyConfigured):
+        holds.CacheHoldStore()
+
+
+@pytest.mark.django_db
+def test_cache_hold_store(settings, tmp_path, monkeypatch):
+    # A file cache is shared between processes, like Redis.
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path),
+        }
+    }
+    settings.ROOM_HOLD_BACKEND = "bookings.holds.CacheHoldStore"
+    monkeypatch.setattr(holds, "_stores", {})
+
+    holds.place_hold(1, 10, START, END)
+    with pytest.raises(holds.HoldConflict):
+        holds.place_hold(2, 10, START + timedelta(days=1), END)
+    holds.place_hold(2, 11, START, END)
+
+    assert holds.held_room_ids(START, END) == {10, 11}
+    assert holds.held_room_ids(END, END + timedelta(days=1)) == set()
+    assert holds.conflicting_hold(10, START, END, user_id=1) is None
+    assert holds.conflicting_hold(10, START, END, user_id=2).user_id == 1
@@ -0,0 +1,146 @@
+from datetime import date, timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from bookings import idempotency
+from bookings.models import Booking, IdempotencyKey
+
+
+@pytest.fixture
+def stay(room):
+    start = date.today() + timedelta(days=1)
+    return {"room": room.id, "start_date": start, "end_date": start + timedelta(2)}
+
+
+def post_booking(client, payload, key="retry-1"):
+    return client.post(
+        reverse("booking-list"), payload, format="json", HTTP_IDEMPOTENCY_KEY=key
+    )
+
+
+@pytest.mark.django_db
+def test_retry_replays_created_booking(auth_client, stay, django_assert_num_queries):
+    first = post_booking(auth_client, stay)
+
+    with django_assert_num_queries(1):
+        retry = post_booking(auth_client, stay)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.content == first.content
+    assert retry["Idempotent-Replayed"] == "true"
+    assert Booking.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_validation_errors_are_replayed(auth_client, stay, booking):
+    stay.update(start_date=booking.start_date, end_date=booking.end_date)
+
+    first = post_booking(auth_client, stay)
+    booking.cancel()
+    retry = post_booking(auth_client, stay)
+
+    assert first.status_code == retry.status_code == 400
+    assert retry["Idempotent-Replayed"] == "true"
+
+
+@pytest.mark.django_db
+def test_key_reused_for_different_payload(auth_client, stay):
+    post_booking(auth_client, stay)
+    stay["end_date"] += timedelta(days=1)
+
+    resp = post_booking(auth_client, stay)
+
+    assert resp.status_code == 422
+    assert Booking.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_request_in_progress_conflicts(auth_client, stay):
+    post_booking(auth_client, stay)
+    IdempotencyKey.objects.update(status_code=None)
+
+    assert post_booking(auth_client, stay).status_code == 409
+
+
+@pytest.mark.django_db
+def test_keys_are_per_user(auth_client, api_client, admin_user, stay):
+    post_booking(auth_client, stay)
+    api_client.force_authenticate(user=admin_user)
+    stay["start_date"] += timedelta(days=10)
+    stay["end_date"] += timedelta(days=10)
+
+    assert post_booking(api_client, stay).status_code == 201
+    assert Booking.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_expired_keys_run_again_and_are_cleaned_up(auth_client, stay, settings):
+    post_booking(auth_client, stay)
+    expired = timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL + 1)
+    IdempotencyKey.objects.update(created_at=expired)
+
+    assert "Idempotent-Replayed" not in post_booking(auth_client, stay)
+
+    IdempotencyKey.objects.update(created_at=expired)
+    call_command("cleanup_idempotency_keys", stdout=StringIO())
+    assert not IdempotencyKey.objects.exists()
+
+
+@pytest.mark.django_db
+def test_book_room_view_double_submit(client, user, room):
+    client.force_login(user)
+    start = date.today() + timedelta(days=1)
+    form = {
+        "start_date": start.isoformat(),
+        "end_date": (start + timedelta(days=2)).isoformat(),
+        "idempotency_key": "form-1",
+    }
+    url = reverse("book_room", args=[room.id])
+
+    first = client.post(url, form)
+    second = client.post(url, form)
+
+    assert first.status_code == second.status_code == 302
+    assert second["Location"] == first["Location"]
+    assert second["Idempotent-Replayed"] == "true"
+    assert Booking.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_book_room_view_form_errors_are_not_replayed(client, user, room):
+    client.force_login(user)
+    start = date.today() + timedelta(days=1)
+    url = reverse("book_room", args=[room.id])
+
+    invalid = client.post(url, {"start_date": "", "idempotency_key": "form-1"})
+    fixed = client.post(
+        url,
+        {
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(days=2)).isoformat(),
+            "idempotency_key": "form-1",
+        },
+    )
+
+    assert invalid.status_code == 200
+    assert fixed.status_code == 302
+    assert "Idempotent-Replayed" not in fixed
+    assert Booking.objects.count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_booking_and_stored_response_commit_together(auth_client, stay, monkeypatch):
+    def failing_complete(record, response):
+        raise RuntimeError("lost the stored response")
+
+    monkeypatch.setattr(idempotency, "complete", failing_complete)
+
+    with pytest.raises(RuntimeError):
+        post_booking(auth_client, stay)
+
+    assert not Booking.objects.exists()
+    assert not IdempotencyKey.objects.exists()
@@ -0,0 +1,201 @@
+import io
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+
+from bookings import importing
+from bookings.db_router import PIN_COOKIE
+from bookings.holds import place_hold
+from bookings.importing import import_bookings
+from bookings.models import OVERLAP_ERROR, Booking, RatePlan, Room
+
+DAY = date.today() + timedelta(days=30)
+
+
+def csv_file(*rows: str) -> io.StringIO:
+    return io.StringIO("user,room_number,start_date,end_date,status\n" + "".join(rows))
+
+
+def stay(room: str, start: int, end: int, user="user", status="") -> str:
+    return (
+        f"{user},{room},{DAY + timedelta(days=start)},"
+        f"{DAY + timedelta(days=end)},{status}\n"
+    )
+
+
+def run(stream, **kwargs):
+    records = list(import_bookings(stream, **kwargs))
+    return records[:-1], records[-1]["summary"]
+
+
+@pytest.mark.django_db
+def test_import_validates_the_batch_as_a_set(user, room, django_assert_num_queries):
+    existing = Booking.objects.create(
+        user=user, room=room, start_date=DAY, end_date=DAY + timedelta(days=2)
+    )
+    stream = csv_file(
+        stay("101", 1, 3),  # overlaps the existing booking
+        stay("101", 2, 6),  # free: existing ends on day 2
+        stay("101", 5, 8),  # overlaps line 3
+        stay("101", 8, 9),
+        stay("101", 4, 7, status="cancelled"),  # cancelled never clash
+        stay("999", 1, 2),
+        stay("101", 3, 1),
+        stay("101", 1, 2, user="nobody"),
+    )
+
+    # Users, rooms, existing bookings, base prices, rate plans, insert; the
+    # rest are savepoints around the chunk.
+    with django_assert_num_queries(8):
+        errors, summary = run(stream)
+
+    assert {e["line"]: e["field"] for e in errors} == {
+        2: None,
+        4: None,
+        7: "room_number",
+        8: "end_date",
+        9: "user",
+    }
+    messages = {e["line"]: e["error"] for e in errors}
+    assert messages[2] == f"{OVERLAP_ERROR} (booking {existing.pk})"
+    assert messages[4] == f"{OVERLAP_ERROR} (line 3)"
+    assert summary == {"rows": 8, "imported": 3, "rejected": 5, "dry_run": False}
+    imported = Booking.objects.exclude(pk=existing.pk).order_by("start_date")
+    assert [(b.start_date - DAY).days for b in imported] == [2, 4, 8]
+    assert imported[0].total_price == Decimal("400.00")
+    assert imported[1].status == Booking.STATUS_CANCELLED
+
+
+@pytest.mark.django_db
+def test_existing_bookings_are_checked_across_room_chunks(user, room):
+    garden = Room.objects.create(
+        number="7", name="Garden", capacity=2, price_per_night=50
+    )
+    for r in (garden, room):
+        Booking.objects.create(
+            user=user, room=r, start_date=DAY, end_date=DAY + timedelta(days=2)
+        )
+    stream = csv_file(
+        stay("7", 1, 3), stay("101", 1, 3), stay("7", 2, 4), stay("101", 2, 4)
+    )
+
+    errors, summary = run(stream, chunk_size=1)
+
+    assert [e["line"] for e in errors] == [2, 3]
+    assert summary["imported"] == 2
+
+
+@pytest.mark.django_db
+def test_import_prices_rate_plans_and_reads_ndjson(user, room):
+    RatePlan.objects.create(
+        room=room,
+        name="Peak",
+        start_date=DAY,
+        end_date=DAY + timedelta(days=1),
+        price_per_night=300,
+    )
+    stream = io.StringIO(
+        json.dumps(
+            {
+                "user": "user",
+                "room_id": room.pk,
+                "start_date": str(DAY),
+                "end_date": str(DAY + timedelta(days=2)),
+            }
+        )
+        + "\n\nnot json\n"
+    )
+
+    errors, summary = run(stream, fmt="ndjson")
+
+    assert errors == [{"line": 3, "field": None, "error": errors[0]["error"]}]
+    assert errors[0]["error"].startswith("Invalid JSON")
+    assert summary["imported"] == 1
+    assert Booking.objects.get().total_price == Decimal("400.00")
+
+
+@pytest.mark.django_db
+def test_import_respects_other_guests_holds(user, admin_user, room):
+    place_hold(admin_user.id, room.id, DAY, DAY + timedelta(days=3))
+
+    errors, summary = run(csv_file(stay("101", 1, 2), stay("101", 5, 6)))
+
+    assert [e["line"] for e in errors] == [2]
+    assert summary["imported"] == 1
+
+
+@pytest.mark.django_db
+def test_chunk_hitting_a_concurrent_booking_is_retried_row_by_row(
+    user, room, monkeypatch
+):
+    # A booking made after validation, which the set check could not see
+    real_totals = importing._totals
+
+    def racing_totals(rows, using):
+        Booking.objects.create(
+            user=user, room=room, start_date=DAY, end_date=DAY + timedelta(1)
+        )
+        return real_totals(rows, using)
+
+    monkeypatch.setattr(importing, "_totals", racing_totals)
+    stream = csv_file(stay("101", 0, 1), stay("101", 1, 2), stay("101", 2, 3))
+
+    errors, summary = run(stream, chunk_size=3)
+
+    assert errors == [{"line": 2, "field": None, "error": OVERLAP_ERROR}]
+    assert summary["imported"] == 2
+    assert Booking.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_dry_run_writes_nothing(user, room):
+    errors, summary = run(csv_file(stay("101", 0, 2)), dry_run=True)
+
+    assert errors == []
+    assert summary == {"rows": 1, "imported": 1, "rejected": 0, "dry_run": True}
+    assert not Booking.objects.exists()
+
+
+@pytest.mark.django_db
+def test_import_api_streams_the_report(api_client, admin_user, user, room):
+    api_client.force_authenticate(user=admin_user)
+    upload = SimpleUploadedFile(
+        "bookings.csv", csv_file(stay("101", 0, 2), stay("7", 0, 2)).read().encode()
+    )
+
+    resp = api_client.post("/api/bookings/import/", {"file": upload})
+
+    assert resp.status_code == 200
+    assert resp.streaming
+    # Imported before the report streams, with the request's pin cookie.
+    assert Booking.objects.filter(room=room).count() == 1
+    assert PIN_COOKIE in resp.cookies
+    lines = [json.loads(x) for x in b"".join(resp.streaming_content).splitlines()]
+    assert lines[0]["line"] == 3
+    assert lines[-1]["summary"]["imported"] == 1
+    assert Booking.objects.filter(room=room).count() == 1
+
+
+@pytest.mark.django_db
+def test_import_api_is_staff_only(auth_client):
+    resp = auth_client.post("/api/bookings/import/", {})
+
+    assert resp.status_code == 403
+
+
+@pytest.mark.django_db
+def test_export_reimports_through_the_command(tmp_path, booking, capsys):
+    exported = tmp_path / "bookings.csv"
+    call_command("export_bookings", "--output", str(exported))
+    booking.delete()
+
+    call_command("import_bookings", str(exported))
+
+    out, err = capsys.readouterr()
+    assert json.loads(out)["summary"]["imported"] == 1
+    assert json.loads(err)["imported"] == 1
+    assert Booking.objects.get().stay == booking.stay
@@ -0,0 +1,105 @@
+import logging
+import os
+import re
+import subprocess
+import sys
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+
+from bookings.models import Booking, Room
+
+SERVER_TIMING = re.compile(
+    r'db;dur=[\d.]+;desc="(\d+) queries", render;dur=([\d.]+), total;dur=[\d.]+'
+)
+
+
+@pytest.fixture(autouse=True)
+def server_timing(settings):
+    settings.SERVER_TIMING_HEADER = True
+
+
+@pytest.fixture
+def bookings_in_many_rooms(user, room):
+    start = room.created_at.date() + timedelta(days=10)
+    for i in range(5):
+        other = Room.objects.create(number=f"2{i}", capacity=2, price_per_night=50)
+        Booking.objects.create(
+            user=user,
+            room=other,
+            start_date=start + timedelta(days=i),
+            end_date=start + timedelta(days=i + 1),
+        )
+
+
+@pytest.mark.django_db
+@pytest.mark.query_budget(4)
+def test_my_bookings_view_stays_within_query_budget(
+    client, user, bookings_in_many_rooms
+):
+    client.force_login(user)
+
+    resp = client.get(reverse("my_bookings"))
+
+    assert resp.status_code == 200
+    assert resp.content.count(b"Room 2") == 5
+
+
+@pytest.mark.django_db
+def test_server_timing_header_counts_queries_and_render(client, user, room, booking):
+    client.force_login(user)
+
+    resp = client.get(reverse("my_bookings"))
+
+    queries, render = SERVER_TIMING.fullmatch(resp["Server-Timing"]).groups()
+    # session, user, bookings with their rooms
+    assert int(queries) == 3
+    assert float(render) > 0
+
+
+@pytest.mark.django_db
+def test_api_requests_are_timed_and_logged(api_client, room, caplog, settings):
+    settings.REQUEST_QUERY_WARNING = 0
+
+    with caplog.at_level(logging.INFO, logger="bookings.requests"):
+        resp = api_client.get(reverse("room-detail", args=[room.pk]))
+
+    assert SERVER_TIMING.fullmatch(resp["Server-Timing"])
+    [record] = caplog.records
+    assert record.levelno == logging.WARNING
+    assert (record.method, record.path, record.status) == (
+        "GET",
+        f"/api/rooms/{room.pk}/",
+        200,
+    )
+    assert record.db_queries >= 1
+    assert "db_queries=" in record.getMessage()
+
+
+def test_server_timing_header_is_off_outside_debug(settings):
+    env = {
+        **os.environ,
+        "DEBUG": "0",
+        "DJANGO_SETTINGS_MODULE": "hotel_booking.settings",
+    }
+    env.pop("SERVER_TIMING_HEADER", None)
+    code = "from django.conf import settings; print(settings.SERVER_TIMING_HEADER)"
+
+    for debug, expected in (("0", "False"), ("1", "True")):
+        env["DEBUG"] = debug
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            env=env,
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+        )
+        assert result.stdout.strip() == expected
+
+
+@pytest.mark.django_db
+def test_server_timing_header_can_be_disabled(api_client, settings):
+    settings.SERVER_TIMING_HEADER = False
+
+    assert "Server-Timing" not in api_client.get(reverse("room-list"))
@@ -2,8 +2,9 @@ from datetime import date, timedelta
 
 import pytest
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, transaction
 
-from bookings.models import Booking
+from bookings.models import BOOKING_OVERLAP_CONSTRAINT, OVERLAP_ERROR, Booking
 
 
 @pytest.mark.django_db
@@ -33,3 +34,60 @@ def test_booking_overlap_not_allowed(user, room, booking):
 
     with pytest.raises(ValidationError):
         overlapping.full_clean()
+
+
+@pytest.mark.django_db
+def test_booking_overlap_rejected_on_save(user, room, booking):
+    with pytest.raises(ValidationError) as exc:
+        Booking.objects.create(
+            user=user,
+            room=room,
+            start_date=booking.start_date + timedelta(days=1),
+            end_date=booking.end_date + timedelta(days=1),
+        )
+
+    assert exc.value.messages == [OVERLAP_ERROR]
+
+
+@pytest.mark.django_db
+def test_booking_overlap_enforced_by_database(user, room, booking):
+    overlapping = Booking(
+        user=user,
+        room=room,
+        start_date=booking.start_date,
+        end_date=booking.end_date,
+    )
+
+    with pytest.raises(IntegrityError):
+        with transaction.atomic():
+            Booking.objects.bulk_create([overlapping])
+
+
+@pytest.mark.django_db
+def test_overlap_constraint_has_no_ddl_outside_postgres(user, room, booking):
+    guard = next(
+        c for c in Booking._meta.constraints if c.name == BOOKING_OVERLAP_CONSTRAINT
+    )
+    editor = connection.SchemaEditorClass(connection, collect_sql=True)
+
+    assert guard.create_sql(Booking, editor) is None
+    assert guard.constraint_sql(Booking, editor) is None
+    # clean() owns the overlap check; the constraint adds no query of its own.
+    twin = Booking(
+        user=user, room=room, start_date=booking.start_date, end_date=booking.end_date
+    )
+    guard.validate(Booking, twin)
+
+
+@pytest.mark.django_db
+def test_cancelled_booking_frees_dates(user, room, booking):
+    booking.cancel()
+
+    rebooked = Booking.objects.create(
+        user=user,
+        room=room,
+        start_date=booking.start_date,
+        end_date=booking.end_date,
+    )
+
+    assert rebooked.pk
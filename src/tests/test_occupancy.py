@@ -0,0 +1,76 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from bookings.models import Booking, Room
+from bookings.occupancy import (
+    ENCODING_RLE,
+    ENCODINGS,
+    encode_bitset,
+    encode_rle,
+    occupancy_matrix,
+)
+from bookings.serializers import OccupancyQuerySerializer
+
+
+def test_encode_rle_and_bitset():
+    matrix = np.array(
+        [
+            [1, 1, 0, 0, 1, 0, 0, 0, 1],
+            [0, 0, 0, 0, 0, 0, 0, 0, 0],
+        ],
+        dtype=np.uint8,
+    )
+
+    assert encode_rle(matrix) == [[0, 2, 4, 1, 8, 1], []]
+    assert encode_rle(np.zeros((0, 10), dtype=np.uint8)) == []
+    assert encode_bitset(matrix) == ["yIA=", "AAA="]
+
+
+@pytest.mark.django_db
+def test_occupancy_matrix_clips_bookings_to_window(user, room):
+    other = Room.objects.create(number="102", capacity=2, price_per_night=80)
+    start = date.today() + timedelta(days=10)
+    Booking.objects.create(
+        user=user,
+        room=other,
+        start_date=start - timedelta(days=2),
+        end_date=start + timedelta(days=2),
+    )
+    Booking.objects.create(
+        user=user,
+        room=room,
+        start_date=start + timedelta(days=3),
+        end_date=start + timedelta(days=4),
+    )
+
+    matrix = occupancy_matrix([room.id, other.id], start, start + timedelta(days=5))
+
+    assert matrix.tolist() == [[0, 0, 0, 1, 0], [1, 1, 0, 0, 0]]
+
+
+@pytest.mark.django_db
+def test_occupancy_endpoint_is_staff_only(auth_client):
+    resp = auth_client.get("/api/rooms/occupancy/")
+
+    assert resp.status_code == 403
+
+
+@pytest.mark.django_db
+def test_occupancy_endpoint_returns_rle_rows(api_client, admin_user, booking):
+    api_client.force_authenticate(user=admin_user)
+
+    resp = api_client.get("/api/rooms/occupancy/", {"start_date": date.today()})
+
+    assert resp.status_code == 200
+    assert resp.data["days"] == 90
+    assert resp.data["rooms"] == [{"id": booking.room_id, "number": "101"}]
+    assert resp.data["occupancy"] == [[1, 3]]
+
+
+def test_query_serializer_offers_every_encoding():
+    field = OccupancyQuerySerializer().fields["encoding"]
+
+    assert tuple(field.choices) == ENCODINGS
+    assert field.default == ENCODING_RLE
@@ -0,0 +1,86 @@
+from datetime import date, timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from bookings.models import Booking, Room
+
+
+@pytest.fixture
+def many_bookings(user):
+    start = date.today() + timedelta(days=1)
+    bookings = []
+    for i in range(7):
+        room = Room.objects.create(number=f"2{i:02d}", capacity=2, price_per_night=90)
+        # Pairs of bookings share a start_date to exercise the id tiebreak.
+        day = start + timedelta(days=i // 2)
+        bookings.append(
+            Booking.objects.create(
+                user=user, room=room, start_date=day, end_date=day + timedelta(days=1)
+            )
+        )
+    return sorted(bookings, key=lambda b: (b.start_date, b.id), reverse=True)
+
+
+def collect_ids(client, url, params):
+    ids, pages = [], []
+    while url:
+        resp = client.get(url, params)
+        assert resp.status_code == 200
+        ids += [row["id"] for row in resp.data["results"]]
+        pages.append(resp.data)
+        url, params = resp.data["next"], None
+    return ids, pages
+
+
+@pytest.mark.django_db
+def test_my_bookings_keyset_pages_are_complete_and_ordered(auth_client, many_bookings):
+    ids, pages = collect_ids(auth_client, "/api/bookings/my/", {"page_size": 3})
+
+    assert ids == [b.id for b in many_bookings]
+    assert len(pages) == 3
+    assert pages[0]["previous"] is None
+
+
+@pytest.mark.django_db
+def test_previous_link_returns_preceding_page(auth_client, many_bookings):
+    first = auth_client.get("/api/bookings/my/", {"page_size": 3}).data
+    second = auth_client.get(first["next"]).data
+
+    back = auth_client.get(second["previous"]).data
+
+    assert [row["id"] for row in back["results"]] == [
+        row["id"] for row in first["results"]
+    ]
+    assert back["previous"] is None
+
+
+@pytest.mark.django_db
+def test_ascending_ordering_is_paginated(auth_client, many_bookings):
+    ids, _ = collect_ids(
+        auth_client, "/api/bookings/my/", {"page_size": 2, "ordering": "start_date"}
+    )
+
+    assert ids == [
+        b.id for b in sorted(many_bookings, key=lambda b: (b.start_date, b.id))
+    ]
+
+
+@pytest.mark.django_db
+def test_invalid_cursor_is_not_found(auth_client, many_bookings):
+    resp = auth_client.get("/api/bookings/my/", {"cursor": "cD1ub3BlfDE="})
+
+    assert resp.status_code == 404
+
+
+@pytest.mark.django_db
+def test_next_page_seeks_with_a_row_value_comparison(auth_client, many_bookings):
+    first = auth_client.get("/api/bookings/my/", {"page_size": 3}).data
+
+    with CaptureQueriesContext(connection) as ctx:
+        auth_client.get(first["next"])
+
+    page_query = next(q["sql"] for q in ctx.captured_queries if "LIMIT" in q["sql"])
+    assert '("bookings_booking"."start_date", "bookings_booking"."id") <' in page_query
+    assert page_query.endswith('"bookings_booking"."id" DESC LIMIT 4')
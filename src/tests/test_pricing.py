@@ -0,0 +1,121 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+
+from bookings.models import Booking, RatePlan, Room
+from bookings.pricing import nightly_prices, quote_totals, stay_total
+
+MONDAY = date(2030, 7, 1)
+WEEKEND = 0b1100000  # Saturday and Sunday
+
+
+@pytest.fixture
+def summer(room):
+    return RatePlan.objects.create(
+        room=room,
+        name="Summer",
+        start_date=MONDAY,
+        end_date=MONDAY + timedelta(days=60),
+        price_per_night=Decimal("150.00"),
+    )
+
+
+@pytest.fixture
+def weekend(room):
+    return RatePlan.objects.create(
+        room=room,
+        name="Weekend",
+        start_date=date(2030, 1, 1),
+        end_date=date(2031, 1, 1),
+        weekdays=WEEKEND,
+        price_per_night=Decimal("200.00"),
+        priority=1,
+    )
+
+
+@pytest.mark.django_db
+def test_base_price_without_rate_plans(room):
+    assert stay_total(room.pk, MONDAY, MONDAY + timedelta(days=3)) == Decimal("300.00")
+
+
+@pytest.mark.django_db
+def test_highest_priority_plan_wins_per_night(room, summer, weekend):
+    # Sunday before summer, a week of summer, then past its end.
+    start, end = MONDAY - timedelta(days=1), MONDAY + timedelta(days=7)
+    prices = nightly_prices([room.pk], start, end)[0].tolist()
+
+    assert prices == [20000, 15000, 15000, 15000, 15000, 15000, 20000, 20000]
+    assert stay_total(room.pk, start, end) == Decimal("1350.00")
+
+
+@pytest.mark.django_db
+def test_quote_prices_many_rooms_in_one_pass(room, summer, django_assert_num_queries):
+    other = Room.objects.create(number="102", capacity=2, price_per_night=80)
+    end = MONDAY + timedelta(days=2)
+
+    with django_assert_num_queries(2):
+        totals = quote_totals([other.pk, room.pk], MONDAY, end)
+
+    assert totals == {room.pk: Decimal("300.00"), other.pk: Decimal("160.00")}
+
+
+@pytest.mark.django_db
+def test_quote_cache_follows_rate_plan_version(
+    room, summer, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    end = MONDAY + timedelta(days=2)
+    quote_totals([room.pk], MONDAY, end)
+    with django_assert_num_queries(0):
+        assert quote_totals([room.pk], MONDAY, end)[room.pk] == Decimal("300.00")
+
+    summer.price_per_night = Decimal("120.00")
+    with django_capture_on_commit_callbacks(execute=True):
+        summer.save()
+
+    assert quote_totals([room.pk], MONDAY, end)[room.pk] == Decimal("240.00")
+
+
+@pytest.mark.django_db
+def test_booking_stores_price_at_booking_time(user, room, summer):
+    booking = Booking.objects.create(
+        user=user, room=room, start_date=MONDAY, end_date=MONDAY + timedelta(days=2)
+    )
+    assert booking.total_price == Decimal("300.00")
+
+    summer.delete()
+    booking = Booking.objects.get(pk=booking.pk)
+    booking.cancel()
+    booking.refresh_from_db()
+    assert booking.total_price == Decimal("300.00")
+
+    booking.end_date = MONDAY + timedelta(days=3)
+    booking.save()
+    assert booking.total_price == Decimal("300.00")  # 3 nights at the base 100
+
+
+@pytest.mark.django_db
+def test_quote_endpoint_skips_booked_rooms(api_client, user, room, summer):
+    free = Room.objects.create(number="102", capacity=2, price_per_night=80)
+    Room.objects.create(number="103", capacity=2, price_per_night=90)
+    end = MONDAY + timedelta(days=2)
+    Booking.objects.create(user=user, room=room, start_date=MONDAY, end_date=end)
+
+    resp = api_client.get(
+        reverse("room-quote"),
+        {"start_date": MONDAY, "end_date": end, "room": [room.pk, free.pk]},
+    )
+
+    assert resp.status_code == 200
+    assert resp.data["nights"] == 2
+    assert resp.data["quotes"] == [
+        {"room": free.pk, "number": "102", "total_price": "160.00"}
+    ]
+
+
+@pytest.mark.django_db
+def test_quote_endpoint_requires_dates(api_client):
+    resp = api_client.get(reverse("room-quote"))
+
+    assert resp.status_code == 400
@@ -0,0 +1,107 @@
+import pstats
+import threading
+import time
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.test import AsyncClient
+from django.urls import reverse
+
+from bookings.profiling import ProfilingMiddleware, StackSampler, make_token
+
+
+@pytest.fixture
+def profiling(settings, tmp_path):
+    settings.PROFILING_ENABLED = True
+    settings.PROFILING_DIR = str(tmp_path)
+    return tmp_path
+
+
+def test_disabled_profiling_is_not_loaded(settings):
+    settings.PROFILING_ENABLED = False
+
+    with pytest.raises(MiddlewareNotUsed):
+        ProfilingMiddleware(lambda request: None)
+
+
+@pytest.mark.django_db
+def test_staff_token_profiles_the_request(client, admin_user, room, profiling):
+    resp = client.get(
+        reverse("room-list"),
+        {"min_price": 50, "capacity": 2},
+        headers={"X-Profile": make_token(admin_user)},
+    )
+
+    assert resp.status_code == 200
+    assert resp.json()[0]["number"] == room.number
+    stats = pstats.Stats(str(profiling / resp["X-Profile-File"]))
+    assert any(func[2] == "filter_queryset" for func in stats.stats)
+
+
+@pytest.mark.django_db
+def test_inline_report(client, admin_user, profiling):
+    resp = client.get(
+        reverse("room-list"),
+        {"_profile": make_token(admin_user), "_profile_inline": "1"},
+    )
+
+    assert resp["Content-Type"].startswith("text/plain")
+    assert resp["X-Profile-Status"] == "200"
+    assert b"cumulative" in resp.content
+
+
+@pytest.mark.django_db
+def test_sample_mode_stores_collapsed_stacks(client, admin_user, profiling):
+    resp = client.get(
+        reverse("rooms_list"),
+        headers={"X-Profile": make_token(admin_user), "X-Profile-Mode": "sample"},
+    )
+
+    assert resp.status_code == 200
+    assert resp["X-Profile-File"].endswith(".collapsed")
+    assert (profiling / resp["X-Profile-File"]).exists()
+
+
+@pytest.mark.django_db
+def test_tokens_of_non_staff_or_expired_are_ignored(
+    client, user, admin_user, profiling, settings
+):
+    resp = client.get(reverse("room-list"), headers={"X-Profile": make_token(user)})
+    assert "X-Profile-File" not in resp
+
+    settings.PROFILING_TOKEN_MAX_AGE = -1
+    token = make_token(admin_user)
+    assert "X-Profile-File" not in client.get(
+        reverse("room-list"), headers={"X-Profile": token}
+    )
+
+
+def test_stack_sampler_collapses_stacks():
+    with StackSampler(threading.get_ident(), 0.001) as sampler:
+        time.sleep(0.05)
+
+    lines = sampler.collapsed().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert "test_profiling:test_stack_sampler_collapses_stacks" in stack
+    assert int(count) > 0
+
+
+@pytest.mark.django_db
+def test_profile_token_command(admin_user, capsys):
+    call_command("profile_token", admin_user.username)
+
+    token = capsys.readouterr().out.strip()
+    assert token.startswith(f"{admin_user.pk}:")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_requests_are_profiled(admin_user, room, profiling):
+    resp = async_to_sync(AsyncClient().get)(
+        reverse("async-room-list"), headers={"X-Profile": make_token(admin_user)}
+    )
+
+    assert resp.status_code == 200
+    assert (profiling / resp["X-Profile-File"]).exists()
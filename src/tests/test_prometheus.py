@@ -0,0 +1,193 @@
+from datetime import timedelta
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.db import connections, transaction
+from django.urls import reverse
+from prometheus_client import REGISTRY, Counter, values
+
+from bookings.models import Booking
+from bookings.prometheus import export_pool_metrics
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.fixture(autouse=True)
+def metrics_token(settings):
+    settings.METRICS_TOKEN = "secret"
+    return {"Authorization": "Bearer secret"}
+
+
+@pytest.mark.django_db
+def test_request_latency_is_labelled_by_route(api_client, client, room, metrics_token):
+    labels = {"method": "GET", "status": "200"}
+    rooms_before = sample(
+        "http_request_duration_seconds_count", route="room-list", **labels
+    )
+    html_before = sample(
+        "http_request_duration_seconds_count", route="rooms_list", **labels
+    )
+
+    api_client.get(reverse("room-list"))
+    client.get(reverse("rooms_list"))
+    resp = client.get(reverse("prometheus-metrics"), headers=metrics_token)
+
+    assert sample(
+        "http_request_duration_seconds_count", route="room-list", **labels
+    ) == (rooms_before + 1)
+    assert sample(
+        "http_request_duration_seconds_count", route="rooms_list", **labels
+    ) == (html_before + 1)
+    assert resp["Content-Type"].startswith("text/plain")
+    assert b'route="room-list"' in resp.content
+
+
+@pytest.mark.django_db
+def test_booking_counters(auth_client, room, django_capture_on_commit_callbacks):
+    created = sample("bookings_created_total")
+    cancelled = sample("bookings_cancelled_total")
+    overlaps = sample("booking_conflicts_total", reason="overlap")
+    start = room.created_at.date() + timedelta(days=5)
+    payload = {"room": room.id, "start_date": start, "end_date": start + timedelta(2)}
+
+    with django_capture_on_commit_callbacks(execute=True):
+        resp = auth_client.post(reverse("booking-list"), payload, format="json")
+        twin = auth_client.post(reverse("booking-list"), payload, format="json")
+        auth_client.post(reverse("booking-cancel", args=[resp.data["id"]]))
+
+    assert twin.status_code == 400
+
+    assert sample("bookings_created_total") == created + 1
+    assert sample("bookings_cancelled_total") == cancelled + 1
+    assert sample("booking_conflicts_total", reason="overlap") == overlaps + 1
+
+
+@pytest.mark.django_db
+def test_clean_overlap_failures_count_as_conflicts(booking):
+    overlaps = sample("booking_conflicts_total", reason="overlap")
+    twin = Booking(
+        user=booking.user,
+        room=booking.room,
+        start_date=booking.start_date,
+        end_date=booking.end_date,
+    )
+
+    with pytest.raises(ValidationError):
+        twin.full_clean()
+
+    assert sample("booking_conflicts_total", reason="overlap") == overlaps + 1
+
+
+def test_metrics_are_summed_across_worker_processes(
+    client, tmp_path, monkeypatch, metrics_token
+):
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    for pid in (101, 102, 103):
+        monkeypatch.setattr(
+            values, "ValueClass", values.MultiProcessValue(lambda pid=pid: pid)
+        )
+        Counter("bookings_created", "Bookings created", registry=None).inc(2)
+
+    resp = client.get(reverse("prometheus-metrics"), headers=metrics_token)
+
+    assert b"bookings_created_total 6.0" in resp.content
+
+
+def test_metrics_token(client, settings):
+    assert client.get(reverse("prometheus-metrics")).status_code == 401
+    resp = client.get(
+        reverse("prometheus-metrics"), headers={"Authorization": "Bearer secret"}
+    )
+    assert resp.status_code == 200
+
+
+def test_metrics_need_a_token_outside_debug(client, settings):
+    settings.METRICS_TOKEN = ""
+
+    assert client.get(reverse("prometheus-metrics")).status_code == 403
+    settings.DEBUG = True
+    assert client.get(reverse("prometheus-metrics")).status_code == 200
+
+
+@pytest.mark.django_db
+def test_admin_cancel_action_counts_every_cancellation(
+    admin_client, booking, django_capture_on_commit_callbacks
+):
+    cancelled = sample("bookings_cancelled_total")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        admin_client.post(
+            reverse("admin:bookings_booking_changelist"),
+            {"action": "cancel_bookings", "_selected_action": [booking.pk]},
+        )
+
+    assert sample("bookings_cancelled_total") == cancelled + 1
+
+
+@pytest.mark.django_db
+def test_admin_cancel_button_is_counted(
+    admin_client, booking, django_capture_on_commit_callbacks
+):
+    cancelled = sample("bookings_cancelled_total")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        admin_client.get(reverse("admin:bookings_booking_cancel", args=[booking.pk]))
+
+    assert sample("bookings_cancelled_total") == cancelled + 1
+
+
+@pytest.mark.django_db
+def test_rolled_back_bookings_are_not_counted(
+    booking, django_capture_on_commit_callbacks
+):
+    created = sample("bookings_created_total")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            Booking.objects.create(
+                user=booking.user,
+                room=booking.room,
+                start_date=booking.end_date,
+                end_date=booking.end_date + timedelta(days=1),
+            )
+            transaction.set_rollback(True)
+
+    assert sample("bookings_created_total") == created
+
+
+@pytest.mark.django_db
+def test_db_pool_metrics_are_exported(client, monkeypatch, metrics_token):
+    stats = {
+        "pool_max": 4,
+        "pool_size": 3,
+        "pool_available": 1,
+        "connections_num": 3,
+        "requests_num": 10,
+        "requests_wait_ms": 500,
+    }
+
+    class FakePool:
+        def get_stats(self):
+            return dict(stats)
+
+    resp = client.get(reverse("prometheus-metrics"), headers=metrics_token)
+    assert b'db_connections_opened_total{alias="default"}' in resp.content
+
+    connection = connections["default"]
+    monkeypatch.setitem(connection.settings_dict, "OPTIONS", {"pool": True})
+    monkeypatch.setattr(type(connection), "pool", FakePool(), raising=False)
+    export_pool_metrics()
+    checkouts = sample("db_pool_checkouts_total", alias="default")
+    waited = sample("db_pool_checkout_wait_seconds_total", alias="default")
+
+    stats.update(requests_num=15, requests_wait_ms=750, pool_available=0)
+    export_pool_metrics()
+
+    assert sample("db_pool_checkouts_total", alias="default") == checkouts + 5
+    assert sample("db_pool_checkout_wait_seconds_total", alias="default") == (
+        waited + 0.25
+    )
+    assert sample("db_pool_connections", alias="default", state="in_use") == 3
+    assert sample("db_pool_max_connections", alias="default") == 4
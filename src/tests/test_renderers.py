@@ -0,0 +1,59 @@
+from datetime import date, timedelta
+
+import msgpack
+import pytest
+from django.core.management import call_command
+from rest_framework.renderers import JSONRenderer
+
+from bookings.api.renderers import ORJSONRenderer
+from bookings.management.commands.benchmark_renderers import booking_rows
+from bookings.models import Booking
+from bookings.serializers import BookingRowSerializer, BookingSerializer
+
+
+@pytest.mark.django_db
+def test_orjson_renderer_matches_drf_json(booking):
+    data = BookingSerializer(Booking.objects.all(), many=True).data
+
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+@pytest.mark.django_db
+def test_rooms_can_be_requested_as_msgpack(api_client, room):
+    resp = api_client.get("/api/rooms/", HTTP_ACCEPT="application/msgpack")
+
+    assert resp["Content-Type"] == "application/msgpack"
+    rooms = msgpack.unpackb(resp.content)
+    assert rooms[0]["price_per_night"] == "100.00"
+
+
+@pytest.mark.django_db
+def test_booking_can_be_created_from_msgpack(auth_client, room):
+    start = date.today() + timedelta(days=1)
+    body = msgpack.packb(
+        {
+            "room": room.id,
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(days=2)).isoformat(),
+        }
+    )
+
+    resp = auth_client.post("/api/bookings/", body, content_type="application/msgpack")
+
+    assert resp.status_code == 201
+
+
+@pytest.mark.django_db
+def test_schema_is_still_generated(api_client):
+    resp = api_client.get("/api/schema/")
+
+    assert resp.status_code == 200
+
+
+def test_benchmark_renderers_runs_on_the_row_shape(capsys):
+    assert booking_rows(1)[0].keys() == set(BookingRowSerializer.values)
+
+    call_command("benchmark_renderers", "--rows=20", "--repeat=1")
+
+    out = capsys.readouterr().out
+    assert "20 rows" in out and "msgpack" in out
@@ -0,0 +1,131 @@
+from datetime import date, timedelta
+
+import pytest
+from django.conf import settings
+
+from bookings import holds, serializers
+from bookings.holds import place_hold
+from bookings.models import Booking, Room
+from bookings.versions import ROOMS_VERSION_KEY, get_version, room_version_key
+
+
+@pytest.mark.django_db
+def test_room_list_serves_304_for_matching_etag(api_client, room):
+    first = api_client.get("/api/rooms/", HTTP_ACCEPT="application/json")
+    etag = first["ETag"]
+
+    second = api_client.get(
+        "/api/rooms/", HTTP_ACCEPT="application/json", HTTP_IF_NONE_MATCH=etag
+    )
+
+    assert first.status_code == 200
+    assert second.status_code == 304
+    assert second["ETag"] == etag
+
+
+@pytest.mark.django_db
+def test_cached_room_list_skips_queries(api_client, room, django_assert_num_queries):
+    api_client.get("/api/rooms/", HTTP_ACCEPT="application/json")
+
+    with django_assert_num_queries(0):
+        resp = api_client.get("/api/rooms/", HTTP_ACCEPT="application/json")
+
+    assert resp.status_code == 200
+    assert resp.json()[0]["number"] == "101"
+
+
+@pytest.mark.django_db
+def test_room_write_changes_etag(api_client, room, django_capture_on_commit_callbacks):
+    before = api_client.get(f"/api/rooms/{room.id}/", HTTP_ACCEPT="application/json")
+
+    Room.objects.filter(pk=room.pk).update(name="Renamed")
+    room.refresh_from_db()
+    with django_capture_on_commit_callbacks(execute=True):
+        room.save()
+
+    after = api_client.get(
+        f"/api/rooms/{room.id}/",
+        HTTP_ACCEPT="application/json",
+        HTTP_IF_NONE_MATCH=before["ETag"],
+    )
+    assert after.status_code == 200
+    assert after.json()["name"] == "Renamed"
+
+
+@pytest.mark.django_db
+def test_booking_write_invalidates_availability(
+    api_client, user, room, booking, django_capture_on_commit_callbacks
+):
+    url = f"/api/rooms/{room.id}/availability/"
+    before = api_client.get(url, HTTP_ACCEPT="application/json")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Booking.objects.get(pk=booking.pk).cancel()
+
+    after = api_client.get(
+        url, HTTP_ACCEPT="application/json", HTTP_IF_NONE_MATCH=before["ETag"]
+    )
+    assert after.status_code == 200
+    assert after.json()["booked"] == []
+
+
+@pytest.mark.django_db
+def test_versions_bump_only_once_the_write_commits(
+    room, booking, django_capture_on_commit_callbacks
+):
+    before = get_version(ROOMS_VERSION_KEY), get_version(room_version_key(room.id))
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        booking.cancel()
+        room.save()
+        # A concurrent GET now would still see the old rows: keep old keys.
+        assert (
+            get_version(ROOMS_VERSION_KEY),
+            get_version(room_version_key(room.id)),
+        ) == before
+
+    for callback in callbacks:
+        callback()
+    assert get_version(ROOMS_VERSION_KEY) > before[0]
+    assert get_version(room_version_key(room.id)) > before[1]
+
+
+@pytest.mark.django_db
+def test_lapsed_hold_changes_the_room_list_key(api_client, user, room, monkeypatch):
+    start = date.today() + timedelta(days=5)
+    params = {"start_date": start, "end_date": start + timedelta(days=2)}
+    place_hold(user.id, room.id, start, start + timedelta(days=2))
+    held = api_client.get("/api/rooms/", params, HTTP_ACCEPT="application/json")
+    assert held.json() == []
+
+    now = holds._now()
+    monkeypatch.setattr(holds, "_now", lambda: now + settings.ROOM_HOLD_TTL + 1)
+    lapsed = api_client.get(
+        "/api/rooms/",
+        params,
+        HTTP_ACCEPT="application/json",
+        HTTP_IF_NONE_MATCH=held["ETag"],
+    )
+
+    assert lapsed.status_code == 200
+    assert [r["id"] for r in lapsed.json()] == [room.id]
+
+
+@pytest.mark.django_db
+def test_default_availability_window_rolls_over_with_the_date(
+    api_client, room, monkeypatch
+):
+    url = f"/api/rooms/{room.id}/availability/"
+    today = api_client.get(url, HTTP_ACCEPT="application/json")
+
+    tomorrow = date.today() + timedelta(days=1)
+    monkeypatch.setattr(
+        serializers, "date", type("FakeDate", (date,), {"today": lambda: tomorrow})
+    )
+    after = api_client.get(
+        url, HTTP_ACCEPT="application/json", HTTP_IF_NONE_MATCH=today["ETag"]
+    )
+
+    assert after.status_code == 200
+    assert after["ETag"] != today["ETag"]
+    assert after.json()["start_date"] == str(tomorrow)
@@ -0,0 +1,43 @@
+import pytest
+from django.urls import reverse
+
+from bookings.models import Room
+from bookings.search import search_rooms, search_terms
+
+
+def test_search_terms_keep_quoted_phrases():
+    assert search_terms('sea "junior suite"  101') == ["sea", "junior suite", "101"]
+
+
+@pytest.mark.django_db
+def test_room_search_matches_every_term():
+    Room.objects.create(number="101", name="Sea View", capacity=2, price_per_night=90)
+    Room.objects.create(number="102", name="Garden", capacity=2, price_per_night=90)
+
+    found = search_rooms(Room.objects.all(), "sea 10")
+
+    assert [room.number for room in found] == ["101"]
+
+
+@pytest.mark.django_db
+def test_room_api_search_is_ranked(api_client):
+    Room.objects.create(number="1101", name="Deluxe", capacity=2, price_per_night=90)
+    Room.objects.create(number="101", name="Deluxe", capacity=2, price_per_night=90)
+    Room.objects.create(number="201", name="Suite 101", capacity=2, price_per_night=90)
+
+    resp = api_client.get(reverse("room-list"), {"search": "101"})
+
+    # Exact number first, then the prefix match, then the rest by number.
+    assert [room["number"] for room in resp.data] == ["101", "1101", "201"]
+
+
+@pytest.mark.django_db
+def test_room_api_search_respects_explicit_ordering(api_client):
+    Room.objects.create(number="101", name="Deluxe", capacity=2, price_per_night=300)
+    Room.objects.create(number="1101", name="Deluxe", capacity=2, price_per_night=90)
+
+    resp = api_client.get(
+        reverse("room-list"), {"search": "101", "ordering": "price_per_night"}
+    )
+
+    assert [room["number"] for room in resp.data] == ["1101", "101"]
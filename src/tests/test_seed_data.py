@@ -0,0 +1,110 @@
+import dataclasses
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, transaction
+
+from bookings.models import Booking, Room
+from bookings.seeding import SeedError, overlaps, plan, validate
+from bookings.versions import ROOMS_VERSION_KEY, get_version
+
+SMALL = ["--rooms=5", "--bookings=300", "--users=7"]
+
+
+def test_plan_is_deterministic_and_free_of_overlaps():
+    around = date(2026, 6, 1)
+    first = plan(rooms=20, bookings=2000, users=30, seed=3, around=around)
+    again = plan(rooms=20, bookings=2000, users=30, seed=3, around=around)
+
+    assert len(first) == 2000
+    assert first.room_names == again.room_names
+    for field in ("booking_rooms", "booking_users", "starts", "ends", "cancelled"):
+        assert np.array_equal(getattr(first, field), getattr(again, field))
+    assert not np.array_equal(
+        first.starts, plan(20, 2000, 30, seed=4, around=around).starts
+    )
+    assert overlaps(first) == 0
+    assert first.starts.min() < around.toordinal() < first.ends.max()
+    assert 0 < first.cancelled.mean() < 0.2
+
+
+def test_validate_rejects_overlapping_stays():
+    seed_plan = plan(rooms=2, bookings=50, users=3, seed=1)
+    clashing = dataclasses.replace(
+        seed_plan,
+        starts=seed_plan.starts - 30,
+        cancelled=np.zeros(len(seed_plan), dtype=bool),
+    )
+
+    assert overlaps(clashing) > 0
+    with pytest.raises(SeedError, match="overlapping"):
+        validate(clashing)
+    with pytest.raises(SeedError):
+        plan(rooms=0, bookings=10, users=1)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("method", ["insert", "bulk"])
+def test_seed_data_loads_priced_bookings(
+    method, booking, capsys, django_capture_on_commit_callbacks
+):
+    before = get_version(ROOMS_VERSION_KEY)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command("seed_data", *SMALL, f"--method={method}")
+
+    seeded = Booking.objects.exclude(pk=booking.pk).select_related("room")
+    assert seeded.count() == 300
+    assert Room.objects.filter(number__startswith="seed-").count() == 5
+    for stay in seeded:
+        nights = (stay.end_date - stay.start_date).days
+        assert stay.total_price == stay.room.price_per_night * nights
+        assert stay.version == 1
+    assert f"300 bookings ({method})" in capsys.readouterr().out
+    assert Booking.objects.filter(pk=booking.pk).exists()
+    assert get_version(ROOMS_VERSION_KEY) > before
+
+
+@pytest.mark.django_db
+def test_overlap_guard_is_restored_after_loading():
+    call_command("seed_data", *SMALL)
+
+    stay = Booking.objects.filter(status=Booking.STATUS_ACTIVE).first()
+    twin = Booking(
+        user_id=stay.user_id,
+        room_id=stay.room_id,
+        start_date=stay.start_date,
+        end_date=stay.start_date + timedelta(days=1),
+    )
+    with pytest.raises(IntegrityError), transaction.atomic():
+        Booking.objects.bulk_create([twin])
+
+
+@pytest.mark.django_db
+def test_seeded_rows_are_deterministic():
+    def stays():
+        return list(
+            Booking.objects.order_by("room__number", "start_date").values_list(
+                "room__number", "user__username", "start_date", "end_date", "status"
+            )
+        )
+
+    call_command("seed_data", *SMALL, "--seed=9")
+    first = stays()
+    Room.objects.all().delete()
+    call_command("seed_data", *SMALL, "--seed=9", "--prefix=again-")
+
+    assert [row[2:] for row in stays()] == [row[2:] for row in first]
+
+
+@pytest.mark.django_db
+def test_if_empty_and_method_checks(room, capsys):
+    call_command("seed_data", *SMALL, "--if-empty")
+    assert "already exist" in capsys.readouterr().out
+    assert Room.objects.count() == 1
+
+    with pytest.raises(CommandError, match="PostgreSQL"):
+        call_command("seed_data", *SMALL, "--method=copy")
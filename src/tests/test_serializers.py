@@ -1,9 +1,15 @@
-from datetime import date
+from datetime import date, timedelta
 
 import pytest
 from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
 
-from bookings.serializers import BookingCreateSerializer
+from bookings.models import Booking, Room
+from bookings.serializers import (
+    BookingCreateSerializer,
+    BookingRowSerializer,
+    BookingSerializer,
+)
 
 
 @pytest.mark.django_db
@@ -23,3 +29,23 @@ def test_booking_serializer_rejects_invalid_date_order_on_save(room, user):
 
     with pytest.raises(serializers.ValidationError):
         serializer.save()
+
+
+@pytest.mark.django_db
+def test_booking_row_serializer_matches_booking_serializer(user, room, booking):
+    other = Room.objects.create(number="7", name="", capacity=4, price_per_night="9.5")
+    Booking.objects.create(
+        user=user,
+        room=other,
+        start_date=booking.start_date,
+        end_date=booking.end_date + timedelta(days=10),
+        status=Booking.STATUS_CANCELLED,
+    )
+    qs = Booking.objects.select_related("room", "user").order_by("id")
+
+    expected = JSONRenderer().render(BookingSerializer(qs, many=True).data)
+    fast = BookingRowSerializer().to_representation(
+        qs.values(*BookingRowSerializer.values)
+    )
+
+    assert JSONRenderer().render(fast) == expected